@@ -2,9 +2,10 @@ import json
 import random
 
 class Room:
-    def __init__(self, file_path):
+    def __init__(self, file_path, rng=None):
         self.file_path = file_path
         self.data = None
+        self.rng = rng if rng is not None else random.Random()
         self.load_json()
 
     def load_json(self):
@@ -20,20 +21,20 @@ class Room:
     def shuffle_outdoor(self):
         """Shuffles outdoor room data and returns it."""
         outdoor_room_data = self.data.get("tilesCard", [{}])[0].get("outDoor", [])
-        random.shuffle(outdoor_room_data)
+        self.rng.shuffle(outdoor_room_data)
         return outdoor_room_data
 
     def shuffle_indoor(self):
         """Shuffles indoor room data and returns a status message."""
         indoor_room_data = self.data.get("tilesCard", [{}])[1].get("inDoor", [])
-        random.shuffle(indoor_room_data)
+        self.rng.shuffle(indoor_room_data)
         return "Shuffling Cards"
 
     def get_outdoor(self):
         """Returns a random outdoor room and removes it from the list."""
         outdoor_room_data = self.shuffle_outdoor()
         if outdoor_room_data:
-            random_outdoor_room = random.choice(outdoor_room_data)
+            random_outdoor_room = self.rng.choice(outdoor_room_data)
             outdoor_room_data.remove(random_outdoor_room)
             return random_outdoor_room
         return None
@@ -42,7 +43,7 @@ class Room:
         """Returns a random indoor room."""
         indoor_room_data = self.data.get("tilesCard", [{}])[1].get("inDoor", [])
         if indoor_room_data:
-            return random.choice(indoor_room_data)
+            return self.rng.choice(indoor_room_data)
         return None
 
     def indoor_to_outdoor(self):
@@ -10,12 +10,14 @@ class Direction(Enum):
 
     @staticmethod
     def opposite(direction):
-        opposites = {
-            Direction.LEFT: Direction.RIGHT,
-            Direction.UP: Direction.DOWN,
-            Direction.RIGHT: Direction.LEFT,
-            Direction.DOWN: Direction.UP
-        }
-        return opposites[direction]
+        return _OPPOSITES[direction]
+
+
+_OPPOSITES = {
+    Direction.LEFT: Direction.RIGHT,
+    Direction.UP: Direction.DOWN,
+    Direction.RIGHT: Direction.LEFT,
+    Direction.DOWN: Direction.UP
+}
 
 
@@ -1,14 +1,15 @@
-from models.tiles import Tile
+from models.catalog import load_catalog
 from models.game import Game
-from enums.directions import Direction
-import json
+from models.engine import GameEngine
+from models import localization
 
 
 def load_localization(language_code):
-    """Load the localization data based on the specified language."""
-    with open("localization.json", "r", encoding='utf-8') as f:
-        localization_data = json.load(f)
-    return localization_data.get(language_code, None)
+    """Returns the shared localization table for a language, or None if there is none."""
+    try:
+        return localization.load(language_code)
+    except KeyError:
+        return None
 
 def get_langauge_code():
     """Keep asking user for a valid langauge code until a valid one is provided"""
@@ -22,29 +23,47 @@ def get_langauge_code():
             print(f"Invalid language code '{language_code}'. Please try again.")
 
 
+def play(engine, events):
+    """Shows the engine's events and feeds it the player's answers until the game ends."""
+    while True:
+        for event in events:
+            print(event.text)
+        if engine.done:
+            return
+        events = engine.step(input(engine.prompt.text))
+
+
 def main():
     while True:
-        choice = input("Choose an option: [start], [quit], [save], [load]: ").lower()
-        choice = input("\nWelocme to Zombie in my pocket [start, quit]: ").lower()
+        choice = input("\nWelocme to Zombie in my pocket [start, load, quit]: ").lower()
         if choice == "start":
             # langauge option
             localization = get_langauge_code()
             # Create a Game instance
-            game = Game(localization)
-            # Initialize game with default or empty tile lists
-            indoor_tiles = []
-            outdoor_tiles = []
-            # Load tiles from the file
-            indoor_tiles, outdoor_tiles = Tile.load_tiles("game_data.json")
+            # Game data is parsed once and shared by every game started here
+            catalog = load_catalog("game_data.json")
+            game = Game(localization, catalog=catalog)
+            engine = GameEngine(game)
+            indoor_tiles, outdoor_tiles = catalog.new_tiles()
             # Start a new game with loaded tiles
-            game.start_game(indoor_tiles, outdoor_tiles)
+            play(engine, engine.start(indoor_tiles, outdoor_tiles))
+        elif choice == "load":
+            localization = get_langauge_code()
+            game = Game(localization, catalog=load_catalog("game_data.json"))
+            engine = GameEngine(game)
+            try:
+                game.load_game("game_save.zimp")
+            except (OSError, ValueError) as e:
+                print(f"Could not load the saved game: {e}")
+                continue
+            play(engine, engine.resume())
         elif choice == "quit":
             # Exit the game loop
             print("Exiting the game. Goodbye!")
             break
         else:
             # Handle invalid input
-            print("Invalid choice. Please select 'start' or 'quit'.")
+            print("Invalid choice. Please select 'start', 'load' or 'quit'.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,460 @@
+"""
+Batch engine: the card side of many games at once, on NumPy arrays.
+
+    python -m models.batch_engine --seed 1 --compare 5000
+
+BatchEngine advances N games in lockstep, one turn per step(). A turn is
+what Game.play_turns does once the player has moved: the time check,
+drawing a dev card and resolving its event at the current hour, with
+Game.resolve_combat, attack_points_update and the strategies' rules
+applied to every game at once. A game is won once it has survived
+``turns`` turns before midnight, as in the expectimax solver; the map is
+left out. Decisions follow CautiousPolicy and can be changed by
+overriding the decide_* methods, which answer for every game at once.
+
+State is a struct of arrays, one entry per game:
+
+    health, attack, time, chainsaw_count, turns_left    small ints
+    deck, top       each game's card order and the index of its next card
+    items           the two items held, oldest first, as card indexes
+    outcome         PLAYING, WON, KILLED or OUT_OF_TIME
+
+Cards are indexes into catalog.dev_cards. Items are kept in order rather
+than as a bitset since the rules drop the oldest item for a new one and
+the same item can be drawn twice after a reshuffle; item_bits() gives the
+bitset of held dev card ids. Every rule runs over all the arrays with a
+bool mask of the games it applies to, so finished games are masked out
+rather than gathered and scattered back.
+
+play_cards() plays the same turns on a real Game through its own
+methods, one game at a time, for checking and for timing the batch
+engine against. The cautious rules never get a player killed in the
+card game, so the benchmark plays FighterBatchEngine against
+FighterPolicy by default, which over 16 turns from 6 health wins,
+dies and runs out of time in about 37/49/14 proportions. How much
+faster the batch engine is depends on the machine, the game count and
+the turns, as its fixed costs are spread over the games. On one core,
+with the default 1,000,000 games, it has measured between 98 and 102
+times, so the 100 times aimed for is not met on every run; at 200,000
+games it measures about 75 to 80 times and at 100,000 about 60.
+"""
+import argparse
+from collections import Counter
+import functools
+import itertools
+import json
+import math
+import random
+import time as _time
+
+try:
+    import numpy as np
+except ImportError:  # only needed by BatchEngine
+    np = None
+
+from models.card_events import HOURS
+from models.catalog import load_catalog
+from models.engine import decision_point
+from models.game import Game
+from models.localization import load as load_localization
+from models.player import Player
+from models.policies import CautiousPolicy
+from models.seeding import child_seed
+
+
+PLAYING, WON, KILLED, OUT_OF_TIME = range(4)
+OUTCOMES = ("playing", "won", "killed", "out_of_time")
+
+# Event kinds as codes
+MESSAGE, ZOMBIES, HEALTH, ITEM = range(4)
+_KINDS = {"message": MESSAGE, "zombies": ZOMBIES, "health": HEALTH, "item": ITEM}
+
+EMPTY = -1  # an item slot with nothing in it
+_MISSING = -2  # an item the catalog has no card for; never held
+
+_BURNED = 2  # cards a reshuffle discards unseen, as Game.shuffle_dev_card
+
+# Up to this many cards, shuffles pick from a table of every order
+_MAX_TABLED_CARDS = 9
+
+
+@functools.lru_cache(maxsize=None)
+def _orders(cards):
+    """Every order of ``cards`` card indexes, one per row (9! rows take 3 MB)."""
+    orders = itertools.chain.from_iterable(itertools.permutations(range(cards)))
+    return np.fromiter(orders, dtype=np.int8,
+                       count=math.factorial(cards) * cards).reshape(-1, cards)
+
+
+class BatchEngine:
+    """
+    ``games`` games of the card rules of ``catalog`` played side by side,
+    each starting with ``health`` and needing ``turns`` turns to win.
+    """
+
+    def __init__(self, catalog, games, seed=None, health=6, turns=8):
+        if np is None:
+            raise RuntimeError("The batch engine needs NumPy (pip install numpy).")
+        cards = catalog.dev_cards
+        self.card_ids = np.array([card.id for card in cards], dtype=np.int16)
+        self.attack_of = np.array([card.attack_points for card in cards], dtype=np.int16)
+        # Indexed by an item slot, so EMPTY (-1) reads the 0 on the end
+        self._attack_or_none = np.append(self.attack_of, 0)
+        self._bit_or_none = np.append(1 << self.card_ids.astype(np.int32), 0)
+        # The event of card c at HOURS[h] is at c * len(HOURS) + h
+        events = len(cards) * len(HOURS)
+        self.kinds = np.zeros(events, dtype=np.int8)
+        self.zombies = np.zeros(events, dtype=np.int16)
+        self.health_change = np.zeros(events, dtype=np.int16)
+        for index, card in enumerate(cards):
+            for hour_index, hour in enumerate(HOURS):
+                event = catalog.events[card.id, hour]
+                if event.kind not in _KINDS:
+                    raise ValueError(
+                        f"Dev card {card.id} at {hour}:00: no batch rules for "
+                        f"'{event.kind}' events."
+                    )
+                at = index * len(HOURS) + hour_index
+                self.kinds[at] = _KINDS[event.kind]
+                self.zombies[at] = event.zombies
+                self.health_change[at] = event.health
+
+        def card_of(item):
+            card = catalog.cards_by_item.get(item)
+            return cards.index(card) if card is not None else _MISSING
+
+        self.oil = card_of("Oil")
+        self.gasoline = card_of("Gasoline")
+        self.chainsaw = card_of("Chainsaw")
+        self.candle = card_of("Candle")
+        self.soda = card_of("Can of soda")
+
+        self.rng = np.random.default_rng(seed)
+        self.turn = 0
+        self.health = np.full(games, health, dtype=np.int16)
+        self.attack = np.ones(games, dtype=np.int16)
+        self.time = np.full(games, HOURS[0], dtype=np.int8)
+        self.chainsaw_count = np.full(games, 2, dtype=np.int16)
+        self.turns_left = np.full(games, turns, dtype=np.int16)
+        self.items = np.full((games, 2), EMPTY, dtype=np.int8)
+        self.outcome = np.full(games, PLAYING, dtype=np.int8)
+        self.deck = np.empty((games, len(cards)), dtype=np.int8)
+        self.top = np.empty(games, dtype=np.int8)
+        # Where each game's deck starts in the flattened decks
+        self._deck_start = np.arange(games, dtype=np.intp) * len(cards)
+        self._shuffle(np.ones(games, dtype=bool))
+
+    def __len__(self):
+        return len(self.outcome)
+
+    @property
+    def playing(self):
+        return int(np.count_nonzero(self.outcome == PLAYING))
+
+    def run(self, max_turns=None):
+        """Steps until every game has finished, or ``max_turns`` more turns."""
+        turns = 0
+        while self.playing and (max_turns is None or turns < max_turns):
+            self.step()
+            turns += 1
+        return self
+
+    def step(self):
+        """Plays one turn of every game still playing; returns how many still are."""
+        playing = self.outcome == PLAYING
+        if not playing.any():
+            return 0
+        # Game.check_last_card_in_dev, then the midnight check
+        self._refill(playing)
+        late = playing & (self.time > HOURS[-1])
+        self.outcome[late] = OUT_OF_TIME
+        playing &= ~late
+
+        self._resolve(playing, self._draw(playing))
+
+        dead = playing & (self.health <= 0)
+        self.outcome[dead] = KILLED
+        playing &= ~dead
+        self.turns_left -= playing
+        done = playing & (self.turns_left <= 0)
+        in_time = self.time <= HOURS[-1]
+        self.outcome[done & in_time] = WON
+        self.outcome[done & ~in_time] = OUT_OF_TIME
+        self.turn += 1
+        return self.playing
+
+    def counts(self):
+        """Returns the number of games per outcome name."""
+        totals = np.bincount(self.outcome, minlength=len(OUTCOMES))
+        return {name: int(total) for name, total in zip(OUTCOMES, totals)}
+
+    def item_bits(self):
+        """Returns, per game, the bitset of dev card ids whose items are held."""
+        return self._bit_or_none[self.items[:, 0]] | self._bit_or_none[self.items[:, 1]]
+
+    # Decisions. Each is asked about every game and answers with one value
+    # per game, of which only those where the bool array ``games`` is set
+    # are used; decide_replace gets the three items of just those games.
+
+    def decide_cower(self, games):
+        """Cower when the low health rules ask (health 2 or less)."""
+        return games
+
+    def decide_fight(self, games, zombies):
+        """Fight when the damage leaves more than 1 health, else run."""
+        damage = np.maximum(0, zombies - self.attack)
+        return damage < self.health - 1
+
+    def decide_take_item(self, games):
+        return games
+
+    def decide_combine(self, games):
+        """Combine gasoline and chainsaw before a fight."""
+        return games
+
+    def decide_replace(self, games, held):
+        """Returns which of the three items ``held`` to drop: the oldest."""
+        return np.zeros(len(held), dtype=np.intp)
+
+    # The rules. Every step works on all games at once and changes only
+    # those where its bool array is set.
+
+    def _shuffle(self, games):
+        """Game.shuffle_dev_card for the games in ``games``."""
+        count, cards = np.count_nonzero(games), self.deck.shape[1]
+        if cards <= _MAX_TABLED_CARDS:
+            orders = _orders(cards)
+            self.deck[games] = orders[self.rng.integers(0, len(orders), count)]
+        else:
+            keys = self.rng.random((count, cards), dtype=np.float32)
+            self.deck[games] = np.argsort(keys, axis=1)
+        self.top[games] = _BURNED
+
+    def _refill(self, games):
+        """Reshuffles the games out of cards, moving their clock on."""
+        empty = games & (self.top >= self.deck.shape[1])
+        if empty.any():
+            self._shuffle(empty)
+            self.time[empty] += 1
+
+    def _draw(self, games):
+        """Game.get_card: returns the card on top of every game's deck."""
+        self._refill(games)
+        top = np.minimum(self.top, self.deck.shape[1] - 1)
+        cards = self.deck.reshape(-1)[self._deck_start + top]
+        self.top += games
+        return cards
+
+    def _holds(self, item):
+        return (self.items[:, 0] == item) | (self.items[:, 1] == item)
+
+    def _resolve(self, games, cards):
+        """Game.resolve_dev_card with ``cards`` in the games in ``games``."""
+        hour = self.time - HOURS[0]
+        games = games & (hour >= 0) & (hour < len(HOURS))
+        event = cards.astype(np.intp) * len(HOURS) + np.clip(hour, 0, len(HOURS) - 1)
+
+        # LowHealthStrategy, whatever the card says
+        low = games & (self.health <= 2)
+        self._cower(low & self.decide_cower(low))
+        games &= ~low
+
+        kind = self.kinds[event]
+        attacked = games & (kind == ZOMBIES)
+        zombies = self.zombies[event]
+        fight = attacked & self.decide_fight(attacked, zombies)
+        self._fight(fight, zombies)
+        self._run(attacked & ~fight)
+        changed = games & (kind == HEALTH)
+        self.health = np.where(
+            changed, np.maximum(0, self.health + self.health_change[event]), self.health
+        )
+        offered = games & (kind == ITEM)
+        self._take_item(offered & self.decide_take_item(offered))
+
+    def _cower(self, games):
+        """Game.cower: 3 health for the top card, or for the reshuffle."""
+        self.health += 3 * games
+        left = games & (self.top < self.deck.shape[1])
+        self.top += left
+        self._refill(games & ~left)
+
+    def _run(self, games):
+        """ZombieFightStrategy running away: 1 health."""
+        self.health -= games & (self.health > 0)
+
+    def _fight(self, games, zombies):
+        """Game.item_usage and resolve_combat."""
+        combining = games & self._holds(self.gasoline) & self._holds(self.chainsaw)
+        if combining.any():
+            combining &= self.decide_combine(combining)
+            self.chainsaw_count += 2 * combining
+            self._discard(combining, self.gasoline)
+
+        # A candle with oil or gasoline burns the zombies and both items; a
+        # player holds at most two in a fight. The attack stays as it was.
+        burning = games & self._holds(self.candle) & (
+            self._holds(self.oil) | self._holds(self.gasoline)
+        )
+        self.items[burning] = EMPTY
+        hit = games & ~burning
+        damage = np.maximum(0, zombies - self.attack)
+        self.health = np.where(hit, np.maximum(0, self.health - damage), self.health)
+
+    def _discard(self, games, item):
+        """Removes one ``item`` from the games' items, keeping the rest in order."""
+        first, second = self.items[:, 0], self.items[:, 1]
+        shift = games & (first == item)
+        first[shift] = second[shift]
+        second[shift] = EMPTY
+        second[games & ~shift & (second == item)] = EMPTY
+
+    def _take_item(self, games):
+        """ItemAcquisitionStrategy taking an item: draw it and equip."""
+        if not games.any():
+            return
+        cards = self._draw(games)
+        first, second = self.items[:, 0], self.items[:, 1]
+        # Items are kept packed to the front, so a second item means two
+        full = games & (second != EMPTY)
+        into_first = games & (first == EMPTY)
+        into_second = games & ~full & ~into_first
+        if full.any():
+            three = np.column_stack((first[full], second[full], cards[full]))
+            drop = self.decide_replace(full, three)
+            first[full] = np.where(drop == 0, three[:, 1], three[:, 0])
+            second[full] = np.where(drop == 2, three[:, 1], three[:, 2])
+        first[into_first] = cards[into_first]
+        second[into_second] = cards[into_second]
+        self._equip(games)
+
+    def _equip(self, games):
+        """Game.attack_points_update: attack from the items, and soda's 2 health."""
+        first, second = self.items[:, 0], self.items[:, 1]
+        attack = 1 + self._attack_or_none[first] + self._attack_or_none[second]
+        self.attack = np.where(games, attack, self.attack)
+        soda = (first == self.soda) & games
+        soda_too = (second == self.soda) & games
+        self.health += 2 * soda + 2 * soda_too
+
+
+class FighterBatchEngine(BatchEngine):
+    """Fights every zombie, otherwise decides like BatchEngine."""
+
+    def decide_fight(self, games, zombies):
+        return games
+
+
+class FighterPolicy(CautiousPolicy):
+    """FighterBatchEngine's decisions, for a Game."""
+
+    def choose(self, game, prompt):
+        if prompt.key == "fight":
+            return "fight"
+        return super().choose(game, prompt)
+
+
+# The batch engine and matching Game policy the benchmark can play
+ENGINES = {
+    "cautious": (BatchEngine, CautiousPolicy),
+    "fighter": (FighterBatchEngine, FighterPolicy),
+}
+
+
+class _PolicyIO:
+    """Answers a game's prompts with a policy and drops its messages."""
+
+    def __init__(self, game, policy):
+        self.game = game
+        self.policy = policy
+
+    def ask(self, prompt):
+        return self.policy.choose(self.game, prompt)
+
+    def emit(self, event):
+        pass
+
+
+@decision_point
+def _card_turns(game, turns):
+    """BatchEngine.step's turns, played by the Game's own rules."""
+    for _ in range(turns):
+        game.check_last_card_in_dev()
+        if game.time > HOURS[-1]:
+            game.outcome = "out_of_time"
+            return
+        card = yield from game.get_card()
+        yield from game.resolve_dev_card(card)
+        if game.player.health <= 0:
+            game.outcome = "killed"
+            return
+    game.outcome = "won" if game.time <= HOURS[-1] else "out_of_time"
+
+
+def play_cards(game, policy, turns=8, health=6):
+    """
+    Plays the card side of a new game on ``game`` with ``policy`` for
+    ``turns`` turns, one card at a time, and returns its outcome name.
+    """
+    io = _PolicyIO(game, policy)
+    game.io = io
+    game.reset_game()
+    game.load_dev_cards()
+    game.shuffle_dev_card()
+    game.player = Player(game.localization, (), (), health, io=io)
+    _card_turns(game, turns)  # run through game.io
+    return game.outcome
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Play the card side of many games at once and time it."
+    )
+    parser.add_argument("--games", type=int, default=1000000)
+    parser.add_argument("--turns", type=int, default=16)
+    parser.add_argument("--health", type=int, default=6)
+    parser.add_argument("--policy", choices=sorted(ENGINES), default="fighter")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare", type=int, default=2000,
+                        help="games to play one at a time with Game for comparison")
+    args = parser.parse_args(argv)
+
+    catalog = load_catalog()
+    engine_class, policy_class = ENGINES[args.policy]
+    started = _time.perf_counter()
+    engine = engine_class(catalog, args.games, seed=args.seed, health=args.health,
+                          turns=args.turns).run()
+    batch_seconds = _time.perf_counter() - started
+    report = {
+        "games": args.games,
+        "turns": args.turns,
+        "health": args.health,
+        "policy": args.policy,
+        "outcomes": engine.counts(),
+        "seconds": round(batch_seconds, 3),
+        "games_per_second": round(args.games / batch_seconds),
+    }
+
+    if args.compare:
+        localization = load_localization("en")
+        outcomes = Counter()
+        started = _time.perf_counter()
+        for index in range(args.compare):
+            seed = child_seed(args.seed, index)
+            game = Game(localization, seed=seed, catalog=catalog)
+            policy = policy_class(random.Random(child_seed(seed, "policy")))
+            outcomes[play_cards(game, policy, args.turns, args.health)] += 1
+        game_seconds = _time.perf_counter() - started
+        report["game"] = {
+            "games": args.compare,
+            "outcomes": dict(outcomes),
+            "games_per_second": round(args.compare / game_seconds),
+        }
+        report["speedup"] = round(
+            (args.games / batch_seconds) / (args.compare / game_seconds), 1
+        )
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+from collections import namedtuple
+import functools
+import re
+
+
+# The hours a dev card has an event for, in card order
+HOURS = (9, 10, 11)
+
+# One event printed on a dev card, parsed from its text.
+#   kind: "zombies", "health", "item" or "message"
+#   zombies: how many zombies attack (0 unless kind is "zombies")
+#   health: the health change (0 unless kind is "health")
+#   item: True when the player may draw an item
+CardEvent = namedtuple("CardEvent", "kind text zombies health item")
+
+# Extra parsers registered for new event kinds, tried before the built-in rules
+_PARSERS = []
+
+_ZOMBIES = re.compile(r"^\s*(\d+)\s+zombies\.?\s*$", re.IGNORECASE)
+_HEALTH = re.compile(r"([+-]\d+)\s*health\.?\s*$", re.IGNORECASE)
+_ITEM = re.compile(r"^\s*item\.?\s*$", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=None)
+def parse_event(text):
+    """
+    Parses the text of one card event. Raises ValueError for text that
+    mentions zombies, health or an item but does not follow the card format.
+    """
+    for parser in _PARSERS:
+        event = parser(text)
+        if event is not None:
+            return event
+    lowered = text.lower()
+    if "zombies" in lowered:
+        match = _ZOMBIES.match(text)
+        if match is None:
+            raise ValueError(f"Malformed zombie event '{text}'.")
+        return CardEvent("zombies", text, int(match.group(1)), 0, False)
+    if "health" in lowered:
+        match = _HEALTH.search(text)
+        if match is None:
+            raise ValueError(f"Malformed health event '{text}'.")
+        return CardEvent("health", text, 0, int(match.group(1)), False)
+    if "item" in lowered:
+        if _ITEM.match(text) is None:
+            raise ValueError(f"Malformed item event '{text}'.")
+        return CardEvent("item", text, 0, 0, True)
+    return CardEvent("message", text, 0, 0, False)
+
+
+def add_event_parser(parser):
+    """
+    Adds ``parser(text)``, which returns a CardEvent for the texts it
+    recognises and None otherwise. Catalogs loaded earlier keep their events.
+    """
+    _PARSERS.append(parser)
+    parse_event.cache_clear()
+
+
+def remove_event_parser(parser):
+    """Removes a parser added with add_event_parser()."""
+    _PARSERS.remove(parser)
+    parse_event.cache_clear()
+
+
+def event_table(cards):
+    """Returns {(card id, hour): CardEvent} for ``cards``, parsing every event once."""
+    table = {}
+    for card in cards:
+        for hour in HOURS:
+            try:
+                table[card.id, hour] = parse_event(card.activity_at(hour))
+            except ValueError as e:
+                raise ValueError(f"Dev card {card.id} at {hour}:00: {e}")
+    return table
@@ -0,0 +1,149 @@
+from collections import namedtuple
+import functools
+import json
+import os
+from types import MappingProxyType
+
+from models.card_events import event_table
+from models.dev_cards import DevCards
+from models.tiles import IndoorTile, OutdoorTile
+
+
+# The printed side of a tile. Games get their own Tile objects built from
+# these, since tiles are rotated and opened up during play.
+TileSpec = namedtuple("TileSpec", "tile_id name walls special environment")
+
+
+class Catalog(namedtuple(
+    "Catalog",
+    "dev_cards indoor_tiles outdoor_tiles cards_by_id cards_by_item events "
+    "tiles_by_ref",
+)):
+    """
+    Everything game_data.json defines, parsed and checked once per process.
+
+    A catalog is immutable and shared by every Game: cards are never changed
+    during play and tiles are handed out as fresh copies by new_tiles().
+    ``events`` maps (card id, hour) to the parsed CardEvent for that hour
+    and ``tiles_by_ref`` maps (environment, tile id) to the tile's TileSpec.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_data(cls, data):
+        """Builds a catalog from parsed game data, rejecting malformed entries."""
+        try:
+            dev_cards = tuple(
+                DevCards(
+                    id=card["id"],
+                    activity_at_nine=card["9:00"],
+                    activity_at_ten=card["10:00"],
+                    activity_at_eleven=card["11:00"],
+                    item=card["item"],
+                    attack_points=card["attack_points"],
+                )
+                for card in data["devCard"]
+            )
+            outdoor_tiles = tuple(
+                _tile_spec(tile, "Outdoor") for tile in data["tilesCard"][0]["outDoor"]
+            )
+            indoor_tiles = tuple(
+                _tile_spec(tile, "Indoor") for tile in data["tilesCard"][1]["inDoor"]
+            )
+        except KeyError as e:
+            raise ValueError(f"Missing key in JSON data: {e}")
+
+        _check_unique("dev card", [card.id for card in dev_cards])
+        _check_unique("indoor tile", [tile.tile_id for tile in indoor_tiles])
+        _check_unique("outdoor tile", [tile.tile_id for tile in outdoor_tiles])
+        for card in dev_cards:
+            if not isinstance(card.attack_points, int):
+                raise ValueError(f"Dev card {card.id} has invalid attack points.")
+        if not any(tile.name == "Foyer" for tile in indoor_tiles):
+            raise ValueError("Game data has no Foyer tile to start on.")
+        events = event_table(dev_cards)
+
+        cards_by_id = {}
+        cards_by_item = {}
+        for card in dev_cards:
+            cards_by_id[card.id] = card
+            cards_by_item.setdefault(card.item, card)
+
+        return cls(
+            dev_cards,
+            indoor_tiles,
+            outdoor_tiles,
+            MappingProxyType(cards_by_id),
+            MappingProxyType(cards_by_item),
+            MappingProxyType(events),
+            MappingProxyType({
+                (tile.environment, tile.tile_id): tile
+                for tile in indoor_tiles + outdoor_tiles
+            }),
+        )
+
+    @property
+    def card_ids(self):
+        """Ids of every dev card, in the order the deck is rebuilt from."""
+        return tuple(self.cards_by_id)
+
+    def item_attack_points(self, item):
+        """Returns the attack bonus of ``item``, or None if no card has it."""
+        card = self.cards_by_item.get(item)
+        return card.attack_points if card is not None else None
+
+    def new_tile(self, environment, tile_id):
+        """Returns a fresh tile for the (environment, tile id) reference."""
+        spec = self.tiles_by_ref.get((environment, tile_id))
+        if spec is None:
+            raise ValueError(f"No {environment} tile with id {tile_id} in game data.")
+        tile_class = IndoorTile if environment == "Indoor" else OutdoorTile
+        return tile_class(spec.tile_id, spec.name, spec.walls, spec.special)
+
+    def new_tiles(self):
+        """Returns fresh (indoor_tiles, outdoor_tiles) lists for one game."""
+        indoor_tiles = [
+            IndoorTile(spec.tile_id, spec.name, spec.walls, spec.special)
+            for spec in self.indoor_tiles
+        ]
+        outdoor_tiles = [
+            OutdoorTile(spec.tile_id, spec.name, spec.walls, spec.special)
+            for spec in self.outdoor_tiles
+        ]
+        return indoor_tiles, outdoor_tiles
+
+
+def _tile_spec(tile_data, environment):
+    walls = tuple(tile_data["wall"])
+    if len(walls) != 4 or any(wall not in (0, 1) for wall in walls):
+        raise ValueError(
+            f"{environment} tile {tile_data['id']} has invalid walls {list(walls)}."
+        )
+    return TileSpec(
+        tile_data["id"], tile_data["name"], walls, tile_data["special"], environment
+    )
+
+
+def _check_unique(kind, ids):
+    seen = set()
+    for item_id in ids:
+        if item_id in seen:
+            raise ValueError(f"Duplicate {kind} id {item_id} in game data.")
+        seen.add(item_id)
+
+
+def load_catalog(file_path="game_data.json"):
+    """Returns the catalog for ``file_path``, parsing the file only the first time."""
+    if not file_path.endswith(".json"):
+        raise ValueError("The file must be a JSON file.")
+    return _load_catalog(os.path.abspath(file_path))
+
+
+@functools.lru_cache(maxsize=None)
+def _load_catalog(file_path):
+    try:
+        with open(file_path, "r") as f:
+            data = json.load(f)
+    except (IOError, json.JSONDecodeError) as e:
+        raise RuntimeError(f"Error reading JSON file: {e}")
+    return Catalog.from_data(data)
@@ -0,0 +1,34 @@
+from collections import Counter, deque
+from itertools import islice
+
+
+class Deck(deque):
+    """
+    A draw pile. The top of the deck is the left end, so drawing, peeking
+    and burning cost the same however many cards are left.
+    """
+    __slots__ = ()
+
+    def draw(self):
+        """Removes and returns the top card. Raises IndexError when empty."""
+        return self.popleft()
+
+    def peek(self, count=1):
+        """Returns the top ``count`` cards without drawing them."""
+        return tuple(islice(self, count))
+
+    def burn(self, count=1):
+        """Discards up to ``count`` cards from the top."""
+        for _ in range(min(count, len(self))):
+            self.popleft()
+
+    def reshuffle(self, rng, cards=None):
+        """Shuffles the deck with ``rng``, first refilling it with ``cards`` if given."""
+        order = list(self if cards is None else cards)
+        rng.shuffle(order)
+        self.clear()
+        self.extend(order)
+
+    def composition(self, key=None):
+        """Counts the cards left, grouped by ``key(card)`` if given."""
+        return Counter(self if key is None else map(key, self))
@@ -1,19 +1,13 @@
-class DevCards:
-    def __init__(
-        self,
-        id,
-        activity_at_nine,
-        activity_at_ten,
-        activity_at_eleven,
-        item,
-        attack_points,
-    ):
-        self.id = id
-        self.activity_at_nine = activity_at_nine
-        self.activity_at_ten = activity_at_ten
-        self.activity_at_eleven = activity_at_eleven
-        self.item = item
-        self.attack_points = attack_points
+from collections import namedtuple
+
+
+class DevCards(namedtuple(
+    "DevCards",
+    "id activity_at_nine activity_at_ten activity_at_eleven item attack_points",
+)):
+    """A development card. Cards are never changed during play, so one
+    immutable tuple per card is shared by every game."""
+    __slots__ = ()
 
     def get_id(self):
         return self.id
@@ -27,6 +21,10 @@ class DevCards:
     def get_activity_at_eleven(self):
         return self.activity_at_eleven
 
+    def activity_at(self, hour):
+        """Returns the event text for ``hour`` (9, 10 or 11)."""
+        return self[hour - 8]
+
     def get_item(self):
         return self.item
 
@@ -0,0 +1,151 @@
+from collections import namedtuple
+from contextvars import ContextVar
+import functools
+
+
+# A decision the rules are waiting on. ``key`` names the kind of decision
+# (e.g. "fight", "draw_item", "move") so bots can answer without parsing the
+# localized ``text``; ``options`` lists the answers the rules understand and
+# ``context`` carries any numbers behind the question (e.g. zombie count).
+Prompt = namedtuple("Prompt", "key text options context", defaults=(None,))
+
+# Something the rules want the player to see. ``key`` is the localization key
+# the text came from, or a short name for messages that are not localized.
+Event = namedtuple("Event", "key text")
+
+# True while a generator of game steps is being driven by run_steps or a
+# GameEngine, so nested decision points hand back their generator instead of
+# answering themselves.
+_driving = ContextVar("driving", default=False)
+
+
+def decision_point(method):
+    """
+    Marks a generator method that yields Prompts and receives the answers.
+
+    Inside a running engine the call returns the generator, so callers write
+    ``answer = yield from self.get_card()``. Called from plain code (a test,
+    a script) the steps are run to completion straight away, answering each
+    prompt through the owner's ``io``.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        steps = method(self, *args, **kwargs)
+        if _driving.get():
+            return steps
+        return run_steps(steps, self.io)
+    return wrapper
+
+
+def run_steps(steps, io):
+    """Runs a generator of game steps, asking ``io`` for every decision."""
+    token = _driving.set(True)
+    try:
+        answer = None
+        while True:
+            try:
+                prompt = steps.send(answer)
+            except StopIteration as stop:
+                return stop.value
+            answer = io.ask(prompt)
+    finally:
+        _driving.reset(token)
+
+
+class ConsoleIO:
+    """Terminal front-end: prompts go to input(), events go to print()."""
+
+    def ask(self, prompt):
+        return input(prompt.text)
+
+    def emit(self, event):
+        print(event.text)
+
+
+class Reporter:
+    """Mixin for objects that report to a front-end through ``self.io``."""
+    __slots__ = ()
+
+    def emit(self, text, key=None):
+        """Sends a message to the front-end."""
+        self.io.emit(Event(key, text))
+
+    def say(self, key, **fields):
+        """Sends the localized message ``key``, formatted with ``fields``."""
+        if fields:
+            text = self.localization.format(key, **fields)
+        else:
+            text = self.localization[key]
+        self.io.emit(Event(key, text))
+
+
+class GameEngine:
+    """
+    Headless driver for a Game.
+
+    The engine never reads from or writes to the terminal: every call takes
+    the answer to the pending prompt and returns the events emitted until the
+    rules need the next decision.
+
+        engine = GameEngine(game)
+        events = engine.start(indoor_tiles, outdoor_tiles)
+        while not engine.done:
+            events = engine.step(choose(engine.prompt))
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.prompt = None
+        self.done = False
+        self._steps = None
+        self._events = []
+        game.io = self
+
+    def emit(self, event):
+        self._events.append(event)
+
+    def ask(self, prompt):
+        raise RuntimeError("GameEngine answers prompts through step()")
+
+    def start(self, indoor_tiles, outdoor_tiles):
+        """Starts a new game and runs it up to the first decision."""
+        token = _driving.set(True)
+        try:
+            steps = self.game.start_game(indoor_tiles, outdoor_tiles)
+        finally:
+            _driving.reset(token)
+        return self._run(steps)
+
+    def resume(self):
+        """Continues a game restored with Game.load_game up to its next decision."""
+        self.game.player.io = self
+        token = _driving.set(True)
+        try:
+            steps = self.game.resume_game()
+        finally:
+            _driving.reset(token)
+        return self._run(steps)
+
+    def step(self, decision):
+        """Answers the pending prompt and runs up to the next decision."""
+        if self.prompt is None:
+            raise RuntimeError("The game is not waiting for a decision.")
+        return self._advance(decision)
+
+    def _run(self, steps):
+        self._steps = steps
+        self.prompt = None
+        self.done = False
+        return self._advance(None)
+
+    def _advance(self, answer):
+        token = _driving.set(True)
+        try:
+            self.prompt = self._steps.send(answer)
+        except StopIteration:
+            self.prompt = None
+            self.done = True
+        finally:
+            _driving.reset(token)
+        events, self._events = self._events, []
+        return events
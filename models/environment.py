@@ -0,0 +1,455 @@
+"""
+Gym-style environments: Game behind reset() and step(action).
+
+    env = ZimpEnv()
+    observation, info = env.reset(seed=1)
+    while True:
+        action = pick(observation, info["action_mask"])
+        observation, reward, terminated, truncated, info = env.step(action)
+        if terminated or truncated:
+            break
+
+Every prompt the engine would hand to input() becomes one step. Actions
+are indexes into ``env.actions``, the answers any prompt can take: the
+four directions, fight / run, cower / continue, y / n and the numbered
+choices "1" up to one per tile (run_away lists every tile visited). The
+action mask marks the options of the pending prompt, which for a move
+are the exits Player.get_move_direction offers; saving is never one.
+
+An observation is a fixed-size float32 vector:
+
+    health, attack points, time, chainsaw uses, has totem, cards left,
+    outdoors, zombies attacking (in a fight prompt, else 0)
+    per dev card: copies left in Game.id_order      (one per card)
+    per dev card: copies of its item held           (one per card)
+    per direction: the current tile has an exit     (left, up, right, down)
+    per direction: the cell that way is explored
+    per prompt key in PROMPT_KEYS: the pending prompt is of that kind
+
+A game won scores 1 and a game lost, killed or out of time, scores -1;
+every other step scores 0. A game still going after ``max_decisions``
+steps is truncated.
+
+VectorEnv steps many environments in this process and SubprocVectorEnv
+spreads them over worker processes. Both reset finished environments
+on their own and return observations, masks, rewards and flags as
+arrays, one row per environment. SubprocVectorEnv keeps all of those,
+and the actions, in one shared memory block, so a step only sends each
+worker a one-word command.
+"""
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+import random
+
+try:
+    import numpy as np
+except ImportError:  # only needed by the environments
+    np = None
+
+from enums.directions import Direction
+from models.catalog import load_catalog
+from models.engine import GameEngine
+from models.game import Game
+from models.grid import step as step_from
+from models.localization import load as load_localization
+from models.seeding import child_seed
+
+
+# The kinds of prompt the rules ask, in observation order
+PROMPT_KEYS = (
+    "move", "draw_card", "fight", "run_away", "cower", "draw_item",
+    "replace_item", "use_item", "combine_items", "place_patio", "bury_totem",
+    "dead_end", "zombie_door",
+)
+
+# Game.outcome as a code in VectorEnv.outcomes; "stalled" is a truncated game
+OUTCOMES = ("playing", "won", "killed", "out_of_time", "stalled")
+
+_REWARDS = {"won": 1.0, "killed": -1.0, "out_of_time": -1.0}
+_SCALARS = 8
+_DIRECTIONS = tuple(Direction)
+
+
+def action_names(catalog):
+    """Returns every answer an environment over ``catalog`` can give, in action order."""
+    choices = max(4, len(catalog.indoor_tiles) + len(catalog.outdoor_tiles))
+    return (tuple(d.name.lower() for d in _DIRECTIONS)
+            + ("fight", "run", "cower", "continue", "y", "n")
+            + tuple(str(number) for number in range(1, choices + 1)))
+
+
+def observation_size(catalog):
+    return _SCALARS + 2 * len(catalog.dev_cards) + 2 * len(_DIRECTIONS) + len(PROMPT_KEYS)
+
+
+class ZimpEnv:
+    """
+    One game at a time, with the ``language`` messages and the dev cards
+    and tiles of ``catalog``.
+    """
+
+    def __init__(self, language="en", catalog=None, max_decisions=2000):
+        if np is None:
+            raise RuntimeError("The environments need NumPy (pip install numpy).")
+        self.localization = load_localization(language)
+        self.catalog = catalog if catalog is not None else load_catalog()
+        self.max_decisions = max_decisions
+        self.actions = action_names(self.catalog)
+        self.observation_size = observation_size(self.catalog)
+        self._action_index = {name: index for index, name in enumerate(self.actions)}
+        self._card_slot = {card.id: slot for slot, card in enumerate(self.catalog.dev_cards)}
+        self._item_slot = {card.item: slot
+                           for slot, card in reversed(list(enumerate(self.catalog.dev_cards)))}
+        self._prompt_slot = {key: slot for slot, key in enumerate(PROMPT_KEYS)}
+        self._masks = {}  # prompt options -> action mask
+        self._seed = None
+        self._episode = 0
+        self.game = None
+        self.engine = None
+        self.decisions = 0
+        self.over = True  # terminated or truncated; step() needs a reset() first
+
+    @property
+    def action_count(self):
+        return len(self.actions)
+
+    def reset(self, seed=None, out=None):
+        """
+        Starts a new game and returns (observation, info). A ``seed``
+        restarts the sequence of game seeds, so the same seed replays the
+        same games; without one the sequence goes on. The observation is
+        written to ``out`` if given.
+        """
+        if seed is not None or self._seed is None:
+            self._seed = seed if seed is not None else random.getrandbits(64)
+            self._episode = 0
+        game_seed = child_seed(self._seed, self._episode)
+        self._episode += 1
+        self.game = Game(self.localization, seed=game_seed, catalog=self.catalog)
+        self.engine = GameEngine(self.game)
+        self.engine.start(*self.catalog.new_tiles())
+        self.decisions = 0
+        self.over = self.engine.done
+        return self.observe(out), {"action_mask": self.action_mask(),
+                                   "seed": game_seed}
+
+    def step(self, action, out=None):
+        """
+        Answers the pending prompt with action number ``action`` and
+        returns (observation, reward, terminated, truncated, info).
+        """
+        if self.over:
+            raise RuntimeError("The game is over; call reset() first.")
+        answer = self.actions[action]
+        if answer not in self.engine.prompt.options:
+            raise ValueError(
+                f"Action '{answer}' is not an option of the "
+                f"'{self.engine.prompt.key}' prompt."
+            )
+        self.engine.step(answer)
+        self.decisions += 1
+        terminated = self.engine.done
+        truncated = not terminated and self.decisions >= self.max_decisions
+        outcome = self.game.outcome
+        if truncated:
+            outcome = "stalled"
+        self.over = terminated or truncated
+        reward = _REWARDS.get(outcome, 0.0) if terminated else 0.0
+        return self.observe(out), reward, terminated, truncated, {
+            "action_mask": self.action_mask(), "outcome": outcome,
+        }
+
+    def action_mask(self):
+        """Returns a bool array marking the actions the pending prompt accepts."""
+        if self.over:
+            return np.zeros(len(self.actions), dtype=bool)
+        options = self.engine.prompt.options
+        mask = self._masks.get(options)
+        if mask is None:
+            mask = np.zeros(len(self.actions), dtype=bool)
+            for option in options:
+                if option == "//save":
+                    continue
+                if option not in self._action_index:
+                    raise ValueError(f"No action answers '{option}'.")
+                mask[self._action_index[option]] = True
+            mask.flags.writeable = False
+            self._masks[options] = mask
+        return mask
+
+    def observe(self, out=None):
+        """Returns the observation of the current game, written to ``out`` if given."""
+        game = self.game
+        player = game.player
+        prompt = self.engine.prompt
+        cards = len(self._card_slot)
+        zombies = 0
+        if prompt is not None and prompt.key == "fight":
+            zombies = prompt.context["zombies"]
+        values = [
+            player.health, player.attack_points, game.time, game.chainsaw_count,
+            player.has_totem, len(game.id_order),
+            player.current_tile is not None and player.is_in_outdoor_area(), zombies,
+        ]
+        values += [0] * (2 * cards + 2 * len(_DIRECTIONS) + len(PROMPT_KEYS))
+
+        for card_id in game.id_order:
+            values[_SCALARS + self._card_slot[card_id]] += 1
+        at = _SCALARS + cards
+        for item in player.items:
+            slot = self._item_slot.get(item)
+            if slot is not None:
+                values[at + slot] += 1
+        at += cards
+        if player.current_tile is not None:
+            for direction in player.current_tile.get_exit_directions():
+                values[at + direction.value] = 1
+            for direction in _DIRECTIONS:
+                if step_from(player.position, direction) in player.grid:
+                    values[at + len(_DIRECTIONS) + direction.value] = 1
+        at += 2 * len(_DIRECTIONS)
+        if prompt is not None and prompt.key in self._prompt_slot:
+            values[at + self._prompt_slot[prompt.key]] = 1
+
+        if out is None:
+            return np.array(values, dtype=np.float32)
+        out[:] = values
+        return out
+
+
+def _buffer_layout(count, observations, actions):
+    """Returns [(name, shape, dtype, offset)] of a vector's arrays and their total size."""
+    layout = []
+    offset = 0
+    for name, shape, dtype in (
+        ("observations", (count, observations), np.float32),
+        ("action_masks", (count, actions), np.bool_),
+        ("rewards", (count,), np.float32),
+        ("terminated", (count,), np.bool_),
+        ("truncated", (count,), np.bool_),
+        ("outcomes", (count,), np.int8),
+        ("actions", (count,), np.int64),
+    ):
+        dtype = np.dtype(dtype)
+        offset = -(-offset // dtype.alignment) * dtype.alignment
+        layout.append((name, shape, dtype, offset))
+        offset += int(np.prod(shape)) * dtype.itemsize
+    return layout, offset
+
+
+def _arrays(layout, buffer):
+    return {name: np.ndarray(shape, dtype, buffer=buffer, offset=offset)
+            for name, shape, dtype, offset in layout}
+
+
+class _Rows:
+    """Resets and steps environments whose results go to rows of shared arrays."""
+
+    def __init__(self, envs, arrays, start):
+        self.envs = envs
+        self.arrays = arrays
+        self.start = start
+
+    def reset(self, seeds):
+        arrays = self.arrays
+        for row, (env, seed) in enumerate(zip(self.envs, seeds), self.start):
+            _, info = env.reset(seed, out=arrays["observations"][row])
+            arrays["action_masks"][row] = info["action_mask"]
+        arrays["rewards"][self.start:self.start + len(self.envs)] = 0.0
+        arrays["terminated"][self.start:self.start + len(self.envs)] = False
+        arrays["truncated"][self.start:self.start + len(self.envs)] = False
+        arrays["outcomes"][self.start:self.start + len(self.envs)] = 0
+
+    def step(self):
+        arrays = self.arrays
+        observations = arrays["observations"]
+        for row, env in enumerate(self.envs, self.start):
+            _, reward, terminated, truncated, info = env.step(
+                int(arrays["actions"][row]), out=observations[row]
+            )
+            arrays["rewards"][row] = reward
+            arrays["terminated"][row] = terminated
+            arrays["truncated"][row] = truncated
+            if terminated or truncated:
+                arrays["outcomes"][row] = OUTCOMES.index(info["outcome"] or "playing")
+                # The next game starts straight away, as a fresh row
+                _, info = env.reset(out=observations[row])
+            else:
+                arrays["outcomes"][row] = 0
+            arrays["action_masks"][row] = info["action_mask"]
+
+
+class VectorEnv:
+    """
+    ``count`` ZimpEnvs stepped together in this process. step() takes one
+    action per environment and returns (observations, rewards, terminated,
+    truncated, info) as arrays; an environment whose game ended has already
+    been reset, and info["outcome"] holds the OUTCOMES code of the game
+    that ended (0 while it goes on). The arrays are reused by every call.
+    ``seed`` seeds the first reset; later resets without a seed carry on
+    each environment's own sequence of games, like its autoresets.
+    """
+
+    def __init__(self, count, seed=None, language="en", max_decisions=2000):
+        self.envs = [ZimpEnv(language, max_decisions=max_decisions) for _ in range(count)]
+        first = self.envs[0]
+        self.actions = first.actions
+        self.observation_size = first.observation_size
+        self.seed = seed
+        self._seeded = False
+        self._layout, size = _buffer_layout(count, first.observation_size,
+                                            first.action_count)
+        self._setup(count, size)
+
+    def __len__(self):
+        return len(self.envs)
+
+    def _setup(self, count, size):
+        self.arrays = _arrays(self._layout, bytearray(size))
+        self._rows = _Rows(self.envs, self.arrays, 0)
+
+    def _seeds(self, seed):
+        if seed is None:
+            if self.seed is None or self._seeded:
+                # Each environment seeds itself, or moves on to its next game
+                return [None] * len(self)
+            seed = self.seed
+        self.seed = seed
+        self._seeded = True
+        return [child_seed(seed, index) for index in range(len(self))]
+
+    def reset(self, seed=None):
+        """Starts a game in every environment; returns (observations, info)."""
+        self._reset(self._seeds(seed))
+        return self.arrays["observations"], self._info()
+
+    def step(self, actions):
+        self.arrays["actions"][:] = actions
+        self._step()
+        arrays = self.arrays
+        return (arrays["observations"], arrays["rewards"], arrays["terminated"],
+                arrays["truncated"], self._info())
+
+    def _reset(self, seeds):
+        self._rows.reset(seeds)
+
+    def _step(self):
+        self._rows.step()
+
+    def _info(self):
+        return {"action_mask": self.arrays["action_masks"],
+                "outcome": self.arrays["outcomes"]}
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _worker(connection, name, layout, start, stop, language, max_decisions):
+    """Runs environments ``start`` to ``stop`` of a SubprocVectorEnv."""
+    memory = SharedMemory(name)
+    try:
+        arrays = _arrays(layout, memory.buf)
+        envs = [ZimpEnv(language, max_decisions=max_decisions)
+                for _ in range(stop - start)]
+        rows = _Rows(envs, arrays, start)
+        while True:
+            command, argument = connection.recv()
+            if command == "close":
+                break
+            try:
+                if command == "step":
+                    rows.step()
+                else:
+                    rows.reset(argument)
+            except Exception as e:
+                # Raised again in the parent
+                connection.send(e)
+            else:
+                connection.send(None)
+        del rows, arrays
+    finally:
+        memory.close()
+        connection.close()
+
+
+class SubprocVectorEnv(VectorEnv):
+    """
+    A VectorEnv whose environments run in ``workers`` processes, each
+    stepping its share of the rows in a shared memory block.
+    """
+
+    def __init__(self, count, workers=2, seed=None, language="en", max_decisions=2000):
+        if np is None:
+            raise RuntimeError("The environments need NumPy (pip install numpy).")
+        # Only the layout is needed here; the environments live in the workers
+        catalog = load_catalog()
+        self.actions = action_names(catalog)
+        self.observation_size = observation_size(catalog)
+        self.seed = seed
+        self._seeded = False
+        self._count = count
+        self._layout, size = _buffer_layout(count, self.observation_size,
+                                            len(self.actions))
+        self._memory = SharedMemory(create=True, size=size)
+        self.arrays = _arrays(self._layout, self._memory.buf)
+
+        context = get_context()
+        workers = max(1, min(workers, count))
+        self._connections = []
+        self._processes = []
+        for worker in range(workers):
+            start, stop = count * worker // workers, count * (worker + 1) // workers
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(child, self._memory.name, self._layout, start, stop,
+                      language, max_decisions),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append((process, start, stop))
+
+    def __len__(self):
+        return self._count
+
+    def _send(self, make_command):
+        for connection, (_, start, stop) in zip(self._connections, self._processes):
+            connection.send(make_command(start, stop))
+        errors = [connection.recv() for connection in self._connections]
+        for error in errors:
+            if error is not None:
+                raise error
+
+    def _reset(self, seeds):
+        self._send(lambda start, stop: ("reset", seeds[start:stop]))
+
+    def _step(self):
+        self._send(lambda start, stop: ("step", None))
+
+    def close(self):
+        """Stops the workers and frees the shared memory."""
+        if self._memory is None:
+            return
+        for connection in self._connections:
+            try:
+                connection.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for process, _, _ in self._processes:
+            process.join()
+        self.arrays = None
+        try:
+            self._memory.close()
+        except BufferError:
+            pass  # arrays handed out still map it; it goes when they do
+        self._memory.unlink()
+        self._memory = None
@@ -3,7 +3,12 @@ from abc import ABC, abstractmethod
 class DevCardEventStrategy(ABC):
     def __init__(self, game):
         self.game = game
-        
+
+    @property
+    def io(self):
+        # Strategies that ask the player something answer through the game's front-end
+        return self.game.io
+
     @abstractmethod
     def execute(self, player):
         raise NotImplementedError("This method should be overridden in a subclass")
\ No newline at end of file
@@ -0,0 +1,322 @@
+"""
+Expectimax over dev-card draws, for hints on the decisions cards force.
+
+The solver plays out the card side of the game: every turn draws a card
+and resolves its event at the current hour, running out of cards moves
+the clock on, and the game is won after ``turns`` more turns survived
+before midnight. The map is left out; the caller says how many turns it
+expects the player still needs. Which cards are left is known from
+Game.id_order, but not their order, so every draw is a chance node over
+the cards left. Decisions follow the rules as the strategies apply them:
+
+    fight / run         ZombieFightStrategy
+    cower / continue    LowHealthStrategy, at 2 health or less
+    y / n               ItemAcquisitionStrategy, then 1 / 2 / 3 to drop
+                        an item when a third one is drawn
+
+Values are win probabilities. Turn starts are memoized by Zobrist key in
+a TranspositionTable, and solve() deepens one turn at a time until the
+game is solved exactly or its time budget runs out, answering with the
+deepest search it finished. Past the search depth a turn start is scored
+by a rough estimate from health and the turns still needed.
+"""
+from collections import namedtuple
+import time as _time
+
+from models.card_events import HOURS
+from models.search_state import bits_of, field_key
+
+
+# Cards left are a bitset of dev card ids, and ``left`` counts the draws
+# before the next reshuffle, which burns two cards nobody sees
+CardState = namedtuple("CardState", "time health attack items deck left turns")
+
+# The recommended option for a prompt, its win probability, every option's
+# win probability, the depth searched in turns and whether that is exact
+Advice = namedtuple("Advice", "action value values depth exact")
+
+WIN = 1.0
+LOSS = 0.0
+_EXACT = 1 << 30  # depth stored with values that no deeper search can change
+_MIDNIGHT = HOURS[-1] + 1
+
+# The prompts the solver can answer and their options
+DECISIONS = {
+    "fight": ("fight", "run"),
+    "cower": ("cower", "continue"),
+    "draw_item": ("y", "n"),
+    "replace_item": ("1", "2", "3"),
+}
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+# The feature each CardState field is keyed as. Items held here are names
+# and the cards left a set, not SearchState's bitset and order, so both
+# are keyed as one plain value
+_KEY_FIELDS = ("time", "health", "attack_points", "held_items", "cards_left",
+               "draws_left", "turns")
+
+
+def state_key(state):
+    """Returns the Zobrist key of a CardState."""
+    key = 0
+    for field, value in zip(_KEY_FIELDS, state):
+        key ^= field_key(field, value)
+    return key
+
+
+class TranspositionTable:
+    """
+    A fixed number of slots, picked by the low bits of the key. A new
+    entry replaces whatever was in its slot, so memory stays bounded
+    however long the solver runs.
+    """
+    __slots__ = ("_slots", "_mask", "hits", "misses")
+
+    def __init__(self, bits=16):
+        self._slots = [None] * (1 << bits)
+        self._mask = (1 << bits) - 1
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._slots) - self._slots.count(None)
+
+    def get(self, key, depth):
+        """Returns the value stored for ``key`` searched at least ``depth`` deep, or None."""
+        entry = self._slots[key & self._mask]
+        if entry is not None and entry[0] == key and entry[1] >= depth:
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+        return None
+
+    def put(self, key, depth, value):
+        self._slots[key & self._mask] = (key, depth, value)
+
+    def clear(self):
+        self._slots = [None] * len(self._slots)
+
+
+class ExpectimaxSolver:
+    """Win probabilities and best answers from the dev-card model, for one catalog."""
+
+    def __init__(self, catalog, table_bits=16, run_cost=1, clock=_time.perf_counter):
+        self.events = catalog.events
+        self.run_cost = run_cost
+        self.table = TranspositionTable(table_bits)
+        self.clock = clock
+        self.nodes = 0
+        self._card_items = {card.id: card.item for card in catalog.dev_cards}
+        self._attack = {card.item: card.attack_points for card in catalog.dev_cards}
+        self._all_cards = 0
+        for card in catalog.dev_cards:
+            self._all_cards |= 1 << card.id
+        # A reshuffle burns two of the cards
+        self._refill = len(catalog.dev_cards) - 2
+        self._deadline = None
+
+    @staticmethod
+    def state_of(game, turns):
+        """Returns the CardState of ``game`` with ``turns`` more turns to survive."""
+        deck = 0
+        for card_id in game.id_order:
+            deck |= 1 << card_id
+        player = game.player
+        return CardState(game.time, player.health, player.attack_points,
+                         tuple(player.items), deck, len(game.id_order), turns)
+
+    def estimate(self, state):
+        """Rough win probability of a turn start the search does not reach."""
+        draws_left = state.left + (HOURS[-1] - state.time) * self._refill
+        if state.turns > draws_left:
+            return LOSS
+        return state.health / (state.health + state.turns)
+
+    def solve(self, state, decision, budget=0.005, max_depth=32, zombies=0):
+        """
+        Returns the Advice for answering ``decision``, a key of DECISIONS, in
+        ``state``, searching deeper until ``budget`` seconds have passed.
+        ``zombies`` is the number attacking when the decision is "fight".
+        """
+        if decision not in DECISIONS:
+            raise ValueError(f"No advice for '{decision}' prompts.")
+        self._deadline = None
+        values, exact = self._root(state, decision, zombies, 0)
+        depth = 0
+        self._deadline = self.clock() + budget
+        try:
+            while not exact and depth < max_depth:
+                values, exact = self._root(state, decision, zombies, depth + 1)
+                depth += 1
+        except _OutOfTime:
+            pass
+        finally:
+            self._deadline = None
+        options = DECISIONS[decision]
+        if decision == "fight":
+            # Between answers worth the same, keep the player alive
+            alive = {"fight": self._fought(state, zombies).health > 0,
+                     "run": state.health > 1}
+            action = max(options, key=lambda option: (values[option], alive[option]))
+        else:
+            action = max(options, key=lambda option: values[option])
+        return Advice(action, values[action], values, depth, exact)
+
+    def advise(self, game, prompt, turns=8, budget=0.005):
+        """Returns the Advice for ``prompt``, or None if the solver has none for it."""
+        if prompt.key not in DECISIONS:
+            return None
+        zombies = prompt.context["zombies"] if prompt.key == "fight" else 0
+        return self.solve(self.state_of(game, turns), prompt.key, budget,
+                          zombies=zombies)
+
+    # The search. Every function returns (win probability, exact).
+
+    def _root(self, state, decision, zombies, depth):
+        if decision == "fight":
+            options = {"fight": self._fight(state, zombies, depth),
+                       "run": self._run(state, depth)}
+        elif decision == "cower":
+            options = {"cower": self._cower(state, depth),
+                       "continue": self._end(state, depth)}
+        elif decision == "draw_item":
+            options = {"y": self._take_item(state, depth), "n": self._end(state, depth)}
+        else:
+            items = state.items
+            options = {str(i + 1): self._equip(state, items[:i] + items[i + 1:], depth)
+                       for i in range(len(items))}
+        values = {option: value for option, (value, _) in options.items()}
+        return values, all(exact for _, exact in options.values())
+
+    def _turn(self, state, depth):
+        """A turn start: the time check, then a draw."""
+        if state.left == 0:
+            state = state._replace(time=state.time + 1, deck=self._all_cards,
+                                   left=self._refill)
+        if state.time >= _MIDNIGHT:
+            return LOSS, True
+        if depth <= 0:
+            return self.estimate(state), False
+
+        key = state_key(state)
+        stored = self.table.get(key, depth)
+        if stored is not None:
+            return stored
+        self.nodes += 1
+        if self._deadline is not None and not self.nodes & 0xF \
+                and self.clock() > self._deadline:
+            raise _OutOfTime
+
+        total, exact = 0.0, True
+        cards = list(bits_of(state.deck))
+        for card in cards:
+            value, card_exact = self._resolve(
+                state._replace(deck=state.deck & ~(1 << card), left=state.left - 1),
+                card, depth,
+            )
+            total += value
+            exact = exact and card_exact
+        result = (total / len(cards), exact)
+        self.table.put(key, _EXACT if exact else depth, result)
+        return result
+
+    def _resolve(self, state, card, depth):
+        """The event of ``card`` at the current hour, answered as well as possible."""
+        if state.time not in HOURS:
+            return self._end(state, depth)
+        if state.health <= 2:
+            return self._best(self._cower(state, depth), self._end(state, depth))
+        event = self.events[card, state.time]
+        if event.kind == "zombies":
+            return self._best(self._fight(state, event.zombies, depth),
+                              self._run(state, depth))
+        if event.kind == "health":
+            return self._end(
+                state._replace(health=max(0, state.health + event.health)), depth
+            )
+        if event.kind == "item":
+            return self._best(self._take_item(state, depth), self._end(state, depth))
+        return self._end(state, depth)
+
+    @staticmethod
+    def _best(*options):
+        return max(value for value, _ in options), all(exact for _, exact in options)
+
+    def _end(self, state, depth):
+        """The end of a turn: death, a win, or the next turn."""
+        if state.health <= 0:
+            return LOSS, True
+        turns = state.turns - 1
+        if turns <= 0:
+            return (WIN if state.time < _MIDNIGHT else LOSS), True
+        return self._turn(state._replace(turns=turns), depth - 1)
+
+    @staticmethod
+    def _fought(state, zombies):
+        """The state after fighting ``zombies``, as Game.resolve_combat leaves it."""
+        items = state.items
+        if "Candle" in items and ("Oil" in items or "Gasoline" in items):
+            # Burns the zombies; the two items go, the attack stays
+            return state._replace(items=items[2:])
+        damage = max(0, zombies - state.attack)
+        return state._replace(health=max(0, state.health - damage))
+
+    def _fight(self, state, zombies, depth):
+        return self._end(self._fought(state, zombies), depth)
+
+    def _run(self, state, depth):
+        # Running back to an explored tile costs the way back as well
+        return self._end(state._replace(health=max(0, state.health - 1),
+                                        turns=state.turns + self.run_cost), depth)
+
+    def _cower(self, state, depth):
+        state = state._replace(health=state.health + 3)
+        if state.left == 0:
+            return self._end(state._replace(time=state.time + 1, deck=self._all_cards,
+                                            left=self._refill), depth)
+        # The top card is burned unseen
+        total, exact = 0.0, True
+        cards = list(bits_of(state.deck))
+        for card in cards:
+            value, card_exact = self._end(
+                state._replace(deck=state.deck & ~(1 << card), left=state.left - 1),
+                depth,
+            )
+            total += value
+            exact = exact and card_exact
+        return total / len(cards), exact
+
+    def _take_item(self, state, depth):
+        if state.left == 0:
+            state = state._replace(time=state.time + 1, deck=self._all_cards,
+                                   left=self._refill)
+        total, exact = 0.0, True
+        cards = list(bits_of(state.deck))
+        for card in cards:
+            drawn = state._replace(deck=state.deck & ~(1 << card), left=state.left - 1)
+            items = state.items + (self._card_items[card],)
+            if len(items) == 3:
+                value, card_exact = self._best(*(
+                    self._equip(drawn, items[:i] + items[i + 1:], depth)
+                    for i in range(3)
+                ))
+            else:
+                value, card_exact = self._equip(drawn, items, depth)
+            total += value
+            exact = exact and card_exact
+        return total / len(cards), exact
+
+    def _equip(self, state, items, depth):
+        """Recomputes attack for ``items``, as Game.attack_points_update does."""
+        attack = 1
+        health = state.health
+        for item in items:
+            attack += self._attack.get(item, 0)
+            if item == "Can of soda":
+                health += 2
+        return self._end(state._replace(items=items, attack=attack, health=health),
+                         depth)
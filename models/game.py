@@ -1,156 +1,104 @@
 import random
-from models.dev_cards import DevCards
+from models.card_events import HOURS, parse_event
+from models.catalog import load_catalog
+from models.deck import Deck
+from models.grid import STEPS, Grid, MapRenderer, VisitedTiles, step
+from models.localization import as_table
 from models.player import Player
-from models.tiles import IndoorTile, OutdoorTile
+from models import save_format
+from models.engine import ConsoleIO, Prompt, Reporter, decision_point
 from enums.directions import Direction
 import json
-from models.generic_event_strategy import GenericEventStrategy
-from models.health_change_strategy import HealthChangeStrategy
-from models.item_acquisition_strategy import ItemAcquisitionStrategy
-from models.zombie_fight_strategy import ZombieFightStrategy
-from models.low_health_strategy import LowHealthStrategy
+from models.strategy_registry import LOW_HEALTH, build_strategies
 
 
-class Game:
-    def __init__(self, localization):
+class Game(Reporter):
+    def __init__(self, localization, io=None, seed=None, catalog=None):
+        # Cards and tiles are parsed once per process and shared by every game
+        self.catalog = catalog if catalog is not None else load_catalog()
         self.dev_card_list = []
-        self.id_order = list(range(1, 10))
+        self.id_order = Deck(self.catalog.card_ids)  # dev card ids, top card first
         self.time = 9  # time management
         self.out_of_dev_card = False
         self.player = None
+        self._map = None  # MapRenderer for the player's grid
         self.game_over = False
+        self.outcome = None  # "won", "killed" or "out_of_time" once the game ends
+        self.last_damage = None  # What last hurt the player, kept as the cause of death
+        self.turns = 0
         self.chainsaw_count = 2
-        self.localization = localization
+        # Shared read-only table; a plain dict is wrapped once
+        self.localization = as_table(localization)
+        self.io = io if io is not None else ConsoleIO()
+        # Every shuffle in a game draws from its own generator, so games can run
+        # side by side and any game can be replayed from its seed
+        self.seed = seed
+        self.rng = random.Random(seed)
+        # One handler per event kind, reused for every card this game resolves
+        self._strategies = build_strategies(self)
+
+    @property
+    def dev_card_list(self):
+        return self._dev_card_list
+
+    @dev_card_list.setter
+    def dev_card_list(self, cards):
+        """Stores the cards and rebuilds the id and item lookups over them."""
+        if cards is self.catalog.dev_cards:
+            self._dev_card_list = cards
+            self._cards_by_id = self.catalog.cards_by_id
+            self._cards_by_item = self.catalog.cards_by_item
+            self._events = self.catalog.events
+            return
+        self._dev_card_list = tuple(cards)
+        self._cards_by_id = {}
+        self._cards_by_item = {}
+        self._events = {}
+        # The first card wins, as it did when the list was scanned
+        for card in self._dev_card_list:
+            self._cards_by_id.setdefault(card.id, card)
+            self._cards_by_item.setdefault(card.item, card)
 
     def load_dev_cards(self):
-        with open("game_data.json") as d:
-            dev_card_data = json.load(d)["devCard"]
-            for dev_card in dev_card_data:
-                dev_card = DevCards(
-                    id=dev_card["id"],
-                    activity_at_nine=dev_card["9:00"],
-                    activity_at_ten=dev_card["10:00"],
-                    activity_at_eleven=dev_card["11:00"],
-                    item=dev_card["item"],
-                    attack_points=dev_card["attack_points"],
-                )
-                self.dev_card_list.append(dev_card)
+        self.dev_card_list = self.catalog.dev_cards
 
     def reset_id_order(self):
-        self.id_order = list(range(1, 10))
+        self.id_order = Deck(self.catalog.card_ids)
 
     def reset_game(self):
         self.reset_id_order()
         self.time = 9
         self.game_over = False
+        self.outcome = None
+        self.last_damage = None
+        self.turns = 0
 
     def shuffle_dev_card(self):
-        random.shuffle(self.id_order)
-        self.id_order.pop(0)
-        self.id_order.pop(0)
+        self.id_order.reshuffle(self.rng)
+        self.id_order.burn(2)
 
+    @decision_point
     def get_card(self, prompt=None):
         while True:
             if len(self.id_order) == 0:
                 self.check_last_card_in_dev()
             if prompt is None:
                 prompt = self.localization["g_get_card_prompt_def"]
-            response = input(prompt).lower()
+            response = (yield Prompt("draw_card", prompt, ("y",))).lower()
             if response == "y":
-                card_id = self.id_order.pop(0)
-                for card in self.dev_card_list:
-                    if card.id == card_id:
-                        return card
+                card = self._cards_by_id.get(self.id_order.draw())
+                if card is not None:
+                    return card
             else:
                 prompt = self.localization["g_get_card_prompt_must"]
 
     def check_last_card_in_dev(self):
         if len(self.id_order) == 0:
-            print(self.localization["g_last_card"])
+            self.say("g_last_card")
             self.reset_id_order()
             self.shuffle_dev_card()
             self.time += 1
-            print(self.localization["g_time_updated"].format(time=self.time))
-
-    # =============================================================
-
-    # TARGET BLOCK OF CODE (BELOW)
-
-    # =============================================================
-
-    def resolve_dev_card(self, card):
-        """Function resolves development cards"""
-        if self.time == 9:
-            event = card.activity_at_nine
-        elif self.time == 10:
-            event = card.activity_at_ten
-        elif self.time == 11:
-            event = card.activity_at_eleven
-        else:
-            return
-        print(event)
-
-        if self.player.health <= 2:
-            prompt = self.localization["g_cower_prompt_def"]
-            while True:
-                response = input(prompt).lower()
-                if response == "cower":
-                    self.cower()
-                    return
-                elif response == "continue":
-                    return
-                else:
-                    prompt = self.localization["g_cower_prompt_must"]
-
-        if "zombies" in event.lower():
-            zombies = int(event.split()[0])
-            prompt = self.localization["g_fight_zombie_prompt_def"].format(
-                zombies=zombies
-            )
-            while True:
-                response = input(prompt).lower()
-                if response == "run":
-                    self.run_away()
-                    # Deduct 1 health for running away
-                    self.player.modify_health(-1)
-                    break
-                elif response == "fight":
-                    self.item_usage()
-                    if not self.resolve_combat(zombies):
-                        self.game_over = True
-                    break
-                else:
-                    prompt = self.localization["g_fight_zombie_prompt_must"]
-
-        elif "health" in event.lower():
-            health_change = -1 if "-1" in event else +1
-            self.player.modify_health(health_change)
-
-        elif "item" in event.lower():
-            prompt = self.localization["g_draw_item_prompt_def"]
-            while True:
-                response = input(prompt).lower()
-                if response == "y":
-                    the_card = self.get_card(
-                        self.localization["g_get_card_prompt_item"]
-                    )
-                    print(f"The item is {the_card.item}")
-                    self.player.items.append(the_card.item)
-                    self.attack_points_update()
-                    break
-                elif response == "n":
-                    print(self.localization["g_no_item"])
-                    break
-                else:
-                    prompt = self.localization["g_draw_item_prompt_must"]
-                    print(prompt)
-        else:
-            print(self.localization["g_print_event"].format(event=event))
-
-    # =====================================================================
-    # =====================================================================
-
-
+            self.say("g_time_updated", time=self.time)
 
     # =============================================================
 
@@ -158,149 +106,159 @@ class Game:
 
     # =============================================================
 
+    @decision_point
     def resolve_dev_card(self, card):
         """Function resolves development cards based on the current time"""
 
         # Retrieve the event based no the current game time
-        if self.time == 9:
-            event = card.activity_at_nine
-        elif self.time == 10:
-            event = card.activity_at_ten
-        elif self.time == 11:
-            event = card.activity_at_eleven
-        else:
+        if self.time not in HOURS:
             return # Exit if time is out of games event bounds
-        
+        if self._cards_by_id.get(card.id) is card:
+            event = self._events.get((card.id, self.time))
+        else:
+            event = None
+        if event is None:
+            # A card from outside the catalog; its texts are parsed on first use
+            event = parse_event(card.activity_at(self.time))
+
         # If player health is critical
         if self.player.health <= 2:
-            strategy = LowHealthStrategy(self)
-            strategy.execute(card, event)
+            strategy = self._strategies[LOW_HEALTH]
+            yield from strategy.execute(card, event)
             return
-        
+
         # Determine the appropriate strategy based on the event
-        if "zombies" in event.lower():
-            strategy = ZombieFightStrategy(self)
-        elif "health" in event.lower():
-            strategy = HealthChangeStrategy(self)
-        elif "item" in event.lower():
-            strategy = ItemAcquisitionStrategy(self)
-        else:
-            strategy = GenericEventStrategy(self)
+        strategy = self._strategies[event.kind]
 
-        strategy.execute(card, event)
+        # Only the strategies that ask the player something are generators
+        steps = strategy.execute(card, event)
+        if steps is not None:
+            yield from steps
 
     # =============================================================
 
 
+    @decision_point
     def run_away(self):
         """Allows player to run away to any previously explored tile"""
         if not self.player.visited_tiles:
-            print(self.localization["g_no_tile_to_run_away"])
+            self.say("g_no_tile_to_run_away")
             return
-        print(self.localization["g_run_away"])
+        self.say("g_run_away")
         for i, tile in enumerate(self.player.visited_tiles):
-            print(f"{i + 1}: {tile.name}")
+            self.emit(f"{i + 1}: {tile.name}", "run_away_option")
 
+        options = tuple(
+            str(i + 1) for i in range(len(self.player.visited_tiles))
+        )
         while True:
             try:
-                choice = int(input(
-                    self.localization["g_run_away_tile_prompt"])
-                    ) - 1
+                choice = int((yield Prompt(
+                    "run_away", self.localization["g_run_away_tile_prompt"],
+                    options
+                ))) - 1
                 if 0 <= choice < len(self.player.visited_tiles):
                     self.player.move_to_tile(self.player.visited_tiles[choice])
-                    print(
-                        self.localization["g_run_away_to"].format(
-                            name=self.player.current_tile.name
-                        )
-                    )
+                    self.say("g_run_away_to", name=self.player.current_tile.name)
                     break
                 else:
-                    print(self.localization["g_run_away_error1"])
+                    self.say("g_run_away_error1")
             except ValueError:
-                print(self.localization["g_run_away_error2"])
+                self.say("g_run_away_error2")
 
     def cower(self):
         """Player can choose to cower and regain health,
             but loses time in the process"""
-        print(self.localization["g_cowerd_msg"])
+        self.say("g_cowerd_msg")
         self.player.modify_health(3)
-        print(self.localization["g_cowerd_health_gained"])
+        self.say("g_cowerd_health_gained")
 
         if self.id_order:
-            self.id_order.pop(0)
-            print(self.localization["g_cowered_time_passed"])
+            self.id_order.burn()
+            self.say("g_cowered_time_passed")
         else:
             self.check_last_card_in_dev()
 
-    def resolve_combat(self, zombies):
+    def resolve_combat(self, zombies, source="zombies"):
         """This function shows how combat is resolved"""
         damage_received = max(0, zombies - self.player.attack_points)
 
         if "Candle" in self.player.items and "Oil" in self.player.items:
-            print(self.localization["g_used_candle_oil"])
+            self.say("g_used_candle_oil")
             self.player.items.pop(0)
             self.player.items.pop(0)
         elif "Candle" in self.player.items and "Gasoline" in self.player.items:
-            print(self.localization["g_used_candle_gas"])
+            self.say("g_used_candle_gas")
             self.player.items.pop(0)
             self.player.items.pop(0)
         elif damage_received > 0:
-            print(self.localization["g_damage_recieved"]
-                  .format(damage=damage_received))
+            self.say("g_damage_recieved", damage=damage_received)
+            self.last_damage = source
             self.player.modify_health(-damage_received)
         else:
-            print(self.localization["g_no_damage_recieved"])
+            self.say("g_no_damage_recieved")
         return True
 
+    @decision_point
     def special_room_item(self, prompt=None):
         """This function connects with handle_tile_feature
             to get an item from rooms with special."""
         if prompt is None:
             prompt = self.localization["g_draw_item_prompt_def"]
         while True:
-            response = input(prompt).lower()
+            response = (yield Prompt("draw_item", prompt, ("y", "n"))).lower()
             if response == "y":
-                card_id = self.id_order.pop(0)
-                for card in self.dev_card_list:
-                    if card.id == card_id:
-                        print(
-                            f"The item was: {card.item}, "
-                            f"with attack points of {card.attack_points}"
-                        )
-                        self.player.items.append(card.item)
-                        self.attack_points_update()
-                        return card
+                card = self._cards_by_id.get(self.id_order.draw())
+                if card is not None:
+                    self.emit(
+                        f"The item was: {card.item}, "
+                        f"with attack points of {card.attack_points}",
+                        "item_drawn",
+                    )
+                    self.player.items.append(card.item)
+                    yield from self.attack_points_update()
+                    return card
             elif response == "n":
-                print("Player chose not to get another card for an item.")
+                self.emit(
+                    "Player chose not to get another card for an item.",
+                    "no_item",
+                )
                 return None
             else:
                 response = "You have to answer (Type 'y or n')"
 
+    @decision_point
     def handle_tile_feature(self, tile):
         """Handles features of a given tile."""
         if self.player.current_tile.special == "+1 Health if end turn here.":
             self.player.modify_health(1)
-            print(
+            self.emit(
                 "\n"
-                + self.localization["g_tile_special_recieved"].format(
+                + self.localization.format(
+                    "g_tile_special_recieved",
                     name=self.player.current_tile.name,
                     special=self.player.current_tile.special,
                 )
-                + "\n"
+                + "\n",
+                "g_tile_special_recieved",
             )
         elif self.player.current_tile.special == "May draw a new card to find an item.":
-            self.get_card(self.localization["g_draw_item_prompt_def"])
+            yield from self.get_card(self.localization["g_draw_item_prompt_def"])
             self.player.current_tile.special = None
-            print(self.player.current_tile.special)
+            self.emit(str(self.player.current_tile.special), "tile_special")
 
+    @decision_point
     def attack_points_update(self):
         """Updates and displays the player's total attack points and item details."""
         total_attack_points = 1
         if len(self.player.items) == 3:
-            prompt = input(
-                self.localization["g_replace_item"].format(
-                    item0=self.player.items[0], item1=self.player.items[1]
-                )
+            prompt = yield Prompt(
+                "replace_item",
+                self.localization.format(
+                    "g_replace_item",
+                    item0=self.player.items[0], item1=self.player.items[1],
+                ),
+                ("1", "2", "3"),
             )
             if prompt == "1":
                 self.player.items.pop(0)
@@ -308,103 +266,115 @@ class Game:
                 self.player.items.pop(1)
             else:
                 self.player.items.pop(2)
-                print(self.localization["g_no_item_replace"])
+                self.say("g_no_item_replace")
 
         for item in self.player.items:
-            found = False
-            for card in self.dev_card_list:
-                if card.item == item:
-                    total_attack_points += card.attack_points
-                    found = True
-                    if card.item == "Can of soda":
-                        self.player.modify_health(2)
-                    break
-            if not found:
-                print(self.localization["g_invalid_item_alarm"].format(item=item))
+            card = self._cards_by_item.get(item)
+            if card is None:
+                self.say("g_invalid_item_alarm", item=item)
+                continue
+            total_attack_points += card.attack_points
+            if card.item == "Can of soda":
+                self.player.modify_health(2)
 
         self.player.attack_points = total_attack_points
         return self.player.attack_points
 
+    @decision_point
     def item_usage(self):
         """Check and use items in the player's inventory."""
         if "Gasoline" in self.player.items and "Chainsaw" in self.player.items:
-            response = input(self.localization["g_combain_gas_chain_prompt"]).lower()
+            response = (yield Prompt(
+                "combine_items",
+                self.localization["g_combain_gas_chain_prompt"],
+                ("y", "n"),
+            )).lower()
             if response == "y":
                 self.chainsaw_count += 2
                 self.player.items.remove("Gasoline")
-                print(self.localization["g_combain_gas_chain_msg"])
-                print(
-                    self.localization["g_chainsaw_use_count"].format(
-                        count=self.chainsaw_count
-                    )
-                )
+                self.say("g_combain_gas_chain_msg")
+                self.say("g_chainsaw_use_count", count=self.chainsaw_count)
                 return
         elif "Candle" in self.player.items and "Oil" in self.player.items:
-            print(f"{self.player.items[0]} and {self.player.items[1]}")
-            response = input(self.localization["g_combain_candle_oil_prompt"]).lower()
+            self.emit(f"{self.player.items[0]} and {self.player.items[1]}", "items")
+            response = (yield Prompt(
+                "combine_items",
+                self.localization["g_combain_candle_oil_prompt"],
+                ("y", "n"),
+            )).lower()
             if response == "y":
                 return
         elif "Candle" in self.player.items and "Gasoline" in self.player.items:
-            print(f"{self.player.items[0]} and {self.player.items[1]}")
-            response = input(self.localization["g_combain_candle_gas_prompt"]).lower()
+            self.emit(f"{self.player.items[0]} and {self.player.items[1]}", "items")
+            response = (yield Prompt(
+                "combine_items",
+                self.localization["g_combain_candle_gas_prompt"],
+                ("y", "n"),
+            )).lower()
             if response == "y":
                 return
         if len(self.player.items) == 1:
-            response = input(
-                self.localization["g_use_item_prompt"].format(item=self.player.items[0])
-            ).lower()
+            response = (yield Prompt(
+                "use_item",
+                self.localization.format(
+                    "g_use_item_prompt", item=self.player.items[0]
+                ),
+                ("y", "n"),
+            )).lower()
             if response == "y":
                 if self.player.items[0] == "Chainsaw":
                     self.chainsaw_usage_count_handler()
                 else:
-                    print(f"{self.player.items[0]} is used.")
+                    self.emit(f"{self.player.items[0]} is used.", "item_used")
                     self.player.items.pop(0)
             else:
-                print(self.localization["g_no_item_used"])
+                self.say("g_no_item_used")
         elif len(self.player.items) == 2:
-            response = input(
-                self.localization["g_choose_use_item"].format(
-                    item1=self.player.items[0], item2=self.player.items[1]
-                )
-            ).lower()
+            response = (yield Prompt(
+                "use_item",
+                self.localization.format(
+                    "g_choose_use_item",
+                    item1=self.player.items[0], item2=self.player.items[1],
+                ),
+                ("1", "2", "3"),
+            )).lower()
             if response == "1":
                 if self.player.items[0] == "Chainsaw":
                     self.chainsaw_usage_count_handler()
                 else:
-                    print(f"{self.player.items[0]} is used.")
+                    self.emit(f"{self.player.items[0]} is used.", "item_used")
                     self.player.items.pop(0)
             elif response == "2":
                 if self.player.items[1] == "Chainsaw":
                     self.chainsaw_usage_count_handler()
                 else:
-                    print(
-                        self.localization["g_item_used"].format(
-                            item=self.player.items[1]
-                        )
-                    )
+                    self.say("g_item_used", item=self.player.items[1])
                     self.player.items.pop(1)
             else:
-                print(self.localization["g_no_item_used"])
+                self.say("g_no_item_used")
 
     def chainsaw_usage_count_handler(self):
         """Added to resolve chainsaw use counts, so that it actually works"""
         self.chainsaw_count -= 1
-        print(self.localization["g_chainsaw_used"].format(count=self.chainsaw_count))
+        self.say("g_chainsaw_used", count=self.chainsaw_count)
         if self.chainsaw_count <= 0:
-            print(self.localization["g_max_chainsaw_used"])
+            self.say("g_max_chainsaw_used")
             self.player.items.remove("Chainsaw")
 
     def initialize_player(self, indoor_tiles, outdoor_tiles):
         """Initializes player with the given tiles and health"""
-        self.player = Player(self.localization, indoor_tiles, outdoor_tiles, 6)
+        self.player = Player(
+            self.localization, indoor_tiles, outdoor_tiles, 6, io=self.io
+        )
         self.player.place_initial_tile()
 
+    @decision_point
     def initialize_game(self, indoor_tiles, outdoor_tiles):
         """Initializes the game"""
         self.load_dev_cards()
         self.shuffle_dev_card()
         self.remove_and_store_patio_tile(outdoor_tiles)
-        self.get_card()
+        yield from self.get_card()
 
     def remove_and_store_patio_tile(self, outdoor_tiles):
         """Removes and stores the patio tile for later use"""
@@ -414,16 +384,18 @@ class Game:
         if self.patio_tile:
             outdoor_tiles.remove(self.patio_tile)
 
+    @decision_point
     def place_patio_tile(self):
         """Places the patio tile within certain conditions"""
         if self.player.current_tile.name == "Dining Room" and self.player.has_totem:
             if any(tile.name == "Patio" for tile in self.player.outdoor_tiles):
                 prompt = self.localization["g_place_patio_prompt"]
                 while True:
-                    place_patio = input(prompt).lower()
+                    place_patio = (yield Prompt(
+                        "place_patio", prompt, ("y", "n")
+                    )).lower()
                     if place_patio == "y":
-                        x, y = self.player.position
-                        reserved_position = (x, y - 1)
+                        reserved_position = step(self.player.position, Direction.UP)
                         if reserved_position not in self.player.grid:
                             patio_tile = next(
                                 tile
@@ -432,156 +404,158 @@ class Game:
                             )
                             self.player.grid[reserved_position] = patio_tile
                             self.player.outdoor_tiles.remove(patio_tile)
-                            self.player.current_tile.walls[Direction.UP.value] = 0
-                            print(self.localization["g_placed_patio_msg"])
-                            print(self.display_player_info())
+                            self.player.current_tile.open_wall(Direction.UP.value)
+                            self.player.grid.refresh(self.player.position)
+                            self.say("g_placed_patio_msg")
+                            self.emit(self.display_player_info(), "player_info")
                             break
                         else:
-                            print(self.localization["g_patio_place_error_alarm"])
+                            self.say("g_patio_place_error_alarm")
                     elif place_patio == "n":
-                        print(self.localization["g_patio_no_placed"])
+                        self.say("g_patio_no_placed")
                         break
                     else:
                         prompt = self.localization["g_place_patio_prompt_must"]
             else:
-                print(self.localization["g_tile_cant_outdoor"])
+                self.say("g_tile_cant_outdoor")
 
     def displaying_map(self):
         """Display a map of placed tiles"""
-        the_grid = self.player.grid
-        min_x = min(coord[0] for coord in the_grid.keys())
-        max_x = max(coord[0] for coord in the_grid.keys())
-        min_y = min(coord[1] for coord in the_grid.keys())
-        max_y = max(coord[1] for coord in the_grid.keys())
-
-        map_str = self.localization["g_map_title"]
-
-        for y in range(min_y, max_y + 1):
-            for x in range(min_x, max_x + 1):
-                room = the_grid.get((x, y))
-                if room is not None:
-                    map_str += f"|{room.name:12}|"
-                else:
-                    map_str += " " * 14
-            map_str += "\n"
-        map_str += "---------------------------"
-        return map_str
+        if self._map is None or self._map.grid is not self.player.grid:
+            self._map = MapRenderer(self.player.grid)
+        return self._map.render(self.localization["g_map_title"])
 
     def display_player_info(self):
         """
         Display player information.
         """
-        output = self.localization["g_info_1"].format(
+        output = self.localization.format(
+            "g_info_1",
             time=self.time,
             health=self.player.health,
             attack_points=self.player.attack_points,
         )
         if self.player.current_tile is not None:
-            output += self.localization["g_info_2"].format(
-                current_tile=self.player.current_tile.name
+            output += self.localization.format(
+                "g_info_2", current_tile=self.player.current_tile.name
             )
         if self.player.previous_tile is not None:
-            output += self.localization["g_info_3"].format(
-                previous_tile=self.player.previous_tile.name
+            output += self.localization.format(
+                "g_info_3", previous_tile=self.player.previous_tile.name
             )
         if len(self.player.items) != 0:
-            output += self.localization["g_info_4"].format(item=self.player.items)
+            output += self.localization.format("g_info_4", item=self.player.items)
         output += self.displaying_map()
         return output
 
+    @decision_point
     def check_dead_end(self):
         """Check if the player is at a dead end considering all reachable tiles and offer zombie doors option."""
-        queue = [self.player.position]
-        visited_positions = set(queue)
-
-        while queue:
-            current_position = queue.pop(0)
-            current_tile = self.player.grid.get(current_position)
-
-            if not current_tile:
-                continue
-
-            exits = current_tile.get_exit_directions()
-
-            for direction in exits:
-                new_position = self.calculate_new_position(current_position, direction)
-                if new_position not in self.player.grid:
-                    return
-
-                if new_position not in visited_positions:
-                    visited_positions.add(new_position)
-                    queue.append(new_position)
+        # Walls opened or rotated after placement can cut the map in two, so
+        # only exits the player can walk to count
+        if self.player.grid.has_open_exit(self.player.position):
+            return
 
-        response = input(self.localization["g_deadend_prompt"]).lower()
+        response = (yield Prompt(
+            "dead_end", self.localization["g_deadend_prompt"], ("y", "n")
+        )).lower()
         if response == "y":
-            self.trigger_zombie_doors()
+            yield from self.trigger_zombie_doors()
         else:
-            print(self.localization["g_deadend_stay_msg"])
+            self.say("g_deadend_stay_msg")
 
     def calculate_new_position(self, current_position, direction):
         """Calculate the new grid position based on the current position and direction of movement"""
-        x, y = current_position
-        if direction == Direction.LEFT:
-            return x - 1, y
-        elif direction == Direction.UP:
-            return x, y - 1
-        elif direction == Direction.RIGHT:
-            return x + 1, y
-        elif direction == Direction.DOWN:
-            return x, y + 1
-        return current_position
+        if direction not in STEPS:
+            return current_position
+        return step(current_position, direction)
 
+    @decision_point
     def trigger_zombie_doors(self):
         """Allows zombie to break through the wall, opening a new exit and triggering combat"""
         prompt = self.localization["g_choose_wall_prompt"]
         while True:
             try:
-                wall_choice = int(input(prompt)) - 1
+                wall_choice = int((yield Prompt(
+                    "zombie_door", prompt, ("1", "2", "3", "4")
+                ))) - 1
                 if 0 <= wall_choice <= 3:
                     if self.player.current_tile.walls[wall_choice] == 0:
-                        print("There is already an exit there. Choose a different wall.")
+                        self.emit(
+                            "There is already an exit there. "
+                            "Choose a different wall.",
+                            "wall_already_open",
+                        )
                     else:
-                        self.player.current_tile.walls[wall_choice] = 0
-                        print(
-                            self.localization["g_choose_wall_msg"].format(
-                                dir=Direction(wall_choice).name.lower()
-                            )
+                        self.player.current_tile.open_wall(wall_choice)
+                        self.player.grid.refresh(self.player.position)
+                        self.say(
+                            "g_choose_wall_msg",
+                            dir=Direction(wall_choice).name.lower(),
                         )
-                        self.resolve_combat(3)
+                        self.resolve_combat(3, "zombie_door")
                         break
                 else:
                     prompt = self.localization["g_invalid_choice"]
             except ValueError:
                 prompt = self.localization["g_invalid_input"]
 
+    @decision_point
     def check_win_condition(self):
         """Checks if the player can win the game"""
         if self.player.current_tile.name == "Graveyard" and self.player.has_totem:
-            prompt = input(self.localization["g_final_prompt1"]).lower()
+            prompt = (yield Prompt(
+                "bury_totem", self.localization["g_final_prompt1"], ("y", "n")
+            )).lower()
             if prompt == "y":
-                first_card = self.get_card(self.localization["g_bury_draw_1"])
-                self.resolve_dev_card(first_card)
+                first_card = yield from self.get_card(
+                    self.localization["g_bury_draw_1"]
+                )
+                yield from self.resolve_dev_card(first_card)
 
                 if self.player.health > 0:
-                    second_card = self.get_card(self.localization["g_bury_draw_2"])
-                    self.resolve_dev_card(second_card)
+                    second_card = yield from self.get_card(
+                        self.localization["g_bury_draw_2"]
+                    )
+                    yield from self.resolve_dev_card(second_card)
 
                     if self.player.health > 0 and self.time < 12:
-                        print(self.localization["g_win_msg"])
+                        self.say("g_win_msg")
                         self.game_over = True
+                        self.outcome = "won"
                     else:
-                        print(self.localization["g_lose_msg1"])
+                        self.say("g_lose_msg1")
                 else:
-                    print(self.localization["g_lose_msg2"])
+                    self.say("g_lose_msg2")
             else:
-                print(self.localization["g_choose_bury_no"])
+                self.say("g_choose_bury_no")
 
-    def save_game(self, filename="game_save.json"):
-        """Save the current game state to a file."""
+    def save_game(self, filename="game_save.zimp", include_rng=False,
+                  store=None, player_id="local"):
+        """
+        Save the current game state to a file: the compact binary format, or
+        the readable JSON export when ``filename`` ends with .json. Given a
+        save_store.SaveStore, the save goes to ``player_id``'s slot
+        ``filename`` in it instead.
+        """
+        if store is None and filename.endswith(".json"):
+            self.export_json(filename)
+            return
+        data = save_format.encode(self, include_rng)
+        if store is not None:
+            store.put(player_id, filename, data)
+        else:
+            with open(filename, "wb") as f:
+                f.write(data)
+
+        self.emit(f"Game saved to {filename}", "game_saved")
+
+    def export_json(self, filename="game_save.json"):
+        """Export the current game state as readable JSON."""
         game_state = {
             "time": self.time,
             "game_over": self.game_over,
-            "id_order": self.id_order,
+            "id_order": list(self.id_order),
             "player": {
                 "health": self.player.health,
                 "attack_points": self.player.attack_points,
@@ -595,25 +569,101 @@ class Game:
                 "position": self.player.position,
                 "has_totem": self.player.has_totem,
             },
-            "grid": {(x, y): tile.name for (x, y), tile in self.player.grid.items()},
+            "grid": {str(position): tile.name
+                     for position, tile in self.player.grid.items()},
         }
 
-        def convert_keys_to_strings(d):
-            new_dict = {}
-            for key, value in d.items():
-                if isinstance(key, tuple):
-                    key = str(key)
-                if isinstance(value, dict):
-                    value = convert_keys_to_strings(value)
-                new_dict[key] = value
-            return new_dict
+        with open(filename, "w") as f:
+            json.dump(game_state, f, indent=4)
 
-        game_state = convert_keys_to_strings(game_state)
+        self.emit(f"Game saved to {filename}", "game_saved")
 
-        with open("game_save.json", "w") as f:
-            json.dump(game_state, f, indent=4)
+    def load_game(self, filename="game_save.zimp", store=None, player_id="local"):
+        """
+        Restore a game saved with save_game, from a file or from ``store``.
+        Tiles and cards are rebuilt from this game's catalog by id, and a
+        corrupt save raises ValueError before anything is changed.
+        """
+        if store is not None:
+            state = save_format.decode(store.get(player_id, filename))
+        else:
+            state = save_format.read(filename, self.catalog)
+        self.restore_state(state)
+        self.emit(f"Game loaded from {filename}", "game_loaded")
 
-        print(f"Game saved to {filename}")
+    def restore_state(self, state):
+        """
+        Restore the game from a decoded save_format.SaveState. The save is
+        checked and every object built before the game is touched, so a bad
+        save raises ValueError and leaves the game as it was.
+        """
+        cards_by_id = self.catalog.cards_by_id
+        if not all(card_id in cards_by_id for card_id in state.id_order + state.items):
+            raise ValueError("Save refers to dev cards that are not in the game data.")
+
+        tiles = {}
+
+        def bind(ref):
+            # Every reference to one tile gets the same Tile object
+            if ref is None:
+                return None
+            if ref not in tiles:
+                tiles[ref] = self.catalog.new_tile(*ref)
+            return tiles[ref]
+
+        grid = Grid()
+        for x, y, ref, wall_mask in state.grid:
+            if ref is None:
+                raise ValueError(f"Save has no tile placed at {(x, y)}.")
+            if not 0 <= wall_mask <= 15:
+                raise ValueError(f"Save has invalid walls {wall_mask} at {(x, y)}.")
+            tile = bind(ref)
+            tile.wall_mask = wall_mask
+            grid[x, y] = tile
+        for ref in state.used_specials:
+            if ref is None or ref not in tiles:
+                raise ValueError("Save has a used special on a tile that is not placed.")
+            tiles[ref].special = None
+
+        player = Player(
+            self.localization,
+            [bind(ref) for ref in state.indoor_tiles],
+            [bind(ref) for ref in state.outdoor_tiles],
+            state.health,
+            state.attack_points,
+            io=self.io,
+        )
+        player.grid = grid
+        player.position = state.position
+        player.current_tile = bind(state.current_tile)
+        player.previous_tile = bind(state.previous_tile)
+        player.items = [cards_by_id[card_id].item for card_id in state.items]
+        player.has_totem = state.has_totem
+        player.visited_tiles = VisitedTiles(bind(ref) for ref in state.visited_tiles)
+
+        if state.rng_state is not None:
+            # The last check: setstate() leaves the generator alone if it fails
+            try:
+                self.rng.setstate(state.rng_state)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Save has an invalid random state: {e}")
+
+        self.load_dev_cards()
+        self.player = player
+        self._map = None
+        self.id_order = Deck(state.id_order)
+        self.time = state.time
+        self.turns = state.turns
+        self.chainsaw_count = state.chainsaw_count
+        self.game_over = state.game_over
+        self.out_of_dev_card = state.out_of_dev_card
+        self.outcome = state.outcome
+        self.last_damage = state.last_damage
+
+    @staticmethod
+    def read_save_header(filename):
+        """Return the time, health and totem of a save without loading it."""
+        return save_format.read_header(filename)
 
     def handle_command(self, command):
         """Handle special game commands."""
@@ -622,55 +672,74 @@ class Game:
             return True
         return False
 
+    @decision_point
     def start_game(self, indoor_tiles, outdoor_tiles):
         self.reset_game()
         self.load_dev_cards()
         self.shuffle_dev_card()
         self.initialize_player(indoor_tiles, outdoor_tiles)
-        print(self.display_player_info())
+        self.emit(self.display_player_info(), "player_info")
+
+        # The player's piles are Decks copied from the lists, so shuffle those
+        self.player.indoor_tiles.reshuffle(self.rng)
+        self.player.outdoor_tiles.reshuffle(self.rng)
 
-        IndoorTile.shuffle_tiles(indoor_tiles)
-        OutdoorTile.shuffle_tiles(outdoor_tiles)
+        yield from self.play_turns()
 
+    @decision_point
+    def resume_game(self):
+        """Continue a game restored with load_game."""
+        self.emit(self.display_player_info(), "player_info")
+        self.player.print_exits()
+        yield from self.play_turns()
+
+    @decision_point
+    def play_turns(self):
+        """Runs turns until the game is won, lost or abandoned."""
         while not self.game_over:
-            direction = self.player.get_move_direction()
+            direction = yield from self.player.get_move_direction()
             if direction == "//save":
                 self.save_game()
             elif direction and direction != "//save":
                 self.check_last_card_in_dev()
                 if self.time > 11:
-                    self.localization["g_lose_msg3"]
+                    self.say("g_lose_msg3")
                     self.game_over = True
+                    self.outcome = "out_of_time"
                     return None
 
                 valid_move = self.player.move(direction)
                 if not valid_move:
                     continue
+                self.turns += 1
 
                 current_tile = self.player.current_tile
-                self.handle_tile_feature(current_tile)
-                self.check_dead_end()
+                yield from self.handle_tile_feature(current_tile)
+                yield from self.check_dead_end()
 
-                the_card = self.get_card()
-                self.resolve_dev_card(the_card)
-                print(self.display_player_info())
+                the_card = yield from self.get_card()
+                yield from self.resolve_dev_card(the_card)
+                self.emit(self.display_player_info(), "player_info")
 
                 if (
                     self.player.current_tile.name == "Evil Temple"
                     and not self.player.has_totem
                 ):
-                    the_card = self.get_card(self.localization["g_find_totem_prompt"])
-                    self.resolve_dev_card(the_card)
+                    the_card = yield from self.get_card(
+                        self.localization["g_find_totem_prompt"]
+                    )
+                    yield from self.resolve_dev_card(the_card)
                     if self.player.health > 0:
                         self.player.has_totem = True
-                        print(self.localization["g_totem_aqquired_msg"])
+                        self.say("g_totem_aqquired_msg")
 
-                self.place_patio_tile()
-                self.check_win_condition()
+                yield from self.place_patio_tile()
+                yield from self.check_win_condition()
 
                 if self.player.health <= 0:
-                    print(self.localization["g_lose_msg4"])
+                    self.say("g_lose_msg4")
                     self.game_over = True
+                    self.outcome = "killed"
                     return None
 
             else:
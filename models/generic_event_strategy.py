@@ -3,4 +3,4 @@ from models.event_strategy import DevCardEventStrategy
 
 class GenericEventStrategy(DevCardEventStrategy):
     def execute(self, card, event):
-        print(self.game.localization["g_print_event"].format(event=event))
\ No newline at end of file
+        self.game.say("g_print_event", event=event.text)
\ No newline at end of file
@@ -0,0 +1,272 @@
+from enums.directions import Direction
+
+
+# Grid offset of one step in each direction, as the player moves
+STEPS = {
+    Direction.LEFT: (-1, 0),
+    Direction.UP: (0, 1),
+    Direction.RIGHT: (1, 0),
+    Direction.DOWN: (0, -1),
+}
+
+
+def step(position, direction):
+    """Returns the position one step from ``position`` in ``direction``."""
+    dx, dy = STEPS[direction]
+    return position[0] + dx, position[1] + dy
+
+
+class Grid(dict):
+    """
+    The placed tiles, keyed by (x, y) position, with the reverse index from
+    each placed tile back to its position.
+
+    Alongside the tiles the grid keeps its open frontier: every (position,
+    direction) where a placed tile has an exit facing an empty cell. It
+    also splits the tiles into regions, two neighbours sharing one when
+    either has an exit facing the other, in a union-find that counts the
+    frontier entries of each region. The frontier and the regions are
+    updated when a tile is placed, and callers that rotate or open/close
+    walls of a placed tile call refresh() with its position, so asking
+    whether the player can still reach unexplored space is a find() and a
+    lookup. Placing tiles and opening walls only ever merge regions; a
+    change that closes an exit can split one, so it marks the regions
+    stale and they are rebuilt once, at the next question.
+
+    It also tracks its bounding box and stamps each row with the change that
+    last touched it, which lets MapRenderer re-render only those rows.
+
+    Tiles must be placed and removed with item assignment and ``del``.
+    """
+    __slots__ = ("frontier", "bounds", "row_stamps", "_positions", "_changes",
+                 "_exits", "_parent", "_open", "_stale")
+
+    def __init__(self, tiles=()):
+        super().__init__()
+        self.frontier = set()
+        self.bounds = None  # (min_x, max_x, min_y, max_y) once a tile is placed
+        self.row_stamps = {}  # y -> number of the last change to that row
+        self._positions = {}
+        self._changes = 0
+        self._exits = {}  # position -> exit directions at the last refresh
+        self._parent = {}  # position -> parent in its region's union-find
+        self._open = {}  # region root -> frontier entries in the region
+        self._stale = False
+        for position, tile in dict(tiles).items():
+            self[position] = tile
+
+    def __setitem__(self, position, tile):
+        replaced = self.get(position)
+        if replaced is not None:
+            del self._positions[replaced]
+            self._stale = True
+        super().__setitem__(position, tile)
+        self._positions[tile] = position
+        self._touch(position)
+        x, y = position
+        if self.bounds is None:
+            self.bounds = (x, x, y, y)
+        else:
+            min_x, max_x, min_y, max_y = self.bounds
+            self.bounds = (min(min_x, x), max(max_x, x), min(min_y, y), max(max_y, y))
+        self._parent[position] = position
+        self._open[position] = 0
+        self._exits[position] = ()
+        # The new tile fills a cell its neighbours may have had exits into
+        for direction in STEPS:
+            neighbour = step(position, direction)
+            opposite = Direction.opposite(direction)
+            if opposite in self._exits.get(neighbour, ()):
+                self._discard((neighbour, opposite))
+                self._union(neighbour, position)
+        self.refresh(position)
+
+    def __delitem__(self, position):
+        del self._positions[self[position]]
+        super().__delitem__(position)
+        self._touch(position)
+        min_x, max_x, min_y, max_y = self.bounds
+        x, y = position
+        if x in (min_x, max_x) or y in (min_y, max_y):
+            # Only removing a tile on the edge can shrink the map
+            self.bounds = _bounds(self) if self else None
+        self._forget(position)
+        del self._exits[position]
+        self._stale = True
+        for direction in STEPS:
+            neighbour = step(position, direction)
+            opposite = Direction.opposite(direction)
+            if opposite in self._exits.get(neighbour, ()):
+                self.frontier.add((neighbour, opposite))
+
+    def refresh(self, position):
+        """Recomputes the frontier and regions at ``position`` after its walls changed."""
+        exits = self[position].get_exit_directions()
+        if any(direction not in exits for direction in self._exits[position]):
+            self._stale = True
+        self._exits[position] = exits
+        self._forget(position)
+        for direction in exits:
+            neighbour = step(position, direction)
+            if neighbour in self:
+                self._union(position, neighbour)
+            else:
+                self._add((position, direction))
+
+    def position_of(self, tile, default=None):
+        """Returns where ``tile`` is placed, or ``default`` if it is not on the map."""
+        return self._positions.get(tile, default)
+
+    def has_open_exit(self, start=None):
+        """
+        True while some placed tile still has an exit into unexplored space.
+        Given ``start``, only exits in the region of ``start`` count.
+        """
+        if not self.frontier or start is None:
+            return bool(self.frontier)
+        if self._stale:
+            self._rebuild()
+        return self._open[self._find(start)] > 0
+
+    def _touch(self, position):
+        self._changes += 1
+        self.row_stamps[position[1]] = self._changes
+
+    def _add(self, entry):
+        if entry not in self.frontier:
+            self.frontier.add(entry)
+            if not self._stale:
+                self._open[self._find(entry[0])] += 1
+
+    def _discard(self, entry):
+        if entry in self.frontier:
+            self.frontier.remove(entry)
+            if not self._stale:
+                self._open[self._find(entry[0])] -= 1
+
+    def _forget(self, position):
+        for direction in STEPS:
+            self._discard((position, direction))
+
+    def _find(self, position):
+        parent = self._parent
+        while parent[position] != position:
+            parent[position] = parent[parent[position]]
+            position = parent[position]
+        return position
+
+    def _union(self, a, b):
+        if self._stale:
+            return  # the rebuild will join them
+        a, b = self._find(a), self._find(b)
+        if a != b:
+            self._parent[b] = a
+            self._open[a] += self._open.pop(b)
+
+    def _rebuild(self):
+        """Recomputes every region from the exits, after one may have split."""
+        self._parent = {position: position for position in self}
+        self._open = dict.fromkeys(self, 0)
+        self._stale = False
+        for position, exits in self._exits.items():
+            for direction in exits:
+                neighbour = step(position, direction)
+                if neighbour in self:
+                    self._union(position, neighbour)
+        for position, _ in self.frontier:
+            self._open[self._find(position)] += 1
+
+
+def _bounds(positions):
+    xs = [x for x, _ in positions]
+    ys = [y for _, y in positions]
+    return min(xs), max(xs), min(ys), max(ys)
+
+
+class MapRenderer:
+    """
+    Draws a grid as text, one row of tiles per line.
+
+    Rendered rows are cached with the grid's stamp for that row, so a call
+    after a placement only re-renders the row it touched. Every row is
+    redrawn when the map widens, since rows are padded to the full width.
+    """
+    __slots__ = ("grid", "_columns", "_rows")
+
+    CELL_WIDTH = 12
+    FOOTER = "---------------------------"
+
+    def __init__(self, grid):
+        self.grid = grid
+        self._columns = None
+        self._rows = {}  # y -> (stamp, rendered line)
+
+    def render(self, title=""):
+        """Returns ``title`` followed by the map, top row first, and a footer."""
+        if self.grid.bounds is None:
+            return title + self.FOOTER
+        min_x, max_x, min_y, max_y = self.grid.bounds
+        if self._columns != (min_x, max_x):
+            self._columns = (min_x, max_x)
+            self._rows.clear()
+
+        lines = [title]
+        for y in range(min_y, max_y + 1):
+            stamp = self.grid.row_stamps.get(y)
+            cached = self._rows.get(y)
+            if cached is None or cached[0] != stamp:
+                cached = (stamp, self._render_row(y, min_x, max_x))
+                self._rows[y] = cached
+            lines.append(cached[1])
+        lines.append(self.FOOTER)
+        return "".join(lines)
+
+    def _render_row(self, y, min_x, max_x):
+        get = self.grid.get
+        cells = []
+        for x in range(min_x, max_x + 1):
+            room = get((x, y))
+            if room is not None:
+                cells.append(f"|{room.name:{self.CELL_WIDTH}}|")
+            else:
+                cells.append(" " * (self.CELL_WIDTH + 2))
+        cells.append("\n")
+        return "".join(cells)
+
+
+class VisitedTiles:
+    """
+    The tiles a player has moved onto, each listed once in the order it was
+    first visited. Revisits do not grow it, and it can be indexed like a list.
+    """
+    __slots__ = ("_order", "_seen")
+
+    def __init__(self, tiles=()):
+        self._order = []
+        self._seen = set()
+        for tile in tiles:
+            self.append(tile)
+
+    def append(self, tile):
+        if tile not in self._seen:
+            self._seen.add(tile)
+            self._order.append(tile)
+
+    def clear(self):
+        self._order.clear()
+        self._seen.clear()
+
+    def __contains__(self, tile):
+        return tile in self._seen
+
+    def __getitem__(self, index):
+        return self._order[index]
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def __len__(self):
+        return len(self._order)
+
+    def __repr__(self):
+        return f"VisitedTiles({self._order!r})"
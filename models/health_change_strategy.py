@@ -2,5 +2,7 @@ from models.event_strategy import DevCardEventStrategy
 
 class HealthChangeStrategy(DevCardEventStrategy):
     def execute(self, card, event):
-        health_change = -1 if "-1" in event else +1
+        health_change = event.health
+        if health_change < 0:
+            self.game.last_damage = "health_event"
         self.game.player.modify_health(health_change)
\ No newline at end of file
@@ -13,7 +13,10 @@ class IndoorMovement(PlayerMovement):
             and next_tile.environment == "Outdoor":
             if next_tile.name == "Patio" and self._player.has_totem:
                 return True
-            print("Cannot move from indoor to outdoor without a valid exit (e.g., Patio).")
+            self._player.emit(
+                "Cannot move from indoor to outdoor without a valid exit (e.g., Patio).",
+                "blocked_indoor_to_outdoor",
+            )
             return False
 
         # Block specific exit if moving into the Dining Room
@@ -27,9 +30,7 @@ class IndoorMovement(PlayerMovement):
         """Draws the next indoor tile if available, otherwise indicates no tile was drawn."""
         next_tile = self._player.get_next_indoor_tile()
         if next_tile:
-            print(self._player.localization["p_tile_drew"].format(
-                tile=next_tile.name)
-                )
+            self._player.say("p_tile_drew", tile=next_tile.name)
         else:
-            print(self._player.localization["p_player_tile_no"])
+            self._player.say("p_player_tile_no")
         return next_tile
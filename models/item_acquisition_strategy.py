@@ -1,19 +1,21 @@
 from models.event_strategy import DevCardEventStrategy
+from models.engine import Prompt, decision_point
 
 class ItemAcquisitionStrategy(DevCardEventStrategy):
+    @decision_point
     def execute(self, card, event):
         prompt = self.game.localization["g_draw_item_prompt_def"]
         while True:
-            response = input(prompt).lower()
+            response = (yield Prompt("draw_item", prompt, ("y", "n"))).lower()
             if response == "y":
-                the_card = self.game.get_card(self.game.localization["g_get_card_prompt_item"])
-                print(f"The item is {the_card.item}")
+                the_card = yield from self.game.get_card(self.game.localization["g_get_card_prompt_item"])
+                self.game.emit(f"The item is {the_card.item}", "item_drawn")
                 self.game.player.items.append(the_card.item)
-                self.game.attack_points_update()
+                yield from self.game.attack_points_update()
                 break
             elif response == "n":
-                print(self.game.localization["g_no_item"])
+                self.game.say("g_no_item")
                 break
             else:
                 prompt = self.game.localization["g_draw_item_prompt_must"]
-                print(prompt)
\ No newline at end of file
+                self.game.emit(prompt, "g_draw_item_prompt_must")
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""
+Crash-safe sessions: every decision is journaled, with periodic snapshots.
+
+A JournaledEngine is a GameEngine that keeps one directory per session:
+
+    snapshot.zimp   the game at the start of some turn, as a binary save
+                    (random generator included) after the number of
+                    decisions applied before it
+    journal.log     every decision applied since that snapshot, with the
+                    key of the prompt it answered
+
+Decisions are appended as they are applied and synced to disk in batches.
+A new snapshot is written at the first turn boundary after
+``snapshot_every`` decisions, after which the journal starts over, so
+restoring a session loads one snapshot and replays at most about
+``snapshot_every`` decisions however long the game has run. Replay
+checks each decision against the prompt it was journaled for, so a
+restored game that has drifted from the original raises ValueError
+instead of feeding decisions to the wrong prompts.
+"""
+import os
+import struct
+import zlib
+
+from models import save_format
+from models.engine import GameEngine
+
+
+SNAPSHOT = "snapshot.zimp"
+JOURNAL = "journal.log"
+
+# Decisions applied before the snapshot was taken
+_SNAPSHOT_HEADER = struct.Struct("<Q")
+# Sequence number, length and CRC-32 of one journaled decision, whose
+# payload is the prompt key, a newline and the decision
+_RECORD = struct.Struct("<QHI")
+
+
+def _write_atomically(path, data):
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def _record(sequence, key, decision):
+    payload = f"{key}\n{decision}".encode("utf-8")
+    return _RECORD.pack(sequence, len(payload), zlib.crc32(payload)) + payload
+
+
+def read_journal(path, after=0):
+    """
+    Returns the (prompt key, decision) pairs in the journal at ``path``
+    numbered ``after`` or later, in order. A torn or corrupt record ends
+    the journal, as it can only be the last write before a crash.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+    decisions = []
+    offset = 0
+    while offset + _RECORD.size <= len(data):
+        sequence, length, crc = _RECORD.unpack_from(data, offset)
+        start = offset + _RECORD.size
+        payload = data[start:start + length]
+        if len(payload) != length or zlib.crc32(payload) != crc:
+            break
+        if sequence >= after:
+            key, _, decision = payload.decode("utf-8").partition("\n")
+            decisions.append((key, decision))
+        offset = start + length
+    return decisions
+
+
+def write_journal(path, decisions, first=0):
+    """
+    Replaces the journal at ``path`` with the (prompt key, decision) pairs
+    ``decisions``, numbered from ``first``. The new journal is swapped in
+    whole, so a crash part way leaves the old one.
+    """
+    _write_atomically(path, b"".join(
+        _record(sequence, key, decision)
+        for sequence, (key, decision) in enumerate(decisions, first)
+    ))
+
+
+class JournaledEngine(GameEngine):
+    """
+    A GameEngine that journals every decision to ``directory`` and takes a
+    snapshot at the start of a turn every ``snapshot_every`` decisions.
+    The journal is fsynced every ``sync_every`` decisions, at snapshots and
+    on close(), so a crash loses at most the decisions since the last sync.
+    """
+
+    def __init__(self, game, directory, snapshot_every=64, sync_every=16):
+        super().__init__(game)
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.sync_every = sync_every
+        self.decisions = 0  # applied since the session started
+        self._snapshot_at = None
+        self._unsynced = 0
+        self._journal = None
+        os.makedirs(directory, exist_ok=True)
+
+    def start(self, indoor_tiles, outdoor_tiles):
+        events = super().start(indoor_tiles, outdoor_tiles)
+        self.snapshot()
+        return events
+
+    def step(self, decision):
+        key = self.prompt.key
+        events = super().step(decision)
+        self._append(key, decision)
+        if self.done:
+            self.close()
+        elif (self.prompt.key == "move"
+              and self.decisions - self._snapshot_at >= self.snapshot_every):
+            self.snapshot()
+        return events
+
+    def snapshot(self):
+        """Saves the game and starts a new journal. Only valid at the start of a turn."""
+        data = save_format.encode(self.game, include_rng=True)
+        _write_atomically(
+            os.path.join(self.directory, SNAPSHOT),
+            _SNAPSHOT_HEADER.pack(self.decisions) + data,
+        )
+        # Records from before the snapshot are skipped by sequence number,
+        # so a crash before the journal is truncated is harmless
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(os.path.join(self.directory, JOURNAL), "wb")
+        self._snapshot_at = self.decisions
+        self._unsynced = 0
+
+    def sync(self):
+        """Flushes journaled decisions to disk."""
+        if self._journal is not None and self._unsynced:
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._unsynced = 0
+
+    def close(self):
+        if self._journal is not None:
+            self.sync()
+            self._journal.close()
+            self._journal = None
+
+    def _append(self, key, decision):
+        self._journal.write(_record(self.decisions, key, decision))
+        self.decisions += 1
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every:
+            self.sync()
+
+    @classmethod
+    def restore(cls, game, directory, **options):
+        """
+        Rebuilds the session journaled in ``directory`` into ``game`` and
+        returns (engine, events), the engine waiting on the same prompt as
+        when the last synced decision was applied. Raises ValueError if a
+        decision meets a different prompt than the one it answered.
+        """
+        with open(os.path.join(directory, SNAPSHOT), "rb") as f:
+            data = f.read()
+        if len(data) < _SNAPSHOT_HEADER.size:
+            raise ValueError("Session snapshot is truncated.")
+        (snapshot_at,) = _SNAPSHOT_HEADER.unpack_from(data)
+        state = save_format.decode(data[_SNAPSHOT_HEADER.size:])
+        decisions = read_journal(os.path.join(directory, JOURNAL), snapshot_at)
+
+        engine = cls(game, directory, **options)
+        game.restore_state(state)
+        events = engine.resume()
+        for number, (key, decision) in enumerate(decisions, snapshot_at):
+            if engine.done or engine.prompt.key != key:
+                raise ValueError(
+                    f"Journaled decision {number} answered '{key}', but the "
+                    f"restored game is at '{None if engine.done else engine.prompt.key}'."
+                )
+            # Replayed through the plain engine, so nothing is journaled twice
+            events = GameEngine.step(engine, decision)
+
+        # Carry on from a fresh snapshot if the game is at a turn boundary,
+        # otherwise rewrite the journal without any torn record at its end
+        engine.decisions = snapshot_at + len(decisions)
+        if engine.done:
+            return engine, events
+        if engine.prompt.key == "move":
+            engine.snapshot()
+        else:
+            path = os.path.join(directory, JOURNAL)
+            write_journal(path, decisions, snapshot_at)
+            engine._snapshot_at = snapshot_at
+            engine._journal = open(path, "ab")
+        return engine, events
@@ -0,0 +1,135 @@
+"""
+Load generator for the game server.
+
+    python -m models.loadgen --sessions 2000 --concurrency 500
+
+Opens ``--concurrency`` simulated players at a time until ``--sessions``
+games have been played, each answering prompts at random, and reports
+completed sessions per second and turn latency: the time from sending a
+decision to receiving the next prompt. Without ``--port`` it starts a
+server in the same process on a free port, whose session cache metrics
+are added to the report; ``--think`` adds a pause before every decision
+to model mostly idle human players.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from models.engine import Prompt
+from models.policies import RandomPolicy
+
+
+def percentile(values, fraction):
+    """Returns the value below which ``fraction`` of ``values`` fall."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def play_client(host, port, rng, latencies, max_decisions=2000, think=0.0):
+    """Plays one game over a connection and returns its final message."""
+    reader, writer = await asyncio.open_connection(host, port)
+    policy = RandomPolicy(rng)
+    decisions = 0
+    sent = None
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return None
+            message = json.loads(line)
+            if message["type"] in ("player", "event"):
+                continue
+            if sent is not None:
+                latencies.append(time.perf_counter() - sent)
+            if message["type"] == "done" or decisions >= max_decisions:
+                return message
+            prompt = Prompt(message["key"], message["text"],
+                            tuple(message["options"]))
+            if think:
+                await asyncio.sleep(think)
+            writer.write(policy.choose(None, prompt).encode("utf-8") + b"\n")
+            sent = time.perf_counter()
+            decisions += 1
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, sessions, concurrency, seed=0,
+                   max_decisions=2000, think=0.0):
+    """Plays ``sessions`` games, ``concurrency`` at a time, and returns a report."""
+    latencies = []
+    outcomes = {}
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(index):
+        async with limit:
+            result = await play_client(
+                host, port, random.Random(seed * 1_000_003 + index), latencies,
+                max_decisions, think,
+            )
+        outcome = result.get("outcome", "stalled") if result else "disconnected"
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(sessions)))
+    elapsed = time.perf_counter() - started
+    return {
+        "sessions": sessions,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "sessions_per_second": round(sessions / elapsed, 1) if elapsed else None,
+        "turns": len(latencies),
+        "p50_turn_ms": round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        "p99_turn_ms": round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+        "outcomes": outcomes,
+    }
+
+
+async def _main(args):
+    server = None
+    host, port = args.host, args.port
+    if port is None:
+        from models.localization import load as load_localization
+        from models.server import GameServer
+        server = GameServer(
+            load_localization("en"), seed=args.seed,
+            session_dir=args.session_dir, max_live=args.max_live,
+            idle_timeout=args.idle_timeout, sweep_interval=args.idle_timeout / 2,
+        )
+        host, port = await server.start(host, 0)
+    try:
+        report = await run_load(host, port, args.sessions, args.concurrency,
+                                args.seed, args.max_decisions, args.think)
+        if server is not None:
+            report["session_cache"] = server.sessions.metrics()
+        return report
+    finally:
+        if server is not None:
+            await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the game server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int,
+                        help="server to test; starts one in-process if omitted")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-decisions", type=int, default=2000)
+    parser.add_argument("--think", type=float, default=0.0,
+                        help="seconds each player waits before deciding")
+    parser.add_argument("--session-dir",
+                        help="lets the in-process server park idle sessions here")
+    parser.add_argument("--max-live", type=int, default=10000)
+    parser.add_argument("--idle-timeout", type=float, default=300.0)
+    args = parser.parse_args(argv)
+    print(json.dumps(asyncio.run(_main(args)), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Localized text, loaded once per process and shared.
+
+    table = localization.load("en")
+    table["g_map_title"]
+    table.format("g_info_4", item=items)
+
+load() parses localization.json the first time any language is asked
+for and builds each language's table the first time that language is
+asked for; every later call returns the same table. Tables are read-only
+mappings, so one can be shared by every Game and Player in the process.
+format() renders a message from its template, turned into a printf-style
+string and a list of field names the first time the message is used,
+instead of having str.format parse the template again on every message.
+"""
+from collections.abc import Mapping
+import json
+from operator import itemgetter
+import string
+import threading
+
+
+_parse = string.Formatter().parse
+
+_files = {}    # path -> parsed file, every language
+_tables = {}   # (path, language code) -> LocalizationTable
+_lock = threading.Lock()
+
+
+def _compile(template):
+    """
+    Returns ``template`` as a printf-style string and a function picking
+    its fields out of a dict as a tuple, or None if the template uses
+    anything beyond plain named fields.
+    """
+    literals = []
+    names = []
+    for literal, name, spec, conversion in _parse(template):
+        literals.append(literal.replace("%", "%%"))
+        if name is None:
+            continue
+        if not name.isidentifier() or spec or conversion:
+            return None
+        names.append(name)
+    if len(literals) == len(names):
+        literals.append("")
+    if not names:
+        pick = _no_fields
+    elif len(names) == 1:
+        pick = _single_field(names[0])
+    else:
+        pick = itemgetter(*names)
+    return "%s".join(literals), pick
+
+
+def _no_fields(fields):
+    return ()
+
+
+def _single_field(name):
+    def pick(fields):
+        return (fields[name],)
+    return pick
+
+
+class LocalizationTable(Mapping):
+    """Read-only messages of one language, with pre-split templates."""
+    __slots__ = ("language", "_messages", "_templates")
+
+    def __init__(self, messages, language=None):
+        self.language = language
+        self._messages = messages
+        self._templates = {}
+
+    def __getitem__(self, key):
+        return self._messages[key]
+
+    def __iter__(self):
+        return iter(self._messages)
+
+    def __len__(self):
+        return len(self._messages)
+
+    def format(self, key, **fields):
+        """Returns message ``key`` with ``fields`` filled in."""
+        try:
+            compiled = self._templates[key]
+        except KeyError:
+            compiled = self._templates[key] = _compile(self._messages[key])
+        if compiled is None:
+            return self._messages[key].format(**fields)
+        template, pick = compiled
+        return template % pick(fields)
+
+
+def as_table(localization):
+    """Returns ``localization`` as a LocalizationTable, wrapping a plain dict once."""
+    if isinstance(localization, LocalizationTable):
+        return localization
+    return LocalizationTable(dict(localization))
+
+
+def _read(path):
+    messages = _files.get(path)
+    if messages is None:
+        with open(path, "r", encoding="utf-8") as f:
+            messages = _files[path] = json.load(f)
+    return messages
+
+
+def load(language_code, path="localization.json"):
+    """
+    Returns the shared table for ``language_code``. Raises KeyError for a
+    language the file does not have.
+    """
+    table = _tables.get((path, language_code))
+    if table is None:
+        with _lock:
+            table = _tables.get((path, language_code))
+            if table is None:
+                table = _tables[path, language_code] = LocalizationTable(
+                    _read(path)[language_code], language_code
+                )
+    return table
+
+
+def languages(path="localization.json"):
+    """Returns the language codes in the localization file."""
+    with _lock:
+        return tuple(_read(path))
@@ -1,14 +1,16 @@
 from models.event_strategy import DevCardEventStrategy
+from models.engine import Prompt, decision_point
 
 class LowHealthStrategy(DevCardEventStrategy):
+    @decision_point
     def execute(self, card, event):
         prompt = self.game.localization["g_cower_prompt_def"]
         while True:
-            response = input(prompt).lower()
+            response = (yield Prompt("cower", prompt, ("cower", "continue"))).lower()
             if response == "cower":
                 self.game.cower()
                 return  # Stop further processing as the player has chosen to cower
             elif response == "continue":
                 return  # Stop processing without taking any action
             else:
-                prompt = self.game.localization["g_cower_prompt_must"]
+                prompt = self.game.localization["g_cower_prompt_must"]
\ No newline at end of file
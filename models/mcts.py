@@ -0,0 +1,359 @@
+"""
+Monte Carlo Tree Search agent.
+
+    python -m models.mcts --games 4 --playouts 200 --workers 4
+
+MCTSPolicy answers move, fight, cower and item prompts by playing the
+game out many times from the prompt it is asked about. Each playout
+rebuilds the game headless, like a parked server session: the binary
+save taken at the start of the turn, resumed and fed the decisions made
+since. The cards and tiles still to come are then shuffled with the
+playout's own seed, so the search only knows what the player knows, and
+the game is played to the end, through the tree while it can and by a
+CautiousPolicy after that. A playout scores 1 for a win, 0.5 for
+holding the totem when it ends and 0 otherwise.
+
+The tree is open-loop: a node is a sequence of decisions, and its
+children are keyed by (prompt key, answer), since the same decisions can
+meet different prompts in different playouts. After answering, the
+policy keeps the chosen child as its next root, so the search of one
+turn carries over to the next. With ``workers`` above one each decision
+is searched root-parallel: every worker process keeps its own tree for
+the whole game, runs its share of the playouts on it, and the visit
+counts at the root are summed. Workers are told every answer given, so
+each of their trees carries over from turn to turn like the serial one.
+"""
+import argparse
+from multiprocessing import get_context
+import json
+import math
+import random
+import time
+
+from models import save_format
+from models.catalog import load_catalog
+from models.engine import GameEngine
+from models.game import Game
+from models.localization import load as load_localization
+from models.policies import CautiousPolicy, Policy
+from models.seeding import child_seed
+
+
+# The prompts the tree branches on; everything else is left to the
+# rollout policy, in the tree and out of it
+SEARCHED = frozenset(("move", "fight", "cower", "draw_item"))
+
+
+class Node:
+    """Visit count and summed score of one sequence of decisions."""
+    __slots__ = ("visits", "score", "children")
+
+    def __init__(self):
+        self.visits = 0
+        self.score = 0.0
+        self.children = {}  # (prompt key, answer) -> Node
+
+    def select(self, key, options, exploration):
+        """Returns (answer, child): an untried answer, else the best by UCT."""
+        children = self.children
+        for option in options:
+            if (key, option) not in children:
+                child = children[key, option] = Node()
+                return option, child
+        log_visits = math.log(self.visits)
+        best = None
+        for option in options:
+            child = children[key, option]
+            value = (child.score / child.visits
+                     + exploration * math.sqrt(log_visits / child.visits))
+            if best is None or value > best[0]:
+                best = (value, option, child)
+        return best[1], best[2]
+
+
+def reward(game):
+    """Scores a finished playout."""
+    if game.outcome == "won":
+        return 1.0
+    return 0.5 if game.player.has_totem else 0.0
+
+
+def _options(prompt):
+    return [option for option in prompt.options if option != "//save"]
+
+
+def _asked(engine):
+    return None if engine.done else (engine.prompt.key, tuple(engine.prompt.options))
+
+
+def restore(localization, catalog, checkpoint, tail, asking=None):
+    """
+    Rebuilds a game from a save taken at a move prompt and the (prompt key,
+    decision) pairs since. Raises ValueError if a decision meets another
+    prompt than it answered, or if the game does not end up ``asking``,
+    a (prompt key, options) pair, when that is given.
+    """
+    game = Game(localization, catalog=catalog)
+    engine = GameEngine(game)
+    game.restore_state(save_format.decode(checkpoint))
+    engine.resume()
+    for key, decision in tail:
+        if engine.done or engine.prompt.key != key:
+            raise ValueError(f"Restored game is at {_asked(engine)}, not at '{key}'.")
+        engine.step(decision)
+    if asking is not None and _asked(engine) != asking:
+        raise ValueError(f"Restored game is at {_asked(engine)}, not at {asking}.")
+    return game, engine
+
+
+def playout(root, localization, catalog, checkpoint, tail, seed,
+            exploration=0.7, max_decisions=200, asking=None):
+    """Runs one playout from the game at ``checkpoint`` + ``tail`` through ``root``."""
+    game, engine = restore(localization, catalog, checkpoint, tail, asking)
+    rng = random.Random(seed)
+    # Forget the order of what is still hidden
+    game.rng.seed(rng.getrandbits(64))
+    game.id_order.reshuffle(rng)
+    game.player.indoor_tiles.reshuffle(rng)
+    game.player.outdoor_tiles.reshuffle(rng)
+
+    rollout = CautiousPolicy(rng)
+    node = root
+    path = [root]
+    in_tree = True
+    for _ in range(max_decisions):
+        if engine.done:
+            break
+        prompt = engine.prompt
+        options = _options(prompt)
+        if in_tree and prompt.key in SEARCHED and len(options) > 1:
+            answer, child = node.select(prompt.key, options, exploration)
+            in_tree = child.visits > 0
+            node = child
+            path.append(child)
+        else:
+            answer = rollout.choose(game, prompt)
+        engine.step(answer)
+
+    score = reward(game)
+    for visited in path:
+        visited.visits += 1
+        visited.score += score
+
+
+def _search(root, localization, catalog, checkpoint, tail, asking, seed,
+            playouts, exploration, max_decisions):
+    for index in range(playouts):
+        playout(root, localization, catalog, checkpoint, tail,
+                child_seed(seed, index), exploration, max_decisions, asking)
+    return root
+
+
+def _worker(connection, language):
+    """Keeps one tree for an MCTSPolicy, searching and advancing it on command."""
+    localization = load_localization(language)
+    catalog = load_catalog()
+    root = Node()
+    try:
+        while True:
+            command, *arguments = connection.recv()
+            if command == "close":
+                break
+            if command == "search":
+                reused = root.visits
+                try:
+                    _search(root, localization, catalog, *arguments)
+                except ValueError as e:
+                    # Raised again in the parent
+                    connection.send(e)
+                    continue
+                connection.send((reused, {key: (child.visits, child.score)
+                                          for key, child in root.children.items()}))
+            elif command == "advance":
+                child = root.children.get(tuple(arguments))
+                root = child if child is not None else Node()
+            else:
+                root = Node()
+    finally:
+        connection.close()
+
+
+class MCTSPolicy(Policy):
+    """
+    Plays the searched prompts by MCTS with ``playouts`` playouts each,
+    split over ``workers`` processes, and the rest like CautiousPolicy.
+    Workers load the localization of the game's language themselves, or of
+    ``language`` for a game given a plain dict. ``stats`` counts playouts,
+    the visits carried over from earlier decisions and the seconds spent
+    searching.
+    """
+
+    def __init__(self, rng, playouts=100, workers=1, exploration=0.7,
+                 max_decisions=200, language="en"):
+        super().__init__(rng)
+        self.playouts = playouts
+        self.workers = workers
+        self.exploration = exploration
+        self.max_decisions = max_decisions
+        self.language = language
+        self.stats = {"decisions": 0, "playouts": 0, "reused": 0, "seconds": 0.0}
+        self._fallback = CautiousPolicy(rng)
+        self._root = Node()
+        self._game = None
+        self._checkpoint = None
+        self._tail = []
+        self._processes = []
+        self._connections = []
+        self._worker_language = None
+
+    def choose(self, game, prompt):
+        if game is not self._game:
+            self._game = game
+            self._root = Node()
+            self._checkpoint = None
+            for connection in self._connections:
+                connection.send(("reset",))
+        if prompt.key == "move":
+            # The start of a turn: what playouts restore from
+            self._checkpoint = save_format.encode(game, include_rng=True)
+            self._tail = []
+        options = _options(prompt)
+        if prompt.key in SEARCHED and len(options) > 1 and self._checkpoint is not None:
+            answer = self._search(game, prompt)
+        else:
+            answer = self._fallback.choose(game, prompt)
+            if prompt.key in SEARCHED:
+                self._advance(prompt.key, answer)
+        self._tail.append((prompt.key, answer))
+        return answer
+
+    def _advance(self, key, answer):
+        """Keeps the subtree under ``answer`` for the next decision."""
+        child = self._root.children.get((key, answer))
+        self._root = child if child is not None else Node()
+        for connection in self._connections:
+            connection.send(("advance", key, answer))
+
+    def _start_workers(self, language):
+        self.close()
+        context = get_context()
+        for _ in range(self.workers):
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, args=(child, language),
+                                      daemon=True)
+            process.start()
+            child.close()
+            self._processes.append(process)
+            self._connections.append(parent)
+        self._worker_language = language
+
+    def _search(self, game, prompt):
+        started = time.perf_counter()
+        seed = self.rng.getrandbits(64)
+        # Playouts check that they restore to the prompt being answered
+        asking = (prompt.key, tuple(prompt.options))
+        if self.workers > 1:
+            language = game.localization.language or self.language
+            if language != self._worker_language:
+                self._start_workers(language)
+            share = -(-self.playouts // self.workers)
+            for worker, connection in enumerate(self._connections):
+                connection.send(("search", self._checkpoint, tuple(self._tail),
+                                 asking, child_seed(seed, worker), share,
+                                 self.exploration, self.max_decisions))
+            # The workers' roots summed; their trees stay with them
+            root = Node()
+            replies = [connection.recv() for connection in self._connections]
+            for reply in replies:
+                if isinstance(reply, ValueError):
+                    raise reply
+            for reused, children in replies:
+                self.stats["reused"] += reused
+                for key, (visits, score) in children.items():
+                    child = root.children.get(key)
+                    if child is None:
+                        child = root.children[key] = Node()
+                    child.visits += visits
+                    child.score += score
+                    root.visits += visits
+                    root.score += score
+            self._root = root
+            played = share * self.workers
+        else:
+            root = self._root
+            self.stats["reused"] += root.visits
+            _search(root, game.localization, game.catalog, self._checkpoint,
+                    self._tail, asking, seed, self.playouts, self.exploration,
+                    self.max_decisions)
+            played = self.playouts
+
+        children = [root.children.get((prompt.key, option)) for option in _options(prompt)]
+        if any(child is not None and child.score for child in children):
+            answer = max(zip(children, _options(prompt)),
+                         key=lambda pair: pair[0].visits if pair[0] else -1)[1]
+        else:
+            # No playout scored: nothing to tell the answers apart by
+            answer = self._fallback.choose(game, prompt)
+        self.stats["decisions"] += 1
+        self.stats["playouts"] += played
+        self.stats["seconds"] += time.perf_counter() - started
+        self._advance(prompt.key, answer)
+        return answer
+
+    def playouts_per_second(self):
+        seconds = self.stats["seconds"]
+        return self.stats["playouts"] / seconds if seconds else None
+
+    def close(self):
+        """Stops the worker processes, if any were started."""
+        for connection in self._connections:
+            try:
+                connection.send(("close",))
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for process in self._processes:
+            process.join()
+        self._processes = []
+        self._connections = []
+        self._worker_language = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play games with the MCTS agent.")
+    parser.add_argument("--games", type=int, default=2)
+    parser.add_argument("--playouts", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-decisions", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    localization = load_localization("en")
+    catalog = load_catalog()
+    outcomes = {}
+    policy = MCTSPolicy(random.Random(args.seed), args.playouts, args.workers)
+    try:
+        for index in range(args.games):
+            game = Game(localization, seed=child_seed(args.seed, index), catalog=catalog)
+            engine = GameEngine(game)
+            engine.start(*catalog.new_tiles())
+            decisions = 0
+            while not engine.done and decisions < args.max_decisions:
+                engine.step(policy.choose(game, engine.prompt))
+                decisions += 1
+            outcome = game.outcome or "stalled"
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    finally:
+        policy.close()
+    rate = policy.playouts_per_second()
+    print(json.dumps({
+        "games": args.games,
+        "workers": args.workers,
+        "outcomes": outcomes,
+        **policy.stats,
+        "playouts_per_second": round(rate, 1) if rate else None,
+    }, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Memory benchmark: how many bytes one live game state costs.
+
+    python -m models.memory_benchmark --games 2000 --decisions 40
+
+Plays ``--games`` seeded games ``--decisions`` decisions in with the random
+policy, keeps every one of them alive and reports the traced allocation per
+game. The catalog, localization and policy objects are shared by all games
+and are loaded before tracing starts, so they are not counted.
+"""
+import argparse
+import json
+import random
+import sys
+import tracemalloc
+
+from models.catalog import load_catalog
+from models.engine import GameEngine
+from models.game import Game
+from models.localization import load as load_localization
+from models.policies import RandomPolicy
+from models.seeding import spawn_seeds
+
+
+def _started_game(localization, catalog, seed, decisions):
+    game = Game(localization, seed=seed, catalog=catalog)
+    engine = GameEngine(game)
+    engine.start(*catalog.new_tiles())
+    policy = RandomPolicy(random.Random(seed))
+    for _ in range(decisions):
+        if engine.done:
+            break
+        engine.step(policy.choose(game, engine.prompt))
+    return engine
+
+
+def _object_sizes(game):
+    """Shallow size of one record of each kind, including its __dict__ if any."""
+    def size(obj):
+        total = sys.getsizeof(obj)
+        if hasattr(obj, "__dict__"):
+            total += sys.getsizeof(obj.__dict__)
+        return total
+
+    player = game.player
+    return {
+        "Tile": size(player.current_tile),
+        "DevCards": size(game.catalog.dev_cards[0]),
+        "Player": size(player),
+    }
+
+
+def measure(games=2000, decisions=40, seed=0):
+    """Returns a report of bytes per live game state."""
+    localization = load_localization("en")
+    catalog = load_catalog()
+    seeds = list(spawn_seeds(seed, games))
+    # Warm up any lazily built module state before tracing
+    _started_game(localization, catalog, seeds[0], decisions)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    engines = [
+        _started_game(localization, catalog, game_seed, decisions)
+        for game_seed in seeds
+    ]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tiles = sum(len(engine.game.player.grid) for engine in engines)
+    return {
+        "games": games,
+        "decisions": decisions,
+        "bytes_per_game_state": round((after - before) / games),
+        "placed_tiles_per_game": round(tiles / games, 2),
+        "object_bytes": _object_sizes(engines[0].game),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure memory per game state.")
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--decisions", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    print(json.dumps(measure(args.games, args.decisions, args.seed), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -16,14 +16,17 @@ class OutdoorMovement(PlayerMovement):
             and next_tile.environment == "Indoor":
             return True
 
-        print("Movement from outdoor to indoor not allowed except through Patio.")
+        self._player.emit(
+            "Movement from outdoor to indoor not allowed except through Patio.",
+            "blocked_outdoor_to_indoor",
+        )
         return False
 
     def draw_new_tile(self):
         """Draws the next outdoor tile if available, otherwise indicates no tile was drawn."""
         next_tile = self._player.get_next_outdoor_tile()
         if next_tile:
-            print(self._player.localization["p_tile_drew"].format(tile=next_tile.name))
+            self._player.say("p_tile_drew", tile=next_tile.name)
         else:
-            print(self._player.localization["p_player_tile_no"])
+            self._player.say("p_player_tile_no")
         return next_tile
\ No newline at end of file
@@ -1,25 +1,42 @@
 from enums.directions import Direction
 from models.tiles import Tile
+from models.deck import Deck
+from models.grid import Grid, VisitedTiles
 from models.indoor_movement import IndoorMovement
 from models.outdoor_movement import OutdoorMovement 
+from models.localization import as_table
+from models.engine import ConsoleIO, Prompt, Reporter, decision_point
+
+class Player(Reporter):
+    __slots__ = (
+        "current_tile", "previous_tile", "position", "grid", "indoor_tiles",
+        "outdoor_tiles", "health", "has_totem", "attack_points", "items",
+        "visited_tiles", "localization", "io", "_movements",
+    )
 
-class Player:
     def __init__(
-        self, localization, indoor_tiles, outdoor_tiles, health=6, attack_points=1
+        self, localization, indoor_tiles, outdoor_tiles, health=6, attack_points=1,
+        io=None
     ):
         self.current_tile = None  # Holds the tile the player is currently on
         self.previous_tile = None  # Holds the previous tile the player was on
         self.position = (0, 0)  # Grabs the position of the player in the grid
-        self.grid = {}
-        self.indoor_tiles = indoor_tiles
-        self.outdoor_tiles = outdoor_tiles
+        self.grid = Grid()
+        self.indoor_tiles = Deck(indoor_tiles)  # tile piles, top tile first
+        self.outdoor_tiles = Deck(outdoor_tiles)
         self.health = health
         self.has_totem = False
         self.attack_points = attack_points
         self.items = []
-        self.visited_tiles = []  # Tracks all the tiles visited by the player
-        self.localization = localization
-    
+        self.visited_tiles = VisitedTiles()  # Tiles visited, each listed once
+        self.localization = as_table(localization)
+        self.io = io if io is not None else ConsoleIO()
+        # One movement per environment, reused for every step
+        self._movements = {
+            "Indoor": IndoorMovement(self),
+            "Outdoor": OutdoorMovement(self),
+        }
+
 
     def place_initial_tile(self):
         """Places the initial tile, which is the Foyer."""
@@ -30,12 +47,10 @@ class Player:
             self.current_tile = initial_tile
             self.grid[self.position] = initial_tile
             self.indoor_tiles.remove(initial_tile)
-            print(
-                self.localization["p_on_tile_msg"].format(name=self.current_tile.name)
-            )
+            self.say("p_on_tile_msg", name=self.current_tile.name)
             self.print_exits()
         else:
-            print(self.localization["p_error_no_foyer"])
+            self.say("p_error_no_foyer")
 
     # ========================================================================
 
@@ -149,9 +164,10 @@ class Player:
     # ========================================================================
 
     def move(self, direction):
-        movement_class = IndoorMovement \
-            if self.current_tile.environment == "Indoor" else OutdoorMovement
-        movement = movement_class(self, direction)
+        # Tiles of any other environment move by the outdoor rules
+        movement = self._movements["Indoor"] \
+            if self.current_tile.environment == "Indoor" else self._movements["Outdoor"]
+        movement.direction = direction
         return movement.move() # Client calls the move template method in abstract class
     
     # ========================================================================
@@ -166,34 +182,31 @@ class Player:
     def block_reserved_exit(self, tile):
         """Blocks a specific exit of the Dining Room to reserve for the Patio tile."""
         if tile.name == "Dining Room":
-            print(f"Blocking north exit for Dining Room at position {self.position}.")
+            self.emit(
+                f"Blocking north exit for Dining Room at position {self.position}.",
+                "block_reserved_exit",
+            )
             north_index = Direction.UP.value  # Reserve the north exit for the Patio
-            tile.walls[north_index] = 1  # Block the north exit
+            tile.close_wall(north_index)  # Block the north exit
 
 
     def move_to_tile(self, tile):
         """Moves player to a specified explored tile."""
         self.previous_tile = self.current_tile
         self.current_tile = tile
-        self.position = next(
-            (pos for pos, t in self.grid.items() if t == tile), self.position
-        )
-        print(
-            self.localization["p_moved_to_prev_tile"].format(
-                current_tile=self.current_tile.name
-            )
-        )
+        self.position = self.grid.position_of(tile, self.position)
+        self.say("p_moved_to_prev_tile", current_tile=self.current_tile.name)
 
     def get_next_indoor_tile(self):
         """Returns next indoor tile if available."""
         if self.indoor_tiles:
-            return self.indoor_tiles.pop(0)
+            return self.indoor_tiles.draw()
         return None
 
     def get_next_outdoor_tile(self):
         """Returns next outdoor tile if available."""
         if self.outdoor_tiles:
-            return self.outdoor_tiles.pop(0)
+            return self.outdoor_tiles.draw()
         return None
 
     def print_exits(self):
@@ -202,21 +215,26 @@ class Player:
         exit_names = [
             direction.name.lower() for direction in exits
         ]  # Gets tile exits in name format
-        print(
-            self.localization["p_aval_exits"].format(
-                current_tile=self.current_tile.name, exits=", ".join(exit_names)
-            )
+        self.say(
+            "p_aval_exits",
+            current_tile=self.current_tile.name,
+            exits=", ".join(exit_names),
         )
 
+    @decision_point
     def get_move_direction(self):
         """Prompts the player for a move direction until a valid response is given."""
         exits = self.current_tile.get_exit_directions()
+        exit_names = [d.name.lower() for d in exits]
+        prompt = Prompt(
+            "move",
+            self.localization.format(
+                "p_choose_dir_or_save", exits=", ".join(exit_names)
+            ),
+            tuple(exit_names) + ("//save",),
+        )
         while True:
-            direction_input = input(
-                self.localization["p_choose_dir_or_save"].format(
-                    exits=", ".join([d.name.lower() for d in exits])
-                )
-            ).lower()
+            direction_input = (yield prompt).lower()
             if direction_input == "//save":
                 return direction_input
             for direction in exits:
@@ -224,13 +242,13 @@ class Player:
                     direction.name.lower() == direction_input
                 ):  # Checks player's input against the exits of the current room
                     return direction
-            print(self.localization["p_invalid_dir"])
+            self.say("p_invalid_dir")
 
     def modify_health(self, amount):
         """Modifies the player's health by a given amount."""
         self.health += amount
         self.health = max(self.health, 0)  # Health cannot go below zero
-        print(self.localization["p_health_msg"].format(health=self.health))
+        self.say("p_health_msg", health=self.health)
 
     def modify_attack_points(self):
         """Updates and displays the player's total attack points based on the items they have collected."""
@@ -244,7 +262,7 @@ class Player:
 
     def display_health(self):
         """Displays the player's current health."""
-        print(f"Player's current health: {self.health}")
+        self.emit(f"Player's current health: {self.health}", "health")
 
     def get_totem_status(self):
         """Returns whether the player has the totem."""
@@ -1,22 +1,35 @@
 from abc import ABC, abstractmethod
 from enums.directions import Direction
+from models.grid import STEPS, step
 
 
 class PlayerMovement(ABC):
-    def __init__(self, player, direction):
-        self._player = player       
-        self._direction = direction 
+    def __init__(self, player, direction=None):
+        self._player = player
+        self._direction = direction
+
+    @property
+    def direction(self):
+        return self._direction
+
+    @direction.setter
+    def direction(self, direction):
+        """Sets the direction of the next move, so one instance serves every step."""
+        self._direction = direction
 
     # Template Method
     def move(self):
         new_position = self.calculate_new_position()
         if new_position is None:
-            print("Invalid direction provided")
+            self._player.emit("Invalid direction provided", "invalid_direction")
             return False
 
         if self.is_existing_tile(new_position):
             next_tile = self._player.grid[new_position]
-            if not self._prepare_next_tile(next_tile):
+            prepared = self._prepare_next_tile(next_tile)
+            # Preparing may have rotated the tile or blocked one of its exits
+            self._player.grid.refresh(new_position)
+            if not prepared:
                 return False
             return self.update_position(new_position, next_tile)
 
@@ -28,13 +41,9 @@ class PlayerMovement(ABC):
 
     def calculate_new_position(self):
         """Calculate new position based on direction."""
-        x, y = self._player.position
-        return {
-            Direction.LEFT: (x - 1, y),
-            Direction.UP: (x, y + 1),
-            Direction.RIGHT: (x + 1, y),
-            Direction.DOWN: (x, y - 1),
-        }.get(self._direction)
+        if self._direction not in STEPS:
+            return None
+        return step(self._player.position, self._direction)
 
     def is_existing_tile(self, new_position):
         """Check if the tile already exists in the grid."""
@@ -48,14 +57,17 @@ class PlayerMovement(ABC):
 
     def _align_exits(self, next_tile):
         """Rotate tile to align exits."""
-        opposite_index = Direction.opposite(self._direction).value
-        for _ in range(4):
-            if next_tile.walls[opposite_index] == 0:
-                print(f"Aligned exits for movement to {next_tile.name}")
-                return True
-            next_tile.rotate()
-        print(f"Failed to align exits for {next_tile.name}")
-        return next_tile.walls[opposite_index] == 0
+        turns = next_tile.turns_to_open(Direction.opposite(self._direction).value)
+        if turns is None:
+            self._player.emit(
+                f"Failed to align exits for {next_tile.name}", "align_failed"
+            )
+            return False
+        next_tile.rotate(turns)
+        self._player.emit(
+            f"Aligned exits for movement to {next_tile.name}", "aligned_exits"
+        )
+        return True
 
     @abstractmethod
     def check_environment(self, next_tile):
@@ -67,11 +79,10 @@ class PlayerMovement(ABC):
         self._player.previous_tile = self._player.current_tile
         self._player.current_tile = next_tile
         self._player.position = new_position
-        print(
-            self._player.localization["p_player_moved_from_to"].format(
-                direction=self._direction.name.lower(),
-                current_tile=self._player.current_tile.name,
-            )
+        self._player.say(
+            "p_player_moved_from_to",
+            direction=self._direction.name.lower(),
+            current_tile=self._player.current_tile.name,
         )
         self._player.print_exits()
         self._player.visited_tiles.append(self._player.current_tile)
@@ -0,0 +1,97 @@
+from enums.directions import Direction
+from models.expectimax import ExpectimaxSolver
+from models.grid import step
+
+
+class Policy:
+    """
+    Answers a game's prompts without a human.
+
+    Policies see the Prompt the engine is waiting on and the Game it belongs
+    to, and return one of the prompt's options.
+    """
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def choose(self, game, prompt):
+        raise NotImplementedError("This method should be overridden in a subclass")
+
+
+class RandomPolicy(Policy):
+    """Picks any valid answer, never saving."""
+
+    def choose(self, game, prompt):
+        return self.rng.choice([o for o in prompt.options if o != "//save"])
+
+
+class CautiousPolicy(Policy):
+    """
+    A simple hand-written player: heals when hurt, fights only when the
+    damage is survivable, always takes items and prefers unexplored exits.
+    """
+
+    def choose(self, game, prompt):
+        player = game.player
+        if prompt.key == "cower":
+            return "cower" if player.health <= 2 else "continue"
+        if prompt.key == "fight":
+            damage = max(0, prompt.context["zombies"] - player.attack_points)
+            return "fight" if damage < player.health - 1 else "run"
+        if prompt.key == "move":
+            return self._choose_direction(game, prompt)
+        if prompt.key == "place_patio":
+            # The patio goes in the cell the rules reserve next to the Dining Room
+            reserved = step(player.position, Direction.UP)
+            return "n" if reserved in player.grid else "y"
+        if prompt.key in ("draw_card", "draw_item", "bury_totem",
+                          "dead_end", "combine_items"):
+            return "y"
+        if prompt.key == "use_item":
+            return "n" if "y" in prompt.options else "3"
+        if prompt.key == "replace_item":
+            return "1"
+        return self.rng.choice(prompt.options)
+
+    def _choose_direction(self, game, prompt):
+        player = game.player
+        directions = [o for o in prompt.options if o != "//save"]
+        pile = player.outdoor_tiles if player.is_in_outdoor_area() \
+            else player.indoor_tiles
+        # Unexplored cells only lead somewhere while there are tiles to draw
+        explored = [
+            d for d in directions
+            if step(player.position, Direction[d.upper()]) in player.grid
+        ]
+        unexplored = [d for d in directions if d not in explored] if pile else []
+        return self.rng.choice(unexplored or explored or directions)
+
+
+class ExpectimaxPolicy(CautiousPolicy):
+    """
+    CautiousPolicy, except that fights, cowering and items are decided by
+    an ExpectimaxSolver given ``budget`` seconds per decision and assuming
+    ``turns`` more turns to go.
+    """
+
+    def __init__(self, rng, budget=0.002, turns=8):
+        super().__init__(rng)
+        self.budget = budget
+        self.turns = turns
+        self._solver = None
+
+    def choose(self, game, prompt):
+        if self._solver is None or self._solver.events is not game.catalog.events:
+            self._solver = ExpectimaxSolver(game.catalog)
+        advice = self._solver.advise(game, prompt, self.turns, self.budget)
+        if advice is None:
+            return super().choose(game, prompt)
+        return advice.action
+
+
+# Policies the simulator can be asked for by name
+POLICIES = {
+    "random": RandomPolicy,
+    "cautious": CautiousPolicy,
+    "expectimax": ExpectimaxPolicy,
+}
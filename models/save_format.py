@@ -0,0 +1,320 @@
+"""
+Compact binary save format.
+
+A save is a fixed-size header followed by a body:
+
+    header  magic, format version, flags, body length, body CRC-32, time,
+            health, attack points, turns and chainsaw uses left
+    body    outcome, cause of the last damage, position, dev card order,
+            items, placed tiles with their walls, the current and previous
+            tile, both tile piles, visited tiles, the tiles whose special
+            has been used up and, optionally, the state of the game's
+            random generator
+
+Tiles are stored as references into the catalog, (environment, tile id),
+and items as the id of the card they come from, so a save holds no names
+and is bound to the game data again when it is loaded. Placed tiles keep
+their wall mask, which covers both rotation and walls opened during play.
+All numbers are little-endian.
+
+JSON exports can be read back too, with less fidelity: they name tiles
+instead of referencing them, keep no rotations and no tile piles.
+"""
+from collections import namedtuple
+import json
+import struct
+import zlib
+
+from models.tiles import walls_to_mask
+
+
+MAGIC = b"ZIMP"
+VERSION = 2
+
+# Flags in the header
+GAME_OVER = 1
+HAS_TOTEM = 2
+OUT_OF_DEV_CARD = 4
+HAS_RNG = 8
+
+HEADER = struct.Struct("<4sHHIIBbbIb")
+_COUNT = struct.Struct("<H")
+_POSITION = struct.Struct("<hh")
+_PLACED = struct.Struct("<hhHB")
+_RNG = struct.Struct("<625I?d")
+
+_OUTCOMES = (None, "won", "killed", "out_of_time")
+_ENVIRONMENTS = ("Indoor", "Outdoor")
+_NO_TILE = 0xFFFF
+
+# What a listing of saves shows without reading the body
+SaveHeader = namedtuple(
+    "SaveHeader", "version time health attack_points turns has_totem game_over"
+)
+
+# Everything in a save, still as ids. Tile references are
+# (environment, tile id) pairs and placed tiles are (x, y, ref, wall mask).
+SaveState = namedtuple("SaveState", [
+    "time", "health", "attack_points", "turns", "chainsaw_count", "game_over",
+    "has_totem", "out_of_dev_card", "outcome", "last_damage", "position",
+    "id_order", "items", "grid", "current_tile", "previous_tile",
+    "indoor_tiles", "outdoor_tiles", "visited_tiles", "used_specials",
+    "rng_state",
+])
+
+
+def tile_ref(tile):
+    """Returns the 16-bit reference a save uses for ``tile``, which may be None."""
+    if tile is None:
+        return _NO_TILE
+    return _ENVIRONMENTS.index(tile.environment) << 15 | tile.tile_id
+
+
+def _tile_from_ref(ref):
+    if ref == _NO_TILE:
+        return None
+    return _ENVIRONMENTS[ref >> 15], ref & 0x7FFF
+
+
+def _pack_ids(ids):
+    return _COUNT.pack(len(ids)) + struct.pack(f"<{len(ids)}H", *ids)
+
+
+def _pack_text(text):
+    data = (text or "").encode("utf-8")
+    return _COUNT.pack(len(data)) + data
+
+
+def encode(game, include_rng=False):
+    """Returns ``game`` as a binary save."""
+    player = game.player
+    cards_by_item = game.catalog.cards_by_item
+    items = []
+    for item in player.items:
+        card = cards_by_item.get(item)
+        if card is None:
+            raise ValueError(f"Item '{item}' is not in the game data.")
+        items.append(card.id)
+
+    grid = player.grid
+    parts = [
+        bytes((_OUTCOMES.index(game.outcome),)),
+        _pack_text(game.last_damage),
+        _POSITION.pack(*player.position),
+        _pack_ids(list(game.id_order)),
+        _pack_ids(items),
+        _COUNT.pack(len(grid)),
+    ]
+    parts.extend(
+        _PLACED.pack(x, y, tile_ref(tile), tile.wall_mask)
+        for (x, y), tile in grid.items()
+    )
+    parts.append(_pack_ids([
+        tile_ref(player.current_tile), tile_ref(player.previous_tile)
+    ]))
+    for tiles in (player.indoor_tiles, player.outdoor_tiles, player.visited_tiles):
+        parts.append(_pack_ids([tile_ref(tile) for tile in tiles]))
+    # Only placed tiles can have used their special, e.g. Storage's item draw
+    tiles_by_ref = game.catalog.tiles_by_ref
+    parts.append(_pack_ids([
+        tile_ref(tile) for tile in grid.values()
+        if tile.special is None
+        and tiles_by_ref[tile.environment, tile.tile_id].special is not None
+    ]))
+
+    flags = (
+        (GAME_OVER if game.game_over else 0)
+        | (HAS_TOTEM if player.has_totem else 0)
+        | (OUT_OF_DEV_CARD if game.out_of_dev_card else 0)
+    )
+    if include_rng:
+        flags |= HAS_RNG
+        _, internal, gauss = game.rng.getstate()
+        parts.append(_RNG.pack(*internal, gauss is not None, gauss or 0.0))
+
+    body = b"".join(parts)
+    header = HEADER.pack(
+        MAGIC, VERSION, flags, len(body), zlib.crc32(body), game.time,
+        player.health, player.attack_points, game.turns, game.chainsaw_count,
+    )
+    return header + body
+
+
+def _unpack_header(data):
+    if len(data) < HEADER.size:
+        raise ValueError("Save is too short to be a game save.")
+    fields = HEADER.unpack_from(data)
+    if fields[0] != MAGIC:
+        raise ValueError("Not a game save.")
+    if fields[1] != VERSION:
+        raise ValueError(f"Unsupported save version {fields[1]}.")
+    return fields
+
+
+def decode_header(data):
+    """Reads the header of a binary save, without checking or reading the body."""
+    _, version, flags, _, _, time, health, attack_points, turns, _ = \
+        _unpack_header(data)
+    return SaveHeader(
+        version, time, health, attack_points, turns,
+        bool(flags & HAS_TOTEM), bool(flags & GAME_OVER),
+    )
+
+
+def decode(data):
+    """Returns the SaveState in a binary save. Raises ValueError if it is corrupt."""
+    (_, _, flags, length, crc, time, health, attack_points, turns,
+     chainsaw_count) = _unpack_header(data)
+    body = memoryview(data)[HEADER.size:]
+    if len(body) != length or zlib.crc32(body) != crc:
+        raise ValueError("Save is truncated or corrupt.")
+
+    try:
+        offset = 0
+
+        def ids():
+            nonlocal offset
+            (count,) = _COUNT.unpack_from(body, offset)
+            values = struct.unpack_from(f"<{count}H", body, offset + 2)
+            offset += 2 + 2 * count
+            return values
+
+        outcome = _OUTCOMES[body[0]]
+        (length,) = _COUNT.unpack_from(body, 1)
+        last_damage = str(body[3:3 + length], "utf-8") or None
+        offset = 3 + length
+        position = _POSITION.unpack_from(body, offset)
+        offset += _POSITION.size
+        id_order = ids()
+        items = ids()
+
+        (count,) = _COUNT.unpack_from(body, offset)
+        offset += 2
+        grid = []
+        for _ in range(count):
+            x, y, ref, mask = _PLACED.unpack_from(body, offset)
+            grid.append((x, y, _tile_from_ref(ref), mask))
+            offset += _PLACED.size
+
+        current_tile, previous_tile = map(_tile_from_ref, ids())
+        indoor_tiles, outdoor_tiles, visited_tiles, used_specials = (
+            tuple(map(_tile_from_ref, ids())) for _ in range(4)
+        )
+
+        rng_state = None
+        if flags & HAS_RNG:
+            values = _RNG.unpack_from(body, offset)
+            offset += _RNG.size
+            rng_state = (3, values[:625], values[626] if values[625] else None)
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"Save is corrupt: {e}")
+
+    return SaveState(
+        time, health, attack_points, turns, chainsaw_count,
+        bool(flags & GAME_OVER), bool(flags & HAS_TOTEM),
+        bool(flags & OUT_OF_DEV_CARD), outcome, last_damage, position,
+        id_order, items, tuple(grid), current_tile, previous_tile,
+        indoor_tiles, outdoor_tiles, visited_tiles, used_specials, rng_state,
+    )
+
+
+# Left behind by an unresolved git merge; a save containing one is corrupt
+_CONFLICT_MARKERS = (b"\n<<<<<<< ", b"\n=======\n", b"\n>>>>>>> ")
+
+
+def _load_json(data):
+    if data.startswith(b"<<<<<<< ") or any(m in data for m in _CONFLICT_MARKERS):
+        raise ValueError("Save contains unresolved merge conflict markers.")
+    try:
+        saved = json.loads(data)
+        player = saved["player"]
+        return saved, player
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Save is not a valid JSON export: {e}")
+
+
+def decode_json_header(data):
+    """Reads the header fields of a JSON export."""
+    saved, player = _load_json(data)
+    try:
+        return SaveHeader(
+            0, saved["time"], player["health"], player["attack_points"], 0,
+            player["has_totem"], saved["game_over"],
+        )
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Save is not a valid JSON export: {e}")
+
+
+def decode_json(data, catalog):
+    """
+    Returns the SaveState in a JSON export. Placed tiles are matched to the
+    catalog by name, keep their printed walls, and the tiles not on the map
+    make up the piles in catalog order.
+    """
+    saved, player = _load_json(data)
+    try:
+        unplaced = {"Indoor": list(catalog.indoor_tiles),
+                    "Outdoor": list(catalog.outdoor_tiles)}
+        grid = []
+        refs_by_name = {}
+        for key, name in saved["grid"].items():
+            x, y = (int(value) for value in key.strip("()").split(","))
+            spec = next(
+                (spec for specs in unplaced.values() for spec in specs
+                 if spec.name == name),
+                None,
+            )
+            if spec is None:
+                raise ValueError(f"Unknown or repeated tile '{name}'.")
+            unplaced[spec.environment].remove(spec)
+            ref = (spec.environment, spec.tile_id)
+            refs_by_name.setdefault(name, ref)
+            grid.append((x, y, ref, walls_to_mask(spec.walls)))
+
+        items = []
+        for item in player["item"]:
+            card = catalog.cards_by_item.get(item)
+            if card is None:
+                raise ValueError(f"Item '{item}' is not in the game data.")
+            items.append(card.id)
+
+        def placed(name):
+            if name is None:
+                return None
+            if name not in refs_by_name:
+                raise ValueError(f"Tile '{name}' is not on the saved map.")
+            return refs_by_name[name]
+
+        return SaveState(
+            saved["time"], player["health"], player["attack_points"], 0, 2,
+            saved["game_over"], player["has_totem"], False, None, None,
+            tuple(player["position"]), tuple(saved["id_order"]), tuple(items),
+            tuple(grid), placed(player["current_tile"]),
+            placed(player["previous_tile"]),
+            tuple((s.environment, s.tile_id) for s in unplaced["Indoor"]),
+            tuple((s.environment, s.tile_id) for s in unplaced["Outdoor"]),
+            tuple(ref for _, _, ref, _ in grid), (), None,
+        )
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Save is not a valid JSON export: {e}")
+
+
+def read_header(filename):
+    """
+    Returns the SaveHeader of the save at ``filename``. Binary saves only
+    have their header read, which keeps listing many saves cheap.
+    """
+    if filename.endswith(".json"):
+        with open(filename, "rb") as f:
+            return decode_json_header(f.read())
+    with open(filename, "rb") as f:
+        return decode_header(f.read(HEADER.size))
+
+
+def read(filename, catalog):
+    """Returns the SaveState of the binary save or JSON export at ``filename``."""
+    with open(filename, "rb") as f:
+        data = f.read()
+    if filename.endswith(".json"):
+        return decode_json(data, catalog)
+    return decode(data)
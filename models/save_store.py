@@ -0,0 +1,234 @@
+"""
+Where saves live. A SaveStore keeps binary saves, see save_format, by
+player id and slot name, plus one replay journal per slot.
+
+    FileSaveStore   <directory>/<player id>/<slot>.zimp and <slot>.journal
+    MongoSaveStore  a "saves" collection and a "journals" GridFS bucket
+
+Listing a player's saves only reads save headers, which the Mongo store
+keeps next to the save so the save itself is never fetched for a listing.
+put_many() writes a batch of saves, which the Mongo store sends as one
+unordered bulk upsert; the server uses it for autosaves. Only that bulk
+write, the GridFS bucket and connecting need pymongo itself.
+"""
+import datetime
+import os
+import threading
+
+from models import save_format
+from models.journal import _write_atomically
+
+try:
+    import gridfs
+    import pymongo
+except ImportError:  # only needed by MongoSaveStore
+    gridfs = pymongo = None
+
+# pymongo.ASCENDING and pymongo.DESCENDING
+_ASCENDING, _DESCENDING = 1, -1
+
+
+def _check_name(name):
+    name = str(name)
+    if not name or name.startswith(".") or "/" in name or "\\" in name:
+        raise ValueError(f"'{name}' is not a valid player id or slot name.")
+    return name
+
+
+class SaveStore:
+    """Interface for save backends."""
+
+    def put(self, player_id, slot, data):
+        """Saves ``data`` in ``slot``, replacing what was there."""
+        raise NotImplementedError
+
+    def put_many(self, saves):
+        """Writes (player id, slot, data) triples."""
+        for player_id, slot, data in saves:
+            self.put(player_id, slot, data)
+
+    def get(self, player_id, slot):
+        """Returns the save in ``slot``. Raises KeyError if there is none."""
+        raise NotImplementedError
+
+    def list(self, player_id):
+        """Returns (slot, SaveHeader) pairs for a player, newest first."""
+        raise NotImplementedError
+
+    def delete(self, player_id, slot):
+        """Removes a save and its journal, if there are any."""
+        raise NotImplementedError
+
+    def put_journal(self, player_id, slot, data):
+        """Keeps ``data`` as the replay journal of ``slot``."""
+        raise NotImplementedError
+
+    def get_journal(self, player_id, slot):
+        """Returns the replay journal of ``slot``. Raises KeyError if there is none."""
+        raise NotImplementedError
+
+
+class FileSaveStore(SaveStore):
+    """Saves as files, one directory per player."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, player_id, slot, extension):
+        return os.path.join(self.directory, _check_name(player_id),
+                            _check_name(slot) + extension)
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _write_atomically(path, data)
+
+    def _read(self, path, player_id, slot):
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise KeyError((player_id, slot))
+
+    def put(self, player_id, slot, data):
+        self._write(self._path(player_id, slot, ".zimp"), data)
+
+    def get(self, player_id, slot):
+        return self._read(self._path(player_id, slot, ".zimp"), player_id, slot)
+
+    def list(self, player_id):
+        directory = os.path.join(self.directory, _check_name(player_id))
+        try:
+            names = [name for name in os.listdir(directory) if name.endswith(".zimp")]
+        except FileNotFoundError:
+            return []
+        paths = [os.path.join(directory, name) for name in names]
+        saves = sorted(zip(paths, names), key=lambda s: os.stat(s[0]).st_mtime_ns,
+                       reverse=True)
+        return [(name[:-len(".zimp")], save_format.read_header(path))
+                for path, name in saves]
+
+    def delete(self, player_id, slot):
+        for extension in (".zimp", ".journal"):
+            try:
+                os.remove(self._path(player_id, slot, extension))
+            except FileNotFoundError:
+                pass
+
+    def put_journal(self, player_id, slot, data):
+        self._write(self._path(player_id, slot, ".journal"), data)
+
+    def get_journal(self, player_id, slot):
+        return self._read(self._path(player_id, slot, ".journal"), player_id, slot)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def shared_client(uri="mongodb://localhost:27017", **options):
+    """
+    Returns the MongoClient for ``uri``, creating it on first use. A client
+    is a connection pool, so every store in the process shares one.
+    """
+    if pymongo is None:
+        raise RuntimeError("MongoSaveStore needs pymongo.")
+    with _clients_lock:
+        client = _clients.get(uri)
+        if client is None:
+            client = _clients[uri] = pymongo.MongoClient(uri, **options)
+        return client
+
+
+def bulk_upsert(collection, upserts):
+    """
+    Writes (_id, fields) pairs to a pymongo ``collection`` as one unordered
+    bulk write, setting ``fields`` on each document and creating it if needed.
+    """
+    if pymongo is None:
+        raise RuntimeError("MongoSaveStore needs pymongo.")
+    collection.bulk_write([pymongo.UpdateOne({"_id": key}, {"$set": fields}, upsert=True)
+                           for key, fields in upserts], ordered=False)
+
+
+class MongoSaveStore(SaveStore):
+    """
+    Saves in MongoDB. ``database`` is a pymongo Database, or anything with
+    the same collection API; ``journals`` defaults to a GridFSBucket on it.
+    Batches are written with ``upsert(collection, upserts)``, by default
+    bulk_upsert().
+    """
+
+    def __init__(self, database, journals=None, upsert=bulk_upsert):
+        if journals is None:
+            if gridfs is None:
+                raise RuntimeError("MongoSaveStore needs pymongo.")
+            journals = gridfs.GridFSBucket(database, bucket_name="journals")
+        self.saves = database["saves"]
+        self.journals = journals
+        self.upsert = upsert
+        self.saves.create_index([("player_id", _ASCENDING), ("updated_at", _DESCENDING)])
+        self.saves.create_index([("updated_at", _DESCENDING)])
+
+    @classmethod
+    def connect(cls, uri="mongodb://localhost:27017", database="zimp", **options):
+        """Returns a store on ``database`` using the shared client for ``uri``."""
+        return cls(shared_client(uri, **options)[database])
+
+    @staticmethod
+    def _key(player_id, slot):
+        return f"{_check_name(player_id)}/{_check_name(slot)}"
+
+    def _upsert(self, player_id, slot, data, now):
+        header = save_format.decode_header(data)
+        return self._key(player_id, slot), {
+            "player_id": str(player_id),
+            "slot": str(slot),
+            "data": bytes(data),
+            "header": header._asdict(),
+            "updated_at": now,
+        }
+
+    def put(self, player_id, slot, data):
+        self.put_many([(player_id, slot, data)])
+
+    def put_many(self, saves):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        upserts = [self._upsert(player_id, slot, data, now)
+                   for player_id, slot, data in saves]
+        if upserts:
+            self.upsert(self.saves, upserts)
+
+    def get(self, player_id, slot):
+        document = self.saves.find_one({"_id": self._key(player_id, slot)},
+                                       {"data": True})
+        if document is None:
+            raise KeyError((player_id, slot))
+        return bytes(document["data"])
+
+    def list(self, player_id):
+        documents = self.saves.find(
+            {"player_id": _check_name(player_id)}, {"slot": True, "header": True}
+        ).sort("updated_at", _DESCENDING)
+        return [(document["slot"], save_format.SaveHeader(**document["header"]))
+                for document in documents]
+
+    def delete(self, player_id, slot):
+        key = self._key(player_id, slot)
+        self.saves.delete_one({"_id": key})
+        for stored in self.journals.find({"filename": key}):
+            self.journals.delete(stored._id)
+
+    def put_journal(self, player_id, slot, data):
+        key = self._key(player_id, slot)
+        new_id = self.journals.upload_from_stream(key, data)
+        # GridFS keeps every upload as a revision; only the latest is wanted
+        for stored in self.journals.find({"filename": key, "_id": {"$ne": new_id}}):
+            self.journals.delete(stored._id)
+
+    def get_journal(self, player_id, slot):
+        # The newest revision, should a put_journal() be under way
+        stored = max(self.journals.find({"filename": self._key(player_id, slot)}),
+                     key=lambda stored: stored.upload_date, default=None)
+        if stored is None:
+            raise KeyError((player_id, slot))
+        return stored.read()
@@ -0,0 +1,196 @@
+"""
+Compact, immutable game states for search, keyed by Zobrist hashes.
+
+A SearchState holds what decides how a game can go on: time, health,
+attack points, chainsaw uses, the items held as a bitset of dev card ids,
+the totem flag, the dev card order, the player's position and every
+placed tile with its wall mask, each packed into one int. Its ``key`` is
+the XOR of one 64-bit number per feature, so
+
+    moved(), drawn(), placed() and updated()
+
+return the next state and its key by XORing out the features that change
+and XORing in the new ones, without looking at the rest of the state.
+States hash to their key and compare it first, so a transposition table
+can hold millions of them and tell two apart in O(1).
+
+Feature numbers are derived from the feature itself with child_seed, so
+every process computes the same keys.
+"""
+from bisect import bisect_left
+from collections import namedtuple
+import functools
+
+from models.save_format import tile_ref
+from models.seeding import child_seed
+
+
+ZOBRIST_SEED = 0x5A494D50  # "ZIMP"
+
+
+@functools.lru_cache(maxsize=None)
+def zobrist(*feature):
+    """Returns the 64-bit number of one feature, e.g. ("health", 4)."""
+    return child_seed(ZOBRIST_SEED, *feature)
+
+
+def pack_tile(x, y, ref, mask):
+    """Packs a placed tile: position, (environment, tile id) reference and walls."""
+    return (x & 0xFF) << 28 | (y & 0xFF) << 20 | ref << 4 | mask
+
+
+def unpack_tile(packed):
+    """Returns (x, y, ref, mask) of a packed tile."""
+    x = packed >> 28 & 0xFF
+    y = packed >> 20 & 0xFF
+    return (x - 256 if x > 127 else x, y - 256 if y > 127 else y,
+            packed >> 4 & 0xFFFF, packed & 0xF)
+
+
+def bits_of(bitset):
+    """Yields the numbers of the bits set in ``bitset``, lowest first."""
+    while bitset:
+        low = bitset & -bitset
+        yield low.bit_length() - 1
+        bitset ^= low
+
+
+def field_key(field, value):
+    """XOR of the feature numbers of one field of a state."""
+    if field == "items":
+        key = 0
+        for card_id in bits_of(value):
+            key ^= zobrist("item", card_id)
+        return key
+    if field == "deck":
+        # Cards are numbered from the bottom, so drawing the top card
+        # leaves the numbers of the others alone
+        key = 0
+        depth = len(value)
+        for card_id in value:
+            depth -= 1
+            key ^= zobrist("deck", depth, card_id)
+        return key
+    if field == "tiles":
+        key = 0
+        for packed in value:
+            key ^= zobrist("tile", packed)
+        return key
+    if field == "has_totem":
+        return zobrist("totem") if value else 0
+    if field == "position":
+        return zobrist("position", *value)
+    return zobrist(field, value)
+
+
+_FIELDS = ("time", "health", "attack_points", "chainsaw_count", "items",
+           "has_totem", "deck", "position", "tiles")
+
+
+class SearchState(namedtuple("SearchState", ("key",) + _FIELDS)):
+    """
+    An immutable game state. ``deck`` lists dev card ids top card first,
+    ``items`` has bit ``id`` set for every dev card id whose item is held
+    and ``tiles`` is a sorted tuple of pack_tile() ints. Packed tiles sort
+    by position first, so tile_at() and placed() find a position by
+    bisection; placing still copies the tuple, but without a Python loop.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def build(cls, time, health, attack_points, chainsaw_count, items,
+              has_totem, deck, position, tiles):
+        """Returns a state with its key computed from scratch."""
+        values = (time, health, attack_points, chainsaw_count, items,
+                  has_totem, tuple(deck), tuple(position), tuple(sorted(tiles)))
+        key = 0
+        for field, value in zip(_FIELDS, values):
+            key ^= field_key(field, value)
+        return cls(key, *values)
+
+    @classmethod
+    def from_game(cls, game):
+        player = game.player
+        cards_by_item = game.catalog.cards_by_item
+        items = 0
+        for item in player.items:
+            items |= 1 << cards_by_item[item].id
+        return cls.build(
+            game.time, player.health, player.attack_points, game.chainsaw_count,
+            items, player.has_totem, game.id_order, player.position,
+            (pack_tile(x, y, tile_ref(tile), tile.wall_mask)
+             for (x, y), tile in player.grid.items()),
+        )
+
+    @classmethod
+    def from_save(cls, state):
+        """Returns the search state of a save_format.SaveState."""
+        items = 0
+        for card_id in state.items:
+            items |= 1 << card_id
+        environments = ("Indoor", "Outdoor")
+        return cls.build(
+            state.time, state.health, state.attack_points, state.chainsaw_count,
+            items, state.has_totem, state.id_order, state.position,
+            (pack_tile(x, y, environments.index(env) << 15 | tile_id, mask)
+             for x, y, (env, tile_id), mask in state.grid),
+        )
+
+    def __hash__(self):
+        return self.key
+
+    def __eq__(self, other):
+        if not isinstance(other, SearchState):
+            return NotImplemented
+        return self.key == other.key and tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def updated(self, **changes):
+        """Returns the state with ``changes`` applied, updating the key field by field."""
+        key = self.key
+        for field, value in changes.items():
+            key ^= field_key(field, getattr(self, field)) ^ field_key(field, value)
+        return self._replace(key=key, **changes)
+
+    def moved(self, position):
+        """Returns the state with the player at ``position``."""
+        return self._replace(
+            key=self.key ^ zobrist("position", *self.position)
+            ^ zobrist("position", *position),
+            position=tuple(position),
+        )
+
+    def drawn(self):
+        """Returns the state after the top dev card is drawn."""
+        deck = self.deck
+        return self._replace(
+            key=self.key ^ zobrist("deck", len(deck) - 1, deck[0]), deck=deck[1:]
+        )
+
+    def placed(self, x, y, ref, mask):
+        """Returns the state with a tile placed, or re-placed with new walls, at (x, y)."""
+        packed = pack_tile(x, y, ref, mask)
+        key = self.key ^ zobrist("tile", packed)
+        tiles = self.tiles
+        index = _find(tiles, packed >> 20)
+        end = index
+        if index < len(tiles) and tiles[index] >> 20 == packed >> 20:
+            key ^= zobrist("tile", tiles[index])
+            end += 1
+        return self._replace(key=key, tiles=tiles[:index] + (packed,) + tiles[end:])
+
+    def tile_at(self, x, y):
+        """Returns (ref, mask) of the tile at (x, y), or None."""
+        at = (x & 0xFF) << 8 | (y & 0xFF)
+        tiles = self.tiles
+        index = _find(tiles, at)
+        if index < len(tiles) and tiles[index] >> 20 == at:
+            return unpack_tile(tiles[index])[2:]
+        return None
+
+
+def _find(tiles, at):
+    """Index of the first packed tile at or after position bits ``at``."""
+    return bisect_left(tiles, at << 20)
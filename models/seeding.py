@@ -0,0 +1,20 @@
+import hashlib
+
+
+def child_seed(seed, *path):
+    """
+    Derives an independent 64-bit seed from ``seed`` and a path of labels.
+
+    ``child_seed(run_seed, 42)`` is the seed of game 42 of a run and
+    ``child_seed(game_seed, "policy")`` the seed of that game's policy. The
+    result only depends on the arguments, so any process computes the same
+    seeds and any game can be replayed on its own.
+    """
+    label = ":".join(str(part) for part in (seed,) + path)
+    digest = hashlib.blake2b(label.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def spawn_seeds(seed, count, start=0):
+    """Returns the seeds of children ``start`` to ``start + count - 1``."""
+    return [child_seed(seed, index) for index in range(start, start + count)]
@@ -0,0 +1,283 @@
+"""
+Asyncio game server: one Game per TCP connection, all in one thread.
+
+    python -m models.server --port 8765 --language en
+
+The protocol is one JSON object per line. The server sends
+
+    {"type": "player", "id": ...}
+    {"type": "event", "key": ..., "text": ...}
+    {"type": "prompt", "key": ..., "text": ..., "options": [...]}
+    {"type": "done", "outcome": ..., "turns": ...}
+    {"type": "error", "text": ...}
+
+and the client answers each prompt with one line holding its decision.
+The "player" message comes first: the id the game is autosaved under,
+which stays valid across server restarts. Answering any prompt with
+"//resume <player id>" swaps the game for the one autosaved under that id
+instead; the server replies with a "player" message for it and its
+prompt, or with an error and the same prompt again if there is no such
+autosave or that player is already connected.
+Saving is the server's business, so prompts never offer "//save" and a
+client sending it gets an error and the same prompt again.
+
+A session is a GameEngine, so waiting for a player is just an await on
+their connection: idle sessions cost memory, not threads. Localization
+and game data are loaded once and shared by every session. With
+``--session-dir``, sessions idle for ``--idle-timeout`` seconds, or beyond
+the ``--max-live`` most recently used, are parked on disk by a
+SessionCache and brought back when their player answers. Given a
+save_store.SaveStore, every session's game is also autosaved at the start
+of each turn, in batches, to the "autosave" slot of its player id.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import uuid
+
+from models import session_cache
+from models.catalog import load_catalog
+from models.game import Game
+from models.localization import as_table, load as load_localization
+from models.save_store import FileSaveStore, MongoSaveStore
+from models.seeding import child_seed
+from models.session_cache import SessionCache
+
+
+_NO_SAVING = "Games are saved by the server; '//save' is not a decision here."
+_NO_AUTOSAVE = "There is no autosave for player '{}'."
+_PLAYING = "Player '{}' is already playing."
+
+
+def _line(message):
+    return (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class Session(session_cache.Session):
+    """One hosted game and the connection playing it."""
+    __slots__ = ()
+
+    def messages(self, events):
+        """The lines to send after ``events``: the events, then the prompt or the end."""
+        lines = [_line({"type": "event", "key": e.key, "text": e.text})
+                 for e in events]
+        engine = self.engine
+        if engine.done:
+            lines.append(_line({
+                "type": "done", "outcome": self.game.outcome or "abandoned",
+                "turns": self.game.turns,
+            }))
+        else:
+            prompt = engine.prompt
+            lines.append(_line({
+                "type": "prompt", "key": prompt.key, "text": prompt.text,
+                "options": [o for o in prompt.options if o != "//save"],
+            }))
+        return b"".join(lines)
+
+
+class GameServer:
+    """
+    Hosts a Session per connection. ``seed`` makes session ``n`` replay the
+    same game on every run; without it every session is freshly shuffled.
+    Given a ``session_dir``, idle sessions are parked there, see SessionCache
+    for ``max_live`` and ``idle_timeout``. Every ``sweep_interval`` seconds
+    the cache is swept for idle sessions and pending autosaves are written
+    to ``save_store`` with one put_many().
+    """
+
+    def __init__(self, localization, catalog=None, seed=None, session_dir=None,
+                 max_live=10000, idle_timeout=300.0, sweep_interval=5.0,
+                 save_store=None):
+        self.localization = as_table(localization)
+        self.catalog = catalog if catalog is not None else load_catalog()
+        self.seed = seed
+        self.sessions = SessionCache(
+            self.localization, self.catalog, session_dir, max_live, idle_timeout,
+            session_class=Session,
+        )
+        self.sweep_interval = sweep_interval
+        self.save_store = save_store
+        self._autosaves = {}  # player id -> latest unwritten checkpoint
+        self._players = set()  # ids of the players connected
+        self._ids = itertools.count()
+        self._server = None
+        self._sweeper = None
+
+    def new_session(self):
+        session_id = next(self._ids)
+        seed = None if self.seed is None else child_seed(self.seed, session_id)
+        game = Game(self.localization, seed=seed, catalog=self.catalog)
+        session = Session(session_id, game)
+        self.sessions.add(session)
+        return session
+
+    def end_session(self, session_id):
+        self.sessions.remove(session_id)
+
+    async def resume_session(self, session_id, player_id):
+        """
+        Replaces session ``session_id`` with the game autosaved for
+        ``player_id``, pending or in the store. Raises KeyError if there is
+        none, and ValueError if it does not load or the player is connected.
+        """
+        data = self._autosaves.get(player_id)
+        if data is None:
+            if self.save_store is None:
+                raise KeyError(player_id)
+            data = await asyncio.get_running_loop().run_in_executor(
+                None, self.save_store.get, player_id, "autosave"
+            )
+        # Checked after the read, as another connection may have resumed meanwhile
+        if player_id in self._players:
+            raise ValueError(_PLAYING.format(player_id))
+        session = Session.resume(session_id, data, self.localization, self.catalog)
+        self.sessions.remove(session_id)
+        self.sessions.add(session)
+        return session
+
+    async def handle(self, reader, writer):
+        session = self.new_session()
+        session_id = session.session_id
+        # Session ids restart with the server, so saves are keyed apart
+        player_id = uuid.uuid4().hex
+        self._players.add(player_id)
+        try:
+            writer.write(_line({"type": "player", "id": player_id})
+                         + session.messages(session.start(self.catalog)))
+            done = session.engine.done
+            # Hold only the id while the player thinks, so the cache can park
+            # the game in the meantime
+            session = None
+            await writer.drain()
+            while not done:
+                line = await reader.readline()
+                if not line:
+                    break  # the player left
+                session = self.sessions.get(session_id)
+                decision = line.decode("utf-8").strip()
+                if decision.lower() == "//save":
+                    # Game.save_game would write the server's working directory
+                    writer.write(_line({"type": "error", "text": _NO_SAVING})
+                                 + session.messages(()))
+                    session = None
+                    await writer.drain()
+                    continue
+                if decision.lower().startswith("//resume"):
+                    resumed_id = decision[len("//resume"):].strip()
+                    session = None
+                    try:
+                        await self.resume_session(session_id, resumed_id)
+                    except KeyError:
+                        reply = _line({"type": "error",
+                                       "text": _NO_AUTOSAVE.format(resumed_id)})
+                    except ValueError as e:
+                        reply = _line({"type": "error", "text": str(e)})
+                    else:
+                        self._players.discard(player_id)
+                        player_id = resumed_id
+                        self._players.add(player_id)
+                        reply = _line({"type": "player", "id": player_id})
+                    session = self.sessions.get(session_id)
+                    writer.write(reply + session.messages(()))
+                    done = session.engine.done
+                    session = None
+                    await writer.drain()
+                    continue
+                checkpoint = session.checkpoint
+                events = session.step(decision)
+                if self.save_store is not None and session.checkpoint is not checkpoint:
+                    self._autosaves[player_id] = session.checkpoint
+                writer.write(session.messages(events))
+                done = session.engine.done
+                session = None
+                await writer.drain()
+        except (ConnectionError, UnicodeDecodeError):
+            pass
+        finally:
+            self._players.discard(player_id)
+            self.end_session(session_id)
+            writer.close()
+
+    async def flush_autosaves(self):
+        """Writes the pending autosaves in one batch, off the event loop."""
+        if not self._autosaves:
+            return
+        batch = [(player_id, "autosave", data)
+                 for player_id, data in self._autosaves.items()]
+        self._autosaves = {}
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.save_store.put_many, batch
+        )
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.sessions.evict_idle()
+            if self.save_store is not None:
+                await self.flush_autosaves()
+
+    async def start(self, host="127.0.0.1", port=8765, backlog=4096):
+        """Starts listening and returns the bound (host, port)."""
+        # asyncio's default backlog of 100 makes bursts of new players wait
+        # out SYN retransmits, so accept a deep queue
+        self._server = await asyncio.start_server(
+            self.handle, host, port, backlog=backlog
+        )
+        if self.sessions.directory is not None or self.save_store is not None:
+            self._sweeper = asyncio.create_task(self._sweep())
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+        self._server.close()
+        await self._server.wait_closed()
+        if self.save_store is not None:
+            await self.flush_autosaves()
+
+
+async def _main(args):
+    save_store = None
+    if args.mongo_uri:
+        save_store = MongoSaveStore.connect(args.mongo_uri)
+    elif args.save_dir:
+        save_store = FileSaveStore(args.save_dir)
+    server = GameServer(
+        load_localization(args.language), seed=args.seed,
+        session_dir=args.session_dir, max_live=args.max_live,
+        idle_timeout=args.idle_timeout, save_store=save_store,
+    )
+    host, port = await server.start(args.host, args.port)
+    print(f"Serving Zombie in my Pocket on {host}:{port}")
+    await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host Zombie in my Pocket games.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--session-dir",
+                        help="directory to park idle sessions in; keeps all in memory if omitted")
+    parser.add_argument("--max-live", type=int, default=10000,
+                        help="sessions kept in memory before the least recently used are parked")
+    parser.add_argument("--idle-timeout", type=float, default=300.0,
+                        help="seconds without a decision before a session is parked")
+    parser.add_argument("--save-dir", help="autosave every game to this directory")
+    parser.add_argument("--mongo-uri", help="autosave every game to this MongoDB")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+LRU cache of live game sessions that parks idle ones on disk.
+
+A session keeps a checkpoint, the binary save of its game at the start of
+the current turn, and the decisions made since with the key of the prompt
+each answered. Evicting a session writes those to
+``<directory>/<session id>.session`` and drops its Game; the next get()
+rebuilds the game from the checkpoint, resumes it at the turn's move
+prompt and replays the decisions, leaving it waiting on the same prompt as
+before. Callers never see the difference except in latency, and a replay
+that meets a different prompt raises ValueError rather than bringing back
+another game.
+"""
+from collections import OrderedDict, deque
+import os
+import struct
+import time
+
+from models import save_format
+from models.engine import GameEngine
+from models.game import Game
+
+
+_LENGTH = struct.Struct("<I")
+_DECISION = struct.Struct("<H")
+
+
+class Session:
+    """One hosted game, checkpointed at the start of every turn."""
+    __slots__ = ("session_id", "game", "engine", "checkpoint", "tail", "last_used")
+
+    def __init__(self, session_id, game):
+        self.session_id = session_id
+        self.game = game
+        self.engine = GameEngine(game)
+        self.checkpoint = None
+        self.tail = []
+        self.last_used = 0.0
+
+    def start(self, catalog):
+        events = self.engine.start(*catalog.new_tiles())
+        self._track(None)
+        return events
+
+    def step(self, decision):
+        key = self.engine.prompt.key
+        events = self.engine.step(decision)
+        self._track((key, decision))
+        return events
+
+    def _track(self, answer):
+        engine = self.engine
+        if not engine.done and engine.prompt.key == "move":
+            self.checkpoint = save_format.encode(self.game, include_rng=True)
+            self.tail = []
+        elif answer is not None:
+            self.tail.append(answer)
+
+    def dump(self):
+        """Returns the checkpoint and the (prompt key, decision) pairs since as bytes."""
+        parts = [_LENGTH.pack(len(self.checkpoint)), self.checkpoint,
+                 _LENGTH.pack(len(self.tail))]
+        for key, decision in self.tail:
+            data = f"{key}\n{decision}".encode("utf-8")
+            parts.append(_DECISION.pack(len(data)) + data)
+        return b"".join(parts)
+
+    @classmethod
+    def load(cls, session_id, data, localization, catalog):
+        """
+        Rebuilds a session from dump() output, waiting on the same prompt.
+        Raises ValueError if the data is corrupt or a decision meets a
+        different prompt than the one it answered.
+        """
+        try:
+            (length,) = _LENGTH.unpack_from(data)
+            checkpoint = bytes(data[4:4 + length])
+            offset = 4 + length
+            (count,) = _LENGTH.unpack_from(data, offset)
+            offset += 4
+            tail = []
+            for _ in range(count):
+                (size,) = _DECISION.unpack_from(data, offset)
+                offset += 2
+                key, _, decision = data[offset:offset + size].decode("utf-8").partition("\n")
+                tail.append((key, decision))
+                offset += size
+        except (struct.error, UnicodeDecodeError) as e:
+            raise ValueError(f"Parked session {session_id} is corrupt: {e}")
+
+        session = cls.resume(session_id, checkpoint, localization, catalog)
+        engine = session.engine
+        for number, (key, decision) in enumerate(tail):
+            if engine.done or engine.prompt.key != key:
+                raise ValueError(
+                    f"Parked session {session_id} does not replay: decision "
+                    f"{number} answered '{key}', but the game is at "
+                    f"'{None if engine.done else engine.prompt.key}'."
+                )
+            engine.step(decision)
+        session.tail = tail
+        return session
+
+    @classmethod
+    def resume(cls, session_id, checkpoint, localization, catalog):
+        """
+        Rebuilds a session from a checkpoint, waiting on its move prompt.
+        Raises ValueError if the checkpoint is not a valid save.
+        """
+        session = cls(session_id, Game(localization, catalog=catalog))
+        session.game.restore_state(save_format.decode(checkpoint))
+        session.engine.resume()
+        session.checkpoint = checkpoint
+        return session
+
+
+class SessionCache:
+    """
+    Holds at most ``capacity`` live sessions, least recently used first.
+    Sessions idle for ``idle_timeout`` seconds are parked by evict_idle(),
+    and the least recently used ones are parked whenever the cache is full.
+    Without a ``directory`` nothing is ever parked. A session can only be
+    parked once it has a checkpoint, that is once its game has started.
+    Rehydration latencies are kept for the last ``latency_window`` misses.
+    """
+
+    def __init__(self, localization, catalog, directory=None, capacity=10000,
+                 idle_timeout=300.0, session_class=Session, clock=time.monotonic,
+                 latency_window=1024):
+        self.localization = localization
+        self.catalog = catalog
+        self.session_class = session_class
+        self.directory = directory
+        self.capacity = capacity
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self._live = OrderedDict()
+        self._parked = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rehydration_seconds = deque(maxlen=latency_window)
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._live) + len(self._parked)
+
+    def __contains__(self, session_id):
+        return session_id in self._live or session_id in self._parked
+
+    @property
+    def live(self):
+        return len(self._live)
+
+    def add(self, session):
+        session.last_used = self.clock()
+        self._live[session.session_id] = session
+        self._make_room(keep=session.session_id)
+
+    def get(self, session_id):
+        """Returns the session, rehydrating it from disk if it was parked."""
+        session = self._live.get(session_id)
+        if session is not None:
+            self.hits += 1
+            self._live.move_to_end(session_id)
+        else:
+            if session_id not in self._parked:
+                raise KeyError(session_id)
+            self.misses += 1
+            started = time.perf_counter()
+            session = self._rehydrate(session_id)
+            self.rehydration_seconds.append(time.perf_counter() - started)
+            self._live[session_id] = session
+            self._make_room(keep=session_id)
+        session.last_used = self.clock()
+        return session
+
+    def remove(self, session_id):
+        if self._live.pop(session_id, None) is None and session_id in self._parked:
+            self._parked.discard(session_id)
+            os.remove(self._path(session_id))
+
+    def evict_idle(self):
+        """Parks every session idle for longer than the timeout; returns how many."""
+        if self.directory is None:
+            return 0
+        cutoff = self.clock() - self.idle_timeout
+        idle = [session for session in self._live.values()
+                if session.last_used <= cutoff]
+        return sum(self._park(session) for session in idle)
+
+    def metrics(self):
+        lookups = self.hits + self.misses
+        latencies = self.rehydration_seconds
+        return {
+            "live": len(self._live),
+            "parked": len(self._parked),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "evictions": self.evictions,
+            "rehydration_ms_mean":
+                sum(latencies) / len(latencies) * 1000 if latencies else None,
+            "rehydration_ms_max": max(latencies) * 1000 if latencies else None,
+        }
+
+    def _make_room(self, keep=None):
+        """
+        Parks the least recently used sessions over capacity, except
+        ``keep``, the session being handed to the caller, which stays live
+        even when the capacity is too small to hold it.
+        """
+        if self.directory is None:
+            return
+        excess = len(self._live) - self.capacity
+        if excess <= 0:
+            return
+        # Walk from the least recently used end only as far as needed;
+        # parking is deferred since it removes sessions from the walk
+        parkable = []
+        for session in self._live.values():
+            if session.session_id != keep and self._parkable(session):
+                parkable.append(session)
+                if len(parkable) == excess:
+                    break
+        for session in parkable:
+            self._park(session)
+
+    @staticmethod
+    def _parkable(session):
+        # Not started yet, or finished and about to be removed
+        return session.checkpoint is not None and not session.engine.done
+
+    def _park(self, session):
+        """Moves ``session`` to disk and returns whether it could be."""
+        if not self._parkable(session):
+            return False
+        with open(self._path(session.session_id), "wb") as f:
+            f.write(session.dump())
+        del self._live[session.session_id]
+        self._parked.add(session.session_id)
+        self.evictions += 1
+        return True
+
+    def _rehydrate(self, session_id):
+        path = self._path(session_id)
+        with open(path, "rb") as f:
+            data = f.read()
+        session = self.session_class.load(
+            session_id, data, self.localization, self.catalog
+        )
+        self._parked.discard(session_id)
+        os.remove(path)
+        return session
+
+    def _path(self, session_id):
+        return os.path.join(self.directory, f"{session_id}.session")
@@ -0,0 +1,196 @@
+"""
+Monte Carlo simulator: plays complete games headless across a process pool.
+
+    python -m models.simulate --games 100000 --workers 8 --seed 1 --policy cautious
+
+Each worker plays a chunk of consecutive game indexes and sends the per-game
+results back as one list, so results stream in while other chunks are still
+running. Game ``i`` always gets the same seed for a given ``--seed``, no
+matter how many workers or how large the chunks are, and its policy draws
+from a separate stream, so comparing policies on the same ``--seed`` plays
+them against the same decks and tiles (common random numbers).
+
+    python -m models.simulate --replay 1234567890 --policy cautious
+
+prints the full transcript of the game with that per-game seed.
+"""
+import argparse
+from collections import Counter, namedtuple
+import json
+from multiprocessing import Pool
+import os
+import random
+import time
+
+from models.catalog import load_catalog
+from models.engine import GameEngine
+from models.game import Game
+from models.localization import load as load_localization
+from models.policies import POLICIES
+from models.seeding import child_seed, spawn_seeds
+
+
+# One finished game. ``outcome`` is "won", "killed", "out_of_time" or
+# "stalled" (hit the decision cap, e.g. no tiles left to explore).
+GameResult = namedtuple("GameResult", "index seed outcome cause turns decisions")
+
+_localization = None
+_catalog = None
+
+
+def _init_worker():
+    """Loads the shared game data once per worker process."""
+    global _localization, _catalog
+    _localization = load_localization("en")
+    _catalog = load_catalog()
+
+
+def game_seed(seed, index):
+    """Returns the seed of game ``index`` in a run started with ``seed``."""
+    return child_seed(seed, index)
+
+
+def play_seeded(seed, policy_name="random", max_decisions=2000, on_events=None):
+    """Plays the game with per-game ``seed`` and returns (game, decisions)."""
+    if _localization is None:
+        _init_worker()
+    policy = POLICIES[policy_name](random.Random(child_seed(seed, "policy")))
+
+    game = Game(_localization, seed=seed, catalog=_catalog)
+    engine = GameEngine(game)
+    indoor_tiles, outdoor_tiles = _catalog.new_tiles()
+    events = engine.start(indoor_tiles, outdoor_tiles)
+
+    decisions = 0
+    while not engine.done and decisions < max_decisions:
+        if on_events is not None:
+            on_events(events, engine.prompt)
+        events = engine.step(policy.choose(game, engine.prompt))
+        decisions += 1
+    if on_events is not None:
+        on_events(events, None)
+    return game, decisions
+
+
+def play_game(index, seed, policy_name="random", max_decisions=2000):
+    """Plays game ``index`` of a run with the named policy and returns its result."""
+    return _result(index, game_seed(seed, index), policy_name, max_decisions)
+
+
+def _result(index, seed, policy_name, max_decisions):
+    game, decisions = play_seeded(seed, policy_name, max_decisions)
+    outcome = game.outcome or "stalled"
+    cause = game.last_damage if outcome == "killed" else None
+    return GameResult(index, seed, outcome, cause, game.turns, decisions)
+
+
+def play_chunk(job):
+    """Plays games ``start`` to ``start + count - 1`` and returns their results."""
+    start, count, seed, policy_name, max_decisions = job
+    return [
+        _result(index, seed_of_game, policy_name, max_decisions)
+        for index, seed_of_game in enumerate(spawn_seeds(seed, count, start), start)
+    ]
+
+
+class Summary:
+    """Running totals over the results streamed back from the workers."""
+
+    def __init__(self):
+        self.games = 0
+        self.outcomes = Counter()
+        self.causes = Counter()
+        self.turns = 0
+        self.turns_to_death = 0
+
+    def add(self, result):
+        self.games += 1
+        self.outcomes[result.outcome] += 1
+        self.turns += result.turns
+        if result.outcome == "killed":
+            self.causes[result.cause] += 1
+            self.turns_to_death += result.turns
+
+    def as_dict(self):
+        deaths = self.outcomes["killed"]
+        return {
+            "games": self.games,
+            "win_rate": self.outcomes["won"] / self.games if self.games else 0.0,
+            "average_turns": self.turns / self.games if self.games else 0.0,
+            "average_turns_to_death": self.turns_to_death / deaths if deaths else None,
+            "outcomes": dict(self.outcomes),
+            "cause_of_death": dict(self.causes),
+        }
+
+
+def simulate(games, workers=1, seed=0, policy_name="random", chunk_size=256,
+             max_decisions=2000, on_result=None):
+    """
+    Plays ``games`` games and returns a Summary.
+
+    ``on_result`` is called with every GameResult as its chunk arrives, which
+    lets callers keep per-game records without holding them all in memory.
+    """
+    if policy_name not in POLICIES:
+        raise ValueError(f"Unknown policy '{policy_name}'.")
+    jobs = [
+        (start, min(chunk_size, games - start), seed, policy_name, max_decisions)
+        for start in range(0, games, chunk_size)
+    ]
+    summary = Summary()
+
+    def collect(results):
+        for result in results:
+            summary.add(result)
+            if on_result is not None:
+                on_result(result)
+
+    if workers <= 1:
+        _init_worker()
+        for job in jobs:
+            collect(play_chunk(job))
+    else:
+        with Pool(workers, initializer=_init_worker) as pool:
+            for results in pool.imap_unordered(play_chunk, jobs):
+                collect(results)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate Zombie in my Pocket games.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--max-decisions", type=int, default=2000)
+    parser.add_argument("--replay", type=int, metavar="GAME_SEED",
+                        help="print the transcript of one game instead")
+    args = parser.parse_args(argv)
+
+    if args.replay is not None:
+        def show(events, prompt):
+            for event in events:
+                print(event.text)
+            if prompt is not None:
+                print(prompt.text)
+
+        game, _ = play_seeded(args.replay, args.policy, args.max_decisions, show)
+        print(f"\nOutcome: {game.outcome or 'stalled'} after {game.turns} turns")
+        return
+
+    started = time.perf_counter()
+    summary = simulate(
+        args.games, args.workers, args.seed, args.policy,
+        args.chunk_size, args.max_decisions,
+    )
+    elapsed = time.perf_counter() - started
+
+    report = summary.as_dict()
+    report["seconds"] = round(elapsed, 3)
+    report["games_per_second"] = round(args.games / elapsed, 1) if elapsed else None
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
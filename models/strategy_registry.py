@@ -0,0 +1,54 @@
+"""
+Which strategy resolves each kind of dev-card event.
+
+Every Game builds one instance of each registered strategy when it is
+created and reuses them for every card it resolves. A strategy therefore
+keeps no state between calls other than the game it belongs to.
+
+New event kinds are added with register_event_kind(), before the catalog
+is loaded and before the games that should use them are created:
+
+    register_event_kind("trap", TrapStrategy, parse_trap)
+
+where ``parse_trap(text)`` returns a CardEvent with kind "trap" for the card
+texts it recognises and None for everything else. unregister_event_kind()
+takes the same kind and parser back out.
+"""
+from models.card_events import add_event_parser, remove_event_parser
+from models.generic_event_strategy import GenericEventStrategy
+from models.health_change_strategy import HealthChangeStrategy
+from models.item_acquisition_strategy import ItemAcquisitionStrategy
+from models.low_health_strategy import LowHealthStrategy
+from models.zombie_fight_strategy import ZombieFightStrategy
+
+
+# Resolves any card while the player's health is critical
+LOW_HEALTH = "low_health"
+
+EVENT_STRATEGIES = {
+    LOW_HEALTH: LowHealthStrategy,
+    "zombies": ZombieFightStrategy,
+    "health": HealthChangeStrategy,
+    "item": ItemAcquisitionStrategy,
+    "message": GenericEventStrategy,
+}
+
+
+def register_event_kind(kind, strategy_class, parser=None):
+    """Resolves events of ``kind`` with ``strategy_class``, recognising them with ``parser``."""
+    EVENT_STRATEGIES[kind] = strategy_class
+    if parser is not None:
+        add_event_parser(parser)
+
+
+def unregister_event_kind(kind, parser=None):
+    """Undoes register_event_kind(``kind``, ..., ``parser``)."""
+    del EVENT_STRATEGIES[kind]
+    if parser is not None:
+        remove_event_parser(parser)
+
+
+def build_strategies(game):
+    """Returns {event kind: strategy} with one instance of each strategy for ``game``."""
+    return {kind: strategy_class(game)
+            for kind, strategy_class in EVENT_STRATEGIES.items()}
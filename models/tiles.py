@@ -1,9 +1,52 @@
 from enums.directions import Direction
-import json
 import random
 
 
+# Walls are kept as a 4-bit mask: bit i is set when side Direction(i) is a
+# wall. Everything movement asks about a tile is precomputed per mask.
+_SIDES = range(4)
+
+# _ROTATED[turns][mask]: the mask after rotating clockwise ``turns`` times
+_ROTATED = tuple(
+    tuple(((mask << turns) | (mask >> (4 - turns))) & 0b1111 for mask in range(16))
+    for turns in _SIDES
+)
+
+# _WALLS[mask]: the (left, up, right, down) wall flags
+_WALLS = tuple(tuple((mask >> side) & 1 for side in _SIDES) for mask in range(16))
+
+# _EXITS[mask]: the open sides as Directions
+_EXITS = tuple(
+    tuple(Direction(side) for side in _SIDES if not (mask >> side) & 1)
+    for mask in range(16)
+)
+
+# _TURNS_TO_OPEN[mask][side]: fewest clockwise rotations that open ``side``,
+# or None when the tile has no exit at all
+_TURNS_TO_OPEN = tuple(
+    tuple(
+        next(
+            (turns for turns in _SIDES if not (_ROTATED[turns][mask] >> side) & 1),
+            None,
+        )
+        for side in _SIDES
+    )
+    for mask in range(16)
+)
+
+
+def walls_to_mask(walls):
+    """Packs a (left, up, right, down) sequence of wall flags into a mask."""
+    mask = 0
+    for side, wall in enumerate(walls):
+        if wall:
+            mask |= 1 << side
+    return mask
+
+
 class Tile:
+    __slots__ = ("tile_id", "name", "wall_mask", "special", "environment")
+
     def __init__(self, tile_id, name, walls, special, environment=None):
         self.tile_id = tile_id
         self.name = name
@@ -11,65 +54,51 @@ class Tile:
         self.special = special
         self.environment = environment
 
+    @property
+    def walls(self):
+        """The (left, up, right, down) wall flags, 1 for a wall and 0 for an exit."""
+        return _WALLS[self.wall_mask]
+
+    @walls.setter
+    def walls(self, walls):
+        self.wall_mask = walls_to_mask(walls)
+
+    def open_wall(self, side):
+        """Turns the wall on ``side`` (a Direction value) into an exit."""
+        self.wall_mask &= ~(1 << side)
+
+    def close_wall(self, side):
+        """Blocks the exit on ``side`` (a Direction value)."""
+        self.wall_mask |= 1 << side
+
     def get_exit_directions(self):
         """Returns directions which have exits."""
-        return [Direction(i) for i, wall in enumerate(self.walls) if wall == 0]
+        return _EXITS[self.wall_mask]
+
+    def turns_to_open(self, side):
+        """Returns the clockwise rotations needed to open ``side``, or None if impossible."""
+        return _TURNS_TO_OPEN[self.wall_mask][side]
 
-    def rotate(self):
+    def rotate(self, turns=1):
         """Rotates walls clockwise."""
-        if not self.walls:
-            raise ValueError("Walls list is empty.")
-        self.walls = self.walls[-1:] + self.walls[:-1]
+        self.wall_mask = _ROTATED[turns % 4][self.wall_mask]
 
     @classmethod
     def load_tiles(cls, file_path):
         """Returns tiles from JSON and populates indoor and outdoor tiles."""
-        if not file_path.endswith(".json"):
-            raise ValueError("The file must be a JSON file.")
-
-        try:
-            with open(file_path, "r") as f:
-                data = json.load(f)
-        except (IOError, json.JSONDecodeError) as e:
-            raise RuntimeError(f"Error reading JSON file: {e}")
-
-        indoor_tiles = []
-        outdoor_tiles = []
-
-        try:
-            # Populate outdoor tiles
-            for tile_data in data["tilesCard"][0]["outDoor"]:
-                outdoor_tiles.append(
-                    OutdoorTile(
-                        tile_id=tile_data["id"],
-                        name=tile_data["name"],
-                        walls=tile_data["wall"],
-                        special=tile_data["special"],
-                    )
-                )
-
-            # Populate indoor tiles
-            for tile_data in data["tilesCard"][1]["inDoor"]:
-                indoor_tiles.append(
-                    IndoorTile(
-                        tile_id=tile_data["id"],
-                        name=tile_data["name"],
-                        walls=tile_data["wall"],
-                        special=tile_data["special"],
-                    )
-                )
-        except KeyError as e:
-            raise ValueError(f"Missing key in JSON data: {e}")
-
-        return indoor_tiles, outdoor_tiles
+        # The file is parsed once per process; every call gets fresh tiles
+        from models.catalog import load_catalog
+        return load_catalog(file_path).new_tiles()
 
 
 class IndoorTile(Tile):
+    __slots__ = ()
+
     def __init__(self, tile_id, name, walls, special):
         super().__init__(tile_id, name, walls, special, environment="Indoor")
 
     @staticmethod
-    def shuffle_tiles(tiles):
+    def shuffle_tiles(tiles, rng=random):
         """Shuffles a list of indoor tiles and removes 'Foyer' tile."""
         if not isinstance(tiles, list):
             raise TypeError("Expected a list of tiles.")
@@ -77,12 +106,14 @@ class IndoorTile(Tile):
         if not all(isinstance(tile, Tile) for tile in tiles):
             raise TypeError("All items in the list must be instances of Tile.")
 
-        random.shuffle(tiles)
+        rng.shuffle(tiles)
         # Remove 'Foyer' tile from the shuffled tiles
         tiles[:] = [tile for tile in tiles if tile.name != "Foyer"]
 
 
 class OutdoorTile(Tile):
+    __slots__ = ()
+
     def __init__(self, tile_id, name, walls, special):
         super().__init__(tile_id, name, walls, special, environment="Outdoor")
 
@@ -94,7 +125,7 @@ class OutdoorTile(Tile):
             print(f"{self.name} has a standard outdoor environment.")
 
     @staticmethod
-    def shuffle_tiles(tiles):
+    def shuffle_tiles(tiles, rng=random):
         """Shuffles a list of outdoor tiles."""
         if not isinstance(tiles, list):
             raise TypeError("Expected a list of tiles.")
@@ -102,4 +133,4 @@ class OutdoorTile(Tile):
         if not all(isinstance(tile, Tile) for tile in tiles):
             raise TypeError("All items in the list must be instances of Tile.")
 
-        random.shuffle(tiles)
+        rng.shuffle(tiles)
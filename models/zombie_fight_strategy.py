@@ -1,20 +1,25 @@
 from models.event_strategy import DevCardEventStrategy
+from models.engine import Prompt, decision_point
 
 class ZombieFightStrategy(DevCardEventStrategy):
+    @decision_point
     def execute(self, card, event):
-        zombies = int(event.split()[0])
-        prompt = self.game.localization["g_fight_zombie_prompt_def"].format(
-            zombies=zombies
+        zombies = event.zombies
+        prompt = self.game.localization.format(
+            "g_fight_zombie_prompt_def", zombies=zombies
         )
 
         while True:
-            response = input(prompt).lower()
+            response = (yield Prompt(
+                "fight", prompt, ("fight", "run"), {"zombies": zombies}
+            )).lower()
             if response == "run":
-                self.game.run_away()
+                yield from self.game.run_away()
+                self.game.last_damage = "running"
                 self.game.player.modify_health(-1)
                 break
             elif response == "fight":
-                self.game.item_usage()
+                yield from self.game.item_usage()
                 if not self.game.resolve_combat(zombies):
                     self.game.game_over = True
                 break
@@ -0,0 +1,128 @@
+from collections import Counter
+import json
+import random
+import unittest
+from models import batch_engine
+from models.batch_engine import (
+    EMPTY, KILLED, OUT_OF_TIME, PLAYING, BatchEngine, FighterBatchEngine, FighterPolicy,
+    play_cards,
+)
+from models.catalog import load_catalog
+from models.game import Game
+from models.policies import CautiousPolicy, Policy
+
+
+class RecklessPolicy(Policy):
+    """Always fights, never cowers and takes every item."""
+
+    def choose(self, game, prompt):
+        answers = {"fight": "fight", "cower": "continue", "replace_item": "1",
+                   "use_item": "n", "combine_items": "y"}
+        return answers.get(prompt.key, "y")
+
+
+class RecklessBatchEngine(BatchEngine):
+    def decide_cower(self, games):
+        return ~games
+
+    def decide_fight(self, games, zombies):
+        return games
+
+
+@unittest.skipIf(batch_engine.np is None, "numpy is not installed")
+class TestBatchEngine(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.catalog = load_catalog()
+        with open("localization.json", encoding="utf-8") as f:
+            cls.localization = json.load(f)["en"]
+
+    def _index(self, card_id):
+        return [card.id for card in self.catalog.dev_cards].index(card_id)
+
+    def _rates(self, outcomes):
+        total = sum(outcomes.values())
+        return {name: count / total for name, count in outcomes.items() if count}
+
+    def _object_rates(self, policy_class, games, turns, health=6):
+        outcomes = Counter()
+        for seed in range(games):
+            game = Game(self.localization, seed=seed, catalog=self.catalog)
+            outcomes[play_cards(game, policy_class(random.Random(seed)), turns,
+                                health)] += 1
+        return self._rates(outcomes)
+
+    def _assert_rates_close(self, batch, game):
+        self.assertEqual(batch.keys(), game.keys())
+        for name, rate in game.items():
+            self.assertAlmostEqual(batch[name], rate, delta=0.03, msg=name)
+
+    def test_matches_the_object_engine(self):
+        engine = BatchEngine(self.catalog, 50000, seed=1, turns=16).run()
+
+        self.assertEqual(engine.playing, 0)
+        self._assert_rates_close(self._rates(engine.counts()),
+                                 self._object_rates(CautiousPolicy, 2000, 16))
+
+    def test_matches_the_object_engine_when_games_are_lost(self):
+        engine = FighterBatchEngine(self.catalog, 50000, seed=3, turns=16).run()
+
+        rates = self._rates(engine.counts())
+        self.assertGreater(rates["killed"], 0.3)
+        self.assertGreater(rates["out_of_time"], 0.05)
+        self._assert_rates_close(rates, self._object_rates(FighterPolicy, 2000, 16))
+
+    def test_decisions_can_be_overridden(self):
+        engine = RecklessBatchEngine(self.catalog, 50000, seed=2, health=4, turns=6).run()
+
+        rates = self._rates(engine.counts())
+        self.assertGreater(rates["killed"], 0.05)
+        self._assert_rates_close(rates, self._object_rates(RecklessPolicy, 2000, 6, 4))
+
+    def _next_card(self, engine, card_id):
+        """Puts dev card ``card_id`` on top of every game's deck."""
+        engine.deck[:, engine.top[0]] = self._index(card_id)
+
+    def test_combat(self):
+        engine = BatchEngine(self.catalog, 4, seed=3)
+        self._next_card(engine, 2)  # 4 zombies at 9:00
+        engine.items[0] = (self._index(9), self._index(1))  # candle and oil
+        engine.items[1] = (self._index(2), self._index(7))  # gasoline and chainsaw
+        engine.attack[1] = 4
+        engine.health[3] = 3
+        engine.step()
+
+        self.assertEqual(engine.items[0].tolist(), [EMPTY, EMPTY])
+        self.assertEqual(engine.health[0], 6)
+        self.assertEqual(engine.items[1].tolist(), [self._index(7), EMPTY])
+        self.assertEqual(engine.chainsaw_count.tolist(), [2, 4, 2, 2])
+        self.assertEqual(engine.health[1:].tolist(), [6, 3, 2])  # the last one ran
+
+    def test_items_replace_the_oldest_and_equip(self):
+        engine = BatchEngine(self.catalog, 2, seed=4)
+        self._next_card(engine, 3)  # an item at 9:00
+        engine.deck[:, engine.top[0] + 1] = self._index(4)  # the Machete
+        engine.items[0] = (self._index(8), self._index(3))  # soda and board
+        engine.items[1, 0] = self._index(8)
+        engine.step()
+
+        self.assertEqual(engine.items[0].tolist(), [self._index(3), self._index(4)])
+        self.assertEqual(engine.items[1].tolist(), [self._index(8), self._index(4)])
+        self.assertEqual(engine.attack.tolist(), [5, 4])
+        self.assertEqual(engine.health.tolist(), [6, 8])
+        self.assertEqual(engine.item_bits().tolist(), [1 << 3 | 1 << 4, 1 << 8 | 1 << 4])
+
+    def test_midnight_and_finished_games(self):
+        engine = BatchEngine(self.catalog, 3, seed=5)
+        engine.time[:] = 11
+        engine.top[:2] = len(self.catalog.dev_cards)  # out of cards
+        engine.outcome[1] = KILLED
+        engine.step()
+
+        self.assertEqual(engine.outcome.tolist(), [OUT_OF_TIME, KILLED, PLAYING])
+        self.assertEqual(engine.time[1], 11)
+        self.assertEqual(engine.turns_left.tolist(), [8, 8, 7])
+
+
+if __name__ == '__main__':
+    unittest.main()
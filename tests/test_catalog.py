@@ -0,0 +1,93 @@
+import copy
+import json
+import unittest
+from models.card_events import CardEvent, parse_event
+from models.catalog import Catalog, load_catalog
+from models.game import Game
+
+
+class TestCatalog(unittest.TestCase):
+    def setUp(self):
+        with open("game_data.json") as f:
+            self.data = json.load(f)
+
+    def test_loaded_once_and_shared(self):
+        catalog = load_catalog("game_data.json")
+
+        self.assertIs(load_catalog("game_data.json"), catalog)
+        self.assertIs(Game({}).catalog, catalog)
+
+    def test_catalog_is_immutable(self):
+        catalog = load_catalog()
+
+        with self.assertRaises(AttributeError):
+            catalog.dev_cards = ()
+        with self.assertRaises(TypeError):
+            catalog.cards_by_id[1] = None
+
+    def test_new_tiles_are_independent(self):
+        catalog = load_catalog()
+        indoor_tiles, _ = catalog.new_tiles()
+        indoor_tiles[0].rotate()
+
+        fresh_indoor, _ = catalog.new_tiles()
+
+        self.assertEqual(list(fresh_indoor[0].walls), list(catalog.indoor_tiles[0].walls))
+        self.assertEqual(len(fresh_indoor), len(catalog.indoor_tiles))
+
+    def test_restarts_do_not_grow_the_card_list(self):
+        game = Game({})
+        game.load_dev_cards()
+        game.load_dev_cards()
+
+        self.assertEqual(len(game.dev_card_list), 9)
+        self.assertEqual(list(game.id_order), list(range(1, 10)))
+
+    def test_rejects_duplicate_card_ids(self):
+        self.data["devCard"][1]["id"] = 1
+        with self.assertRaises(ValueError):
+            Catalog.from_data(self.data)
+
+    def test_rejects_bad_walls(self):
+        bad = copy.deepcopy(self.data)
+        bad["tilesCard"][1]["inDoor"][0]["wall"] = [0, 1, 2]
+        with self.assertRaises(ValueError):
+            Catalog.from_data(bad)
+
+    def test_rejects_missing_keys(self):
+        del self.data["devCard"][0]["item"]
+        with self.assertRaises(ValueError):
+            Catalog.from_data(self.data)
+
+    def test_events_are_parsed_once_per_card_and_hour(self):
+        events = load_catalog().events
+
+        self.assertEqual(len(events), 27)
+        self.assertEqual(events[2, 9], CardEvent("zombies", "4 Zombies", 4, 0, False))
+        self.assertEqual(events[2, 10].health, -1)
+        self.assertEqual(events[9, 10].health, 1)
+        self.assertTrue(events[1, 10].item)
+        self.assertEqual(events[7, 10].kind, "message")
+
+    def test_rejects_malformed_events(self):
+        for text in ("Four Zombies", "You feel better. HEALTH", "ITEMS"):
+            data = copy.deepcopy(self.data)
+            data["devCard"][3]["10:00"] = text
+            with self.assertRaises(ValueError) as raised:
+                Catalog.from_data(data)
+            self.assertIn("Dev card 4 at 10:00", str(raised.exception))
+
+    def test_parse_event_accepts_card_variants(self):
+        self.assertEqual(parse_event("5 Zombies.").zombies, 5)
+        self.assertEqual(parse_event("Candybar in your pocket. +1 HEALTH").health, 1)
+        self.assertEqual(parse_event("item").kind, "item")
+
+    def test_item_attack_points(self):
+        catalog = load_catalog()
+
+        self.assertEqual(catalog.item_attack_points("Machete"), 3)
+        self.assertIsNone(catalog.item_attack_points("Spoon"))
+
+
+if __name__ == '__main__':
+    unittest.main()
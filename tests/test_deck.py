@@ -0,0 +1,43 @@
+import random
+import unittest
+from models.deck import Deck
+
+
+class TestDeck(unittest.TestCase):
+    def setUp(self):
+        self.deck = Deck([3, 1, 4, 1, 5])
+
+    def test_draw_from_top(self):
+        self.assertEqual(self.deck.draw(), 3)
+        self.assertEqual(self.deck.draw(), 1)
+        self.assertEqual(len(self.deck), 3)
+
+    def test_draw_empty(self):
+        with self.assertRaises(IndexError):
+            Deck().draw()
+
+    def test_peek_does_not_draw(self):
+        self.assertEqual(self.deck.peek(2), (3, 1))
+        self.assertEqual(len(self.deck), 5)
+
+    def test_burn(self):
+        self.deck.burn(2)
+        self.assertEqual(self.deck.peek(), (4,))
+        self.deck.burn(10)
+        self.assertEqual(len(self.deck), 0)
+
+    def test_reshuffle(self):
+        self.deck.reshuffle(random.Random(0), cards=range(1, 10))
+        again = Deck()
+        again.reshuffle(random.Random(0), cards=range(1, 10))
+
+        self.assertEqual(self.deck, again)
+        self.assertEqual(sorted(self.deck), list(range(1, 10)))
+
+    def test_composition(self):
+        self.assertEqual(self.deck.composition()[1], 2)
+        self.assertEqual(self.deck.composition(key=lambda c: c % 2)[1], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
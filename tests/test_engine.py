@@ -0,0 +1,99 @@
+import json
+import random
+import unittest
+from unittest.mock import patch
+from models.game import Game
+from models.dev_cards import DevCards
+from models.player import Player
+from models.tiles import Tile
+from models.engine import GameEngine
+
+
+class ScriptedIO:
+    """Answers prompts from a fixed list and records everything shown."""
+
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.prompts = []
+        self.events = []
+
+    def ask(self, prompt):
+        self.prompts.append(prompt)
+        return self.answers.pop(0)
+
+    def emit(self, event):
+        self.events.append(event)
+
+
+class TestGameEngine(unittest.TestCase):
+    def setUp(self):
+        with open("localization.json", encoding="utf-8") as f:
+            self.localization = json.load(f)["en"]
+        random.seed(3)
+        self.indoor_tiles, self.outdoor_tiles = Tile.load_tiles("game_data.json")
+
+    def test_start_stops_at_first_move_prompt(self):
+        engine = GameEngine(Game(self.localization))
+
+        with patch("builtins.input", side_effect=AssertionError), \
+                patch("builtins.print", side_effect=AssertionError):
+            events = engine.start(self.indoor_tiles, self.outdoor_tiles)
+
+        self.assertFalse(engine.done)
+        self.assertEqual(engine.prompt.key, "move")
+        self.assertIn("//save", engine.prompt.options)
+        self.assertIn("p_on_tile_msg", [event.key for event in events])
+
+    def test_step_without_pending_prompt(self):
+        engine = GameEngine(Game(self.localization))
+        with self.assertRaises(RuntimeError):
+            engine.step("y")
+
+    def test_plays_a_full_game_headless(self):
+        # A seed whose random game ends; in others the player can keep
+        # picking exits that have no tile left to place
+        game = Game(self.localization, seed=2)
+        engine = GameEngine(game)
+        policy = random.Random(11)
+
+        with patch("builtins.input", side_effect=AssertionError), \
+                patch("builtins.print", side_effect=AssertionError):
+            engine.start(self.indoor_tiles, self.outdoor_tiles)
+            for _ in range(500):
+                if engine.done:
+                    break
+                options = [o for o in engine.prompt.options if o != "//save"]
+                events = engine.step(policy.choice(options))
+                for event in events:
+                    self.assertIsInstance(event.text, str)
+
+        self.assertTrue(engine.done)
+        self.assertIn(game.outcome, ("won", "killed", "out_of_time"))
+
+    def test_decision_point_answers_through_io(self):
+        io = ScriptedIO(["maybe", "fight"])
+        game = Game(self.localization, io=io)
+        game.load_dev_cards()
+        game.player = Player(self.localization, [], [], io=io)
+        card = DevCards(7, "3 Zombies", "You hear terrible screams",
+                        "5 Zombies", "Chainsaw", 3)
+
+        game.resolve_dev_card(card)
+
+        self.assertEqual([p.key for p in io.prompts], ["fight", "fight"])
+        self.assertEqual(game.player.health, 4)
+        self.assertIn("g_damage_recieved", [event.key for event in io.events])
+
+    def test_decision_point_returns_result(self):
+        io = ScriptedIO(["n", "y"])
+        game = Game(self.localization, io=io)
+        game.load_dev_cards()
+
+        card = game.get_card()
+
+        self.assertEqual(card.id, 1)
+        self.assertEqual([p.key for p in io.prompts], ["draw_card"] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+from models import environment
+from models.environment import OUTCOMES, PROMPT_KEYS, SubprocVectorEnv, VectorEnv, ZimpEnv
+
+np = environment.np
+
+
+def first_legal(masks):
+    """The first action every mask allows."""
+    return masks.argmax(axis=-1)
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestEnvironment(unittest.TestCase):
+    def setUp(self):
+        self.env = ZimpEnv(max_decisions=300)
+
+    def _episode(self, seed):
+        observation, info = self.env.reset(seed=seed)
+        observations = [observation]
+        while True:
+            observation, reward, terminated, truncated, info = self.env.step(
+                first_legal(info["action_mask"])
+            )
+            observations.append(observation)
+            if terminated or truncated:
+                return observations, reward, terminated, info
+
+    def test_episodes_end_and_replay_from_their_seed(self):
+        observations, reward, terminated, info = self._episode(seed=3)
+
+        self.assertTrue(all(o.shape == (self.env.observation_size,) for o in observations))
+        if terminated:
+            self.assertEqual(reward, 1.0 if info["outcome"] == "won" else -1.0)
+        else:
+            self.assertEqual((reward, info["outcome"]), (0.0, "stalled"))
+        self.assertFalse(info["action_mask"].any())
+        again, _, _, _ = self._episode(seed=3)
+        self.assertTrue(all(np.array_equal(a, b) for a, b in zip(observations, again)))
+
+    def test_actions_outside_the_mask_are_refused(self):
+        _, info = self.env.reset(seed=1)
+        illegal = int(np.flatnonzero(~info["action_mask"])[0])
+
+        with self.assertRaises(ValueError):
+            self.env.step(illegal)
+        self._episode(seed=1)
+        with self.assertRaises(RuntimeError):
+            self.env.step(0)
+
+    def test_observation_encoding(self):
+        observation, info = self.env.reset(seed=5)
+        game, prompt = self.env.game, self.env.engine.prompt
+        cards = len(game.catalog.dev_cards)
+
+        self.assertEqual(observation[0], game.player.health)
+        self.assertEqual(observation[2], game.time)
+        self.assertEqual(observation[8:8 + cards].sum(), len(game.id_order))
+        self.assertEqual(observation[-len(PROMPT_KEYS):].tolist(),
+                         [float(key == prompt.key) for key in PROMPT_KEYS])
+        # A move prompt offers the exits of the tile
+        self.assertEqual(prompt.key, "move")
+        exits = observation[8 + 2 * cards:8 + 2 * cards + 4]
+        self.assertEqual(exits.astype(bool).tolist(), info["action_mask"][:4].tolist())
+
+    def _run(self, vector, steps):
+        observations, info = vector.reset(seed=7)
+        history = [observations.copy()]
+        outcomes = []
+        for _ in range(steps):
+            observations, rewards, terminated, truncated, info = vector.step(
+                first_legal(info["action_mask"])
+            )
+            history.append(observations.copy())
+            ended = terminated | truncated
+            outcomes += info["outcome"][ended].tolist()
+            self.assertTrue((rewards[~terminated] == 0).all())
+            self.assertTrue(info["action_mask"].any(axis=1).all())
+        return history, outcomes
+
+    def test_vector_envs_reset_finished_games(self):
+        with VectorEnv(4, max_decisions=60) as vector:
+            history, outcomes = self._run(vector, 200)
+
+        self.assertEqual(history[0].shape, (4, vector.observation_size))
+        self.assertTrue(outcomes)
+        self.assertNotIn(OUTCOMES.index("playing"), outcomes)
+
+    def _play_after_reset(self, vector, steps=30, seed=None):
+        observations, info = vector.reset(seed)
+        history = [observations.copy()]
+        for _ in range(steps):
+            observations, _, _, _, info = vector.step(first_legal(info["action_mask"]))
+            history.append(observations.copy())
+        return np.stack(history)
+
+    def test_unseeded_resets_start_new_games(self):
+        with VectorEnv(3, seed=7, max_decisions=60) as vector:
+            first = self._play_after_reset(vector)
+            second = self._play_after_reset(vector)
+            replayed = self._play_after_reset(vector, seed=7)
+            third = self._play_after_reset(vector)
+
+        # The constructor's seed starts the first games only
+        self.assertTrue(np.array_equal(first, replayed))
+        self.assertFalse(np.array_equal(first, second))
+        self.assertTrue(np.array_equal(second, third))
+
+    def test_worker_processes_match_in_process(self):
+        with VectorEnv(5, max_decisions=60) as vector:
+            expected, expected_outcomes = self._run(vector, 120)
+        with SubprocVectorEnv(5, workers=2, max_decisions=60) as vector:
+            history, outcomes = self._run(vector, 120)
+            with self.assertRaises(ValueError):
+                vector.step(first_legal(~vector.arrays["action_masks"]))
+
+        self.assertEqual(outcomes, expected_outcomes)
+        self.assertTrue(all(np.array_equal(a, b) for a, b in zip(history, expected)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import itertools
+import json
+import random
+import unittest
+from models.catalog import load_catalog
+from models.engine import GameEngine, Prompt
+from models.expectimax import (
+    CardState, ExpectimaxSolver, TranspositionTable, state_key,
+)
+from models.game import Game
+from models.policies import CautiousPolicy
+
+
+class TestExpectimaxSolver(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.catalog = load_catalog()
+
+    def setUp(self):
+        self.solver = ExpectimaxSolver(self.catalog, table_bits=12)
+        self.deck = 0
+        for card in self.catalog.dev_cards[2:]:
+            self.deck |= 1 << card.id
+
+    def _state(self, **fields):
+        state = CardState(9, 6, 1, (), self.deck, 7, 4)
+        return state._replace(**fields)
+
+    def test_runs_from_a_deadly_fight_on_the_last_turn(self):
+        advice = self.solver.solve(self._state(health=3, turns=1), "fight",
+                                   budget=5, zombies=6)
+
+        self.assertEqual(advice.action, "run")
+        self.assertEqual(advice.values["fight"], 0.0)
+        self.assertGreater(advice.values["run"], 0.5)
+        self.assertTrue(advice.exact)
+
+    def test_prefers_staying_alive_when_nothing_can_win(self):
+        state = self._state(time=11, left=1, health=3, turns=9)
+        advice = self.solver.solve(state, "fight", zombies=6)
+
+        self.assertEqual(advice.values, {"fight": 0.0, "run": 0.0})
+        self.assertEqual(advice.action, "run")
+        advice = self.solver.solve(state._replace(health=6), "fight", zombies=6)
+        self.assertEqual(advice.action, "fight")
+
+    def test_candle_and_oil_burn_the_zombies(self):
+        state = self._state(health=3, turns=1, items=("Candle", "Oil"))
+        advice = self.solver.solve(state, "fight", zombies=6)
+
+        self.assertEqual(advice.values["fight"], 1.0)
+
+    def test_midnight_is_a_loss(self):
+        state = self._state(time=11, left=0, turns=2)
+        advice = self.solver.solve(state, "draw_item")
+
+        self.assertEqual(advice.value, 0.0)
+        self.assertTrue(advice.exact)
+
+    def test_values_are_probabilities_and_deepen_to_exact(self):
+        advice = self.solver.solve(self._state(health=2, time=10, turns=5),
+                                   "cower", budget=5)
+
+        self.assertTrue(advice.exact)
+        self.assertGreaterEqual(advice.depth, 1)
+        for value in advice.values.values():
+            self.assertTrue(0.0 <= value <= 1.0)
+        # Solving again is answered from the table
+        hits = self.solver.table.hits
+        again = self.solver.solve(self._state(health=2, time=10, turns=5),
+                                  "cower", budget=5)
+        self.assertEqual(again.values, advice.values)
+        self.assertGreater(self.solver.table.hits, hits)
+
+    def test_budget_bounds_the_search(self):
+        ticks = itertools.count()
+        solver = ExpectimaxSolver(self.catalog, clock=lambda: next(ticks) * 0.001)
+        advice = solver.solve(self._state(turns=20), "draw_item", budget=0.01)
+
+        self.assertFalse(advice.exact)
+        self.assertLess(advice.depth, 20)
+        self.assertIn(advice.action, ("y", "n"))
+
+    def test_transposition_table_is_bounded(self):
+        table = TranspositionTable(bits=2)
+        for key in range(100):
+            table.put(key, 1, (0.5, False))
+
+        self.assertEqual(len(table), 4)
+        self.assertEqual(table.get(99, 1), (0.5, False))
+        self.assertIsNone(table.get(99, 2))
+        self.assertIsNone(table.get(3, 1))
+        self.assertNotEqual(state_key(self._state()), state_key(self._state(health=5)))
+
+    def test_advises_on_prompts_from_a_real_game(self):
+        with open("localization.json", encoding="utf-8") as f:
+            localization = json.load(f)["en"]
+        policy = CautiousPolicy(random.Random(3))
+        advised = set()
+        for seed in range(10):
+            game = Game(localization, seed=seed, catalog=self.catalog)
+            engine = GameEngine(game)
+            engine.start(*self.catalog.new_tiles())
+            for _ in range(300):
+                if engine.done:
+                    break
+                advice = self.solver.advise(game, engine.prompt, turns=5, budget=0.002)
+                if advice is not None:
+                    self.assertIn(advice.action, engine.prompt.options)
+                    advised.add(engine.prompt.key)
+                engine.step(policy.choose(game, engine.prompt))
+
+        self.assertIn("fight", advised)
+        self.assertIsNone(self.solver.advise(game, Prompt("move", "", ("up",))))
+
+
+if __name__ == '__main__':
+    unittest.main()
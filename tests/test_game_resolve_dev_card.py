@@ -5,6 +5,8 @@ from models.dev_cards import DevCards
 from models.player import Player
 from models.event_strategy import DevCardEventStrategy  # Adjust import based on file structure
 from unittest.mock import MagicMock
+from models import card_events, strategy_registry
+from models.card_events import CardEvent
 # from models.tiles import Tile
 # from enums.directions import Direction
 
@@ -300,6 +302,61 @@ class TestGameResolveDevCard(unittest.TestCase):
             .format(event="You try hard not to wet yourself.")
             )
 
+    def test_reload_rebuilds_card_lookups(self):
+        self.game.load_dev_cards()
+
+        self.assertEqual(len(self.game.dev_card_list), 9)
+        with patch('builtins.input', return_value='y'):
+            card = self.game.get_card()
+        self.assertEqual(card.id, 1)
+
+    def test_attack_points_use_replaced_card_list(self):
+        self.game.dev_card_list = [
+            DevCards(4, "4 Zombies.", "ITEM", "6 Zombies", "Machete", 3),
+            DevCards(6, "ITEM", "4 Zombies", "ITEM", "Golf Club", 2),
+        ]
+        self.player.items = ["Machete", "Golf Club"]
+
+        attack = self.game.attack_points_update()
+
+        self.assertEqual(attack, 6)
+
+    def test_strategies_are_reused_across_cards(self):
+        card = DevCards(9, "You body shivers involuntarily", "x", "x", "Candle", 0)
+        strategy = self.game._strategies["message"]
+
+        with patch('builtins.print'), \
+                patch.object(type(strategy), 'execute') as mock_execute:
+            self.game.resolve_dev_card(card)
+            self.game.resolve_dev_card(card)
+
+        self.assertEqual(mock_execute.call_count, 2)
+        self.assertIs(self.game._strategies["message"], strategy)
+
+    def test_register_event_kind(self):
+        resolved = []
+
+        class TrapStrategy(DevCardEventStrategy):
+            def execute(self, card, event):
+                resolved.append((card.id, event.kind, event.health))
+
+        def parse_trap(text):
+            if text.startswith("Trap"):
+                return CardEvent("trap", text, 0, -2, False)
+            return None
+
+        strategy_registry.register_event_kind("trap", TrapStrategy, parse_trap)
+        try:
+            game = Game(self.localization)
+            game.player = self.player
+            game.resolve_dev_card(DevCards(20, "Trap door", "x", "x", "Rope", 0))
+        finally:
+            strategy_registry.unregister_event_kind("trap", parse_trap)
+
+        self.assertEqual(resolved, [(20, "trap", -2)])
+        self.assertNotIn("trap", strategy_registry.EVENT_STRATEGIES)
+        self.assertEqual(card_events.parse_event("Trap door").kind, "message")
+
 
 if __name__ == '__main__':
     unittest.main()
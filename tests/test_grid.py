@@ -0,0 +1,214 @@
+import json
+import random
+import unittest
+from unittest.mock import patch
+from enums.directions import Direction
+from models.game import Game
+from models.grid import Grid, MapRenderer, VisitedTiles, step
+from models.player import Player
+from models.tiles import Tile
+from tests.test_engine import ScriptedIO
+
+
+class TestGridFrontier(unittest.TestCase):
+    def setUp(self):
+        self.grid = Grid()
+        # Open only to the right
+        self.grid[(0, 0)] = Tile(1, "Foyer", [1, 1, 0, 1], None)
+
+    def test_step_matches_movement(self):
+        self.assertEqual(step((0, 0), Direction.UP), (0, 1))
+        self.assertEqual(step((0, 0), Direction.LEFT), (-1, 0))
+
+    def test_placement_updates_frontier(self):
+        self.assertEqual(self.grid.frontier, {((0, 0), Direction.RIGHT)})
+        # A closed-in neighbour fills the only open exit
+        self.grid[(1, 0)] = Tile(2, "Hall", [0, 1, 1, 1], None)
+        self.assertFalse(self.grid.has_open_exit())
+
+    def test_refresh_after_wall_change(self):
+        self.grid[(1, 0)] = Tile(2, "Hall", [0, 1, 1, 1], None)
+        self.grid[(1, 0)].open_wall(Direction.UP.value)
+        self.grid.refresh((1, 0))
+        self.assertEqual(self.grid.frontier, {((1, 0), Direction.UP)})
+        # Left and up open become up and right open
+        self.grid[(1, 0)].rotate()
+        self.grid.refresh((1, 0))
+        self.assertEqual(
+            self.grid.frontier, {((1, 0), Direction.UP), ((1, 0), Direction.RIGHT)}
+        )
+
+    def test_delete_reopens_neighbour_exit(self):
+        self.grid[(1, 0)] = Tile(2, "Hall", [0, 1, 1, 1], None)
+        del self.grid[(1, 0)]
+        self.assertEqual(self.grid.frontier, {((0, 0), Direction.RIGHT)})
+
+    def test_behaves_like_dict(self):
+        self.assertIn((0, 0), self.grid)
+        self.assertEqual(self.grid.get((0, 0)).name, "Foyer")
+        self.assertEqual(Grid(self.grid).frontier, self.grid.frontier)
+
+    def test_position_of_follows_placement(self):
+        foyer = self.grid[(0, 0)]
+        hall = Tile(2, "Hall", [0, 1, 1, 1], None)
+        self.grid[(1, 0)] = hall
+        self.assertEqual(self.grid.position_of(foyer), (0, 0))
+        self.assertEqual(self.grid.position_of(hall), (1, 0))
+        self.grid[(1, 0)] = Tile(3, "Den", [0, 1, 1, 1], None)
+        self.assertIsNone(self.grid.position_of(hall))
+        self.assertEqual(self.grid.position_of(hall, (9, 9)), (9, 9))
+
+    def test_visited_tiles_are_deduplicated_in_order(self):
+        foyer = self.grid[(0, 0)]
+        hall = Tile(2, "Hall", [0, 1, 1, 1], None)
+        visited = VisitedTiles()
+        for tile in (hall, foyer, hall, foyer, hall):
+            visited.append(tile)
+        self.assertEqual(list(visited), [hall, foyer])
+        self.assertIs(visited[1], foyer)
+        self.assertEqual(len(visited), 2)
+
+    def test_dead_end_prompts_only_when_frontier_is_empty(self):
+        with open("localization.json", encoding="utf-8") as f:
+            localization = json.load(f)["en"]
+        io = ScriptedIO(["n"])
+        game = Game(localization, io=io)
+        game.player = Player(localization, [], [], io=io)
+        game.player.grid[(0, 0)] = self.grid[(0, 0)]
+
+        game.check_dead_end()
+        self.assertEqual(io.prompts, [])
+
+        game.player.grid[(1, 0)] = Tile(2, "Hall", [0, 1, 1, 1], None)
+        game.check_dead_end()
+        self.assertEqual([p.key for p in io.prompts], ["dead_end"])
+
+    def _reachable_exit(self, grid, start):
+        """Whether the region of ``start`` has an open exit, by walking it."""
+        seen, pending = {start}, [start]
+        while pending:
+            position = pending.pop()
+            tile = grid[position]
+            for direction in Direction:
+                neighbour = step(position, direction)
+                opposite = Direction.opposite(direction)
+                if neighbour not in grid:
+                    if direction in tile.get_exit_directions():
+                        return True
+                elif neighbour not in seen and (
+                        direction in tile.get_exit_directions()
+                        or opposite in grid[neighbour].get_exit_directions()):
+                    seen.add(neighbour)
+                    pending.append(neighbour)
+        return False
+
+    def test_regions_match_a_walk_as_walls_change(self):
+        rng = random.Random(9)
+        grid = self.grid
+        for tile_id in range(300):
+            position = rng.choice(list(grid))
+            action = rng.random()
+            if action < 0.4:
+                cell = step(position, rng.choice(list(Direction)))
+                if cell not in grid:
+                    walls = [rng.randint(0, 1) for _ in range(4)]
+                    grid[cell] = Tile(tile_id, "Room", walls, None)
+            elif action < 0.6:
+                grid[position].rotate(rng.randint(1, 3))
+                grid.refresh(position)
+            elif action < 0.8:
+                grid[position].open_wall(rng.randint(0, 3))
+                grid.refresh(position)
+            else:
+                grid[position].wall_mask |= 1 << rng.randint(0, 3)
+                grid.refresh(position)
+            for start in grid:
+                self.assertEqual(grid.has_open_exit(start),
+                                 self._reachable_exit(grid, start), (tile_id, start))
+
+    def test_closing_a_wall_splits_the_region(self):
+        hall = Tile(2, "Hall", [0, 1, 1, 0], None)  # open left and down
+        self.grid[(1, 0)] = hall
+        self.assertTrue(self.grid.has_open_exit((0, 0)))
+        self.grid[(0, 0)].wall_mask |= 1 << Direction.RIGHT.value
+        hall.wall_mask |= 1 << Direction.LEFT.value
+        self.grid.refresh((0, 0))
+        self.grid.refresh((1, 0))
+
+        self.assertFalse(self.grid.has_open_exit((0, 0)))
+        self.assertTrue(self.grid.has_open_exit((1, 0)))
+
+    def test_open_exit_out_of_reach_is_a_dead_end(self):
+        with open("localization.json", encoding="utf-8") as f:
+            localization = json.load(f)["en"]
+        io = ScriptedIO(["n"])
+        game = Game(localization, io=io)
+        game.player = Player(localization, [], [], io=io)
+        grid = game.player.grid
+        grid[(0, 0)] = self.grid[(0, 0)]
+        # The Hall walls the Foyer in, and the Den beyond it opens upward
+        grid[(1, 0)] = Tile(2, "Hall", [0, 1, 1, 1], None)
+        grid[(2, 0)] = Tile(3, "Den", [1, 0, 1, 1], None)
+        self.assertTrue(grid.has_open_exit())
+        self.assertTrue(grid.has_open_exit((2, 0)))
+        self.assertFalse(grid.has_open_exit((0, 0)))
+
+        game.check_dead_end()
+        self.assertEqual([p.key for p in io.prompts], ["dead_end"])
+
+
+class TestMapRenderer(unittest.TestCase):
+    def _full_render(self, grid):
+        # Straightforward rendering of the whole map, for comparison
+        xs = [x for x, _ in grid]
+        ys = [y for _, y in grid]
+        text = "Map:\n"
+        for y in range(min(ys), max(ys) + 1):
+            for x in range(min(xs), max(xs) + 1):
+                room = grid.get((x, y))
+                text += f"|{room.name:12}|" if room is not None else " " * 14
+            text += "\n"
+        return text + "---------------------------"
+
+    def test_matches_full_render_as_map_grows(self):
+        rng = random.Random(5)
+        grid = Grid()
+        renderer = MapRenderer(grid)
+        position = (0, 0)
+        for tile_id in range(40):
+            grid[position] = Tile(tile_id, f"Room {tile_id}", [0, 0, 0, 0], None)
+            self.assertEqual(renderer.render("Map:\n"), self._full_render(grid))
+            position = step(position, rng.choice(list(Direction)))
+
+    def test_bounds_shrink_on_edge_removal(self):
+        grid = Grid()
+        for position in [(0, 0), (1, 0), (1, 2)]:
+            grid[position] = Tile(1, "Hall", [0, 0, 0, 0], None)
+        self.assertEqual(grid.bounds, (0, 1, 0, 2))
+        renderer = MapRenderer(grid)
+        renderer.render()
+        del grid[(1, 2)]
+        self.assertEqual(grid.bounds, (0, 1, 0, 0))
+        self.assertEqual(renderer.render("Map:\n"), self._full_render(grid))
+
+    def test_only_touched_row_is_rendered(self):
+        grid = Grid()
+        for y in range(5):
+            grid[(0, y)] = Tile(y, f"Room {y}", [0, 0, 0, 0], None)
+        renderer = MapRenderer(grid)
+        renderer.render()
+        grid[(0, 3)] = Tile(9, "Vault", [0, 0, 0, 0], None)
+        rendered = []
+        render_row = MapRenderer._render_row
+
+        def recording_render_row(renderer, y, *bounds):
+            rendered.append(y)
+            return render_row(renderer, y, *bounds)
+
+        with patch.object(MapRenderer, "_render_row", recording_render_row):
+            renderer.render()
+        self.assertEqual(rendered, [3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from models.catalog import load_catalog
+from models.game import Game
+from models.journal import JOURNAL, JournaledEngine, read_journal, write_journal
+from models.policies import RandomPolicy
+
+
+class TestJournaledEngine(unittest.TestCase):
+    def setUp(self):
+        with open("localization.json", encoding="utf-8") as f:
+            self.localization = json.load(f)["en"]
+        self.catalog = load_catalog()
+        temporary = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary.cleanup)
+        self.directory = temporary.name
+
+    def _game(self):
+        return Game(self.localization, seed=21, catalog=self.catalog)
+
+    def _play(self, engine, game, decisions, policy):
+        for _ in range(decisions):
+            if engine.done:
+                break
+            engine.step(policy.choose(game, engine.prompt))
+
+    def test_restore_after_crash_matches_uninterrupted_game(self):
+        game = self._game()
+        engine = JournaledEngine(game, self.directory, snapshot_every=8)
+        engine.start(*self.catalog.new_tiles())
+        policy = RandomPolicy(random.Random(4))
+        self._play(engine, game, 23, policy)
+        # Simulate a crash after the last batch reached the disk
+        engine.sync()
+
+        restored_game = self._game()
+        restored, _ = JournaledEngine.restore(restored_game, self.directory)
+
+        self.assertEqual(restored.prompt, engine.prompt)
+        self.assertEqual(restored.decisions, engine.decisions)
+        self.assertEqual(restored_game.player.position, game.player.position)
+        self.assertEqual(restored_game.player.health, game.player.health)
+        self.assertEqual(list(restored_game.id_order), list(game.id_order))
+
+        # Both carry on identically
+        rng_state = policy.rng.getstate()
+        for other, other_game in ((engine, game), (restored, restored_game)):
+            policy.rng.setstate(rng_state)
+            self._play(other, other_game, 30, policy)
+        self.assertEqual(restored_game.turns, game.turns)
+        self.assertEqual(restored_game.outcome, game.outcome)
+
+    def test_journal_is_bounded_by_snapshots(self):
+        game = self._game()
+        engine = JournaledEngine(game, self.directory, snapshot_every=8)
+        engine.start(*self.catalog.new_tiles())
+        self._play(engine, game, 40, RandomPolicy(random.Random(1)))
+        engine.close()
+
+        replayed = read_journal(os.path.join(self.directory, JOURNAL))
+        self.assertGreater(engine.decisions, 30)
+        self.assertLess(len(replayed), 8 + 10)
+
+    def test_torn_record_ends_the_journal(self):
+        game = self._game()
+        engine = JournaledEngine(game, self.directory, snapshot_every=1000)
+        engine.start(*self.catalog.new_tiles())
+        self._play(engine, game, 6, RandomPolicy(random.Random(2)))
+        engine.close()
+        path = os.path.join(self.directory, JOURNAL)
+        complete = read_journal(path)
+        with open(path, "ab") as f:
+            f.write(b"\x07\x00\x00")
+
+        self.assertEqual(read_journal(path), complete)
+        restored_game = self._game()
+        restored, _ = JournaledEngine.restore(restored_game, self.directory)
+        self.assertEqual(restored.decisions, len(complete))
+        # Restored mid-turn, so the journal was rewritten without the torn tail
+        self.assertNotEqual(restored.prompt.key, "move")
+        self.assertFalse(os.path.exists(path + ".tmp"))
+        self.assertEqual(read_journal(path), complete)
+
+        key = restored.prompt.key
+        decision = RandomPolicy(random.Random(3)).choose(restored_game, restored.prompt)
+        restored.step(decision)
+        restored.close()
+        self.assertEqual(read_journal(path), complete + [(key, decision)])
+
+    def test_decision_for_another_prompt_is_refused(self):
+        game = self._game()
+        engine = JournaledEngine(game, self.directory, snapshot_every=1000)
+        engine.start(*self.catalog.new_tiles())
+        self._play(engine, game, 6, RandomPolicy(random.Random(2)))
+        engine.close()
+        path = os.path.join(self.directory, JOURNAL)
+        decisions = read_journal(path)
+        self.assertTrue(all(key for key, _ in decisions))
+        # As if the restored game had drifted from the one journaled
+        decisions[2] = ("bury_totem", decisions[2][1])
+        write_journal(path, decisions)
+
+        with self.assertRaises(ValueError):
+            JournaledEngine.restore(self._game(), self.directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
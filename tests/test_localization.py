@@ -0,0 +1,53 @@
+import string
+import unittest
+from models import localization
+from models.game import Game
+from models.localization import LocalizationTable, as_table
+
+
+class TestLocalizationTable(unittest.TestCase):
+    def test_loaded_once_and_shared(self):
+        table = localization.load("es")
+
+        self.assertIs(localization.load("es"), table)
+        self.assertIs(Game(table).localization, table)
+        self.assertEqual(table.language, "es")
+        with self.assertRaises(KeyError):
+            localization.load("xx")
+
+    def test_languages_are_built_on_first_use(self):
+        path = "localization.json"
+        localization._tables.pop((path, "zh"), None)
+        localization.load("en")
+        self.assertNotIn((path, "zh"), localization._tables)
+        localization.load("zh")
+        self.assertIn((path, "zh"), localization._tables)
+        self.assertEqual(set(localization.languages()), {"en", "es", "zh", "jp"})
+
+    def test_read_only(self):
+        table = localization.load("en")
+        with self.assertRaises(TypeError):
+            table["g_map_title"] = "Map"
+
+    def test_format_matches_str_format(self):
+        for code in localization.languages():
+            table = localization.load(code)
+            for key, template in table.items():
+                names = {name for _, name, _, _ in string.Formatter().parse(template)
+                         if name}
+                if not all(name.isidentifier() for name in names):
+                    continue  # rendered by str.format itself
+                fields = {name: f"<{name}>" for name in names}
+                self.assertEqual(table.format(key, **fields), template.format(**fields))
+
+    def test_format_specs_and_fallback(self):
+        table = as_table({"money": "{amount:>5} / {0}", "hp": "{hp:03d} left"})
+
+        self.assertIsInstance(table, LocalizationTable)
+        self.assertEqual(table.format("hp", hp=7), "007 left")
+        with self.assertRaises(IndexError):
+            table.format("money", amount=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import json
+import random
+import unittest
+from models import save_format
+from models.catalog import load_catalog
+from models.engine import GameEngine
+from models.game import Game
+from models.mcts import MCTSPolicy, Node, SEARCHED, playout, restore
+from models.policies import CautiousPolicy
+
+
+class TestMCTS(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.catalog = load_catalog()
+        with open("localization.json", encoding="utf-8") as f:
+            cls.localization = json.load(f)["en"]
+
+    def _game(self, seed):
+        game = Game(self.localization, seed=seed, catalog=self.catalog)
+        engine = GameEngine(game)
+        engine.start(*self.catalog.new_tiles())
+        return game, engine
+
+    def _at_a_choice(self, seed):
+        """A game played on to a move prompt with more than one way to go."""
+        game, engine = self._game(seed)
+        policy = CautiousPolicy(random.Random(seed))
+        while engine.prompt.key != "move" or len(engine.prompt.options) < 3:
+            engine.step(policy.choose(game, engine.prompt))
+        return game, engine
+
+    def _play(self, policy, seed, limit=60):
+        game, engine = self._game(seed)
+        for _ in range(limit):
+            if engine.done:
+                break
+            answer = policy.choose(game, engine.prompt)
+            self.assertIn(answer, engine.prompt.options)
+            engine.step(answer)
+        return game
+
+    def test_select_tries_every_answer_first(self):
+        root = Node()
+        tried = []
+        for _ in range(3):
+            answer, child = root.select("fight", ("fight", "run", "x"), 0.7)
+            child.visits, child.score = 1, 0.0
+            root.visits += 1
+            tried.append(answer)
+
+        self.assertEqual(tried, ["fight", "run", "x"])
+        root.children["fight", "run"].score = 1.0
+        self.assertEqual(root.select("fight", ("fight", "run", "x"), 0.7)[0], "run")
+
+    def test_playouts_restore_the_prompt_and_count_visits(self):
+        game, engine = self._at_a_choice(4)
+        checkpoint = save_format.encode(game, include_rng=True)
+        restored, restored_engine = restore(game.localization, self.catalog,
+                                            checkpoint, ())
+        self.assertEqual(restored_engine.prompt.options, engine.prompt.options)
+        self.assertEqual(restored.player.position, game.player.position)
+
+        root = Node()
+        for seed in range(20):
+            playout(root, game.localization, self.catalog, checkpoint, (), seed)
+
+        self.assertEqual(root.visits, 20)
+        self.assertEqual(sum(child.visits for child in root.children.values()), 20)
+        self.assertTrue(all(key == "move" for key, _ in root.children))
+        # The game searched from is left alone
+        self.assertEqual(save_format.encode(game, include_rng=True), checkpoint)
+
+    def test_restoring_to_another_prompt_is_refused(self):
+        game, engine = self._at_a_choice(4)
+        checkpoint = save_format.encode(game, include_rng=True)
+        options = tuple(engine.prompt.options)
+
+        with self.assertRaises(ValueError):
+            restore(game.localization, self.catalog, checkpoint,
+                    [("fight", options[0])])
+        with self.assertRaises(ValueError):
+            restore(game.localization, self.catalog, checkpoint, (),
+                    asking=("move", options[1:]))
+        with self.assertRaises(ValueError):
+            playout(Node(), game.localization, self.catalog, checkpoint, (), 0,
+                    asking=("fight", options))
+
+    def test_policy_plays_legal_answers_and_reuses_the_tree(self):
+        policy = MCTSPolicy(random.Random(1), playouts=20)
+        self._play(policy, seed=2)
+
+        self.assertGreater(policy.stats["decisions"], 0)
+        self.assertEqual(policy.stats["playouts"], 20 * policy.stats["decisions"])
+        self.assertGreater(policy.playouts_per_second(), 0)
+        self.assertGreater(policy.stats["reused"], 0,
+                           "no search started from an earlier subtree")
+        self.assertTrue(SEARCHED >= {"move", "fight"})
+
+    def test_root_parallel_search_reuses_worker_trees(self):
+        policy = MCTSPolicy(random.Random(1), playouts=8, workers=2)
+        try:
+            game, engine = self._at_a_choice(5)
+            answer = policy.choose(game, engine.prompt)
+            self.assertIn(answer, engine.prompt.options)
+            self.assertEqual(policy.stats["playouts"], 8)
+            self.assertEqual(policy.stats["reused"], 0)
+            self._play(policy, seed=2)
+        finally:
+            policy.close()
+
+        self.assertEqual(policy.stats["playouts"], 8 * policy.stats["decisions"])
+        self.assertGreater(policy.stats["reused"], 0,
+                           "no worker searched from an earlier subtree")
+        # Closing again is harmless, and a closed policy starts new workers
+        policy.close()
+        try:
+            game, engine = self._at_a_choice(6)
+            self.assertIn(policy.choose(game, engine.prompt), engine.prompt.options)
+        finally:
+            policy.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+from models.dev_cards import DevCards
+from models.memory_benchmark import measure
+from models.player import Player
+from models.tiles import IndoorTile, OutdoorTile
+
+
+class TestCompactRecords(unittest.TestCase):
+    def test_records_have_no_instance_dict(self):
+        records = [
+            IndoorTile(1, "Foyer", [0, 0, 0, 0], None),
+            OutdoorTile(2, "Patio", [0, 0, 0, 0], None),
+            DevCards(1, "ITEM", "4 Zombies", "-1 Health", "Oil", 0),
+            Player({}, [], []),
+        ]
+        for record in records:
+            self.assertFalse(hasattr(record, "__dict__"), type(record).__name__)
+
+    def test_dev_cards_are_immutable(self):
+        card = DevCards(1, "ITEM", "4 Zombies", "-1 Health", "Oil", 0)
+        with self.assertRaises(AttributeError):
+            card.item = "Chainsaw"
+
+    def test_measure_reports_bytes_per_game(self):
+        report = measure(games=5, decisions=5)
+        self.assertEqual(report["games"], 5)
+        self.assertGreater(report["bytes_per_game_state"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,227 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from models import save_format
+from models.catalog import load_catalog
+from models.engine import GameEngine
+from models.game import Game
+from models.grid import STEPS, step
+from models.policies import RandomPolicy
+from tests.test_engine import ScriptedIO
+
+
+def played_game(seed=4, decisions=30):
+    """Returns a game ``decisions`` random decisions in, driven headless."""
+    with open("localization.json", encoding="utf-8") as f:
+        localization = json.load(f)["en"]
+    catalog = load_catalog()
+    game = Game(localization, seed=seed, catalog=catalog)
+    engine = GameEngine(game)
+    engine.start(*catalog.new_tiles())
+    policy = RandomPolicy(random.Random(seed))
+    for _ in range(decisions):
+        if engine.done:
+            break
+        engine.step(policy.choose(game, engine.prompt))
+    # Stop at the start of a turn, where //save is offered
+    while not engine.done and engine.prompt.key != "move":
+        engine.step(policy.choose(game, engine.prompt))
+    return game, engine
+
+
+class TestSaveFormat(unittest.TestCase):
+    def setUp(self):
+        self.game, _ = played_game()
+        self.player = self.game.player
+
+    def test_round_trip(self):
+        state = save_format.decode(save_format.encode(self.game))
+
+        self.assertEqual(state.time, self.game.time)
+        self.assertEqual(state.health, self.player.health)
+        self.assertEqual(state.position, self.player.position)
+        self.assertEqual(state.id_order, tuple(self.game.id_order))
+        self.assertEqual(
+            {(x, y): (ref, mask) for x, y, ref, mask in state.grid},
+            {position: ((tile.environment, tile.tile_id), tile.wall_mask)
+             for position, tile in self.player.grid.items()},
+        )
+        self.assertEqual(
+            state.indoor_tiles,
+            tuple(("Indoor", tile.tile_id) for tile in self.player.indoor_tiles),
+        )
+        self.assertEqual(len(state.visited_tiles), len(self.player.visited_tiles))
+        self.assertIsNone(state.rng_state)
+
+    def test_rng_state_is_optional(self):
+        state = save_format.decode(save_format.encode(self.game, include_rng=True))
+
+        self.assertEqual(state.rng_state, self.game.rng.getstate())
+
+    def _restored(self, data):
+        game = Game(self.game.localization, catalog=self.game.catalog)
+        game.restore_state(save_format.decode(data))
+        return game
+
+    def test_used_special_survives_a_round_trip(self):
+        grid = self.player.grid
+        storage = next((tile for tile in grid.values() if tile.name == "Storage"), None)
+        if storage is None:
+            storage = next(tile for tile in self.player.indoor_tiles
+                           if tile.name == "Storage")
+            self.player.indoor_tiles.remove(storage)
+            grid[next(step(self.player.position, direction) for direction in STEPS
+                      if step(self.player.position, direction) not in grid)] = storage
+        if storage.special is not None:
+            self.player.position = grid.position_of(storage)
+            self.player.current_tile = storage
+            self.game.io = ScriptedIO(["y"])
+            self.game.handle_tile_feature(storage)
+        self.assertIsNone(storage.special)
+
+        restored = self._restored(save_format.encode(self.game))
+
+        self.assertEqual(
+            {pos: tile.special for pos, tile in restored.player.grid.items()},
+            {pos: tile.special for pos, tile in grid.items()},
+        )
+        self.assertIsNone(restored.player.grid[grid.position_of(storage)].special)
+
+    def test_bad_grid_is_rejected_before_anything_changes(self):
+        game = self._restored(save_format.encode(self.game))
+        player, id_order = game.player, game.id_order
+        state = save_format.decode(save_format.encode(self.game))
+        (x, y, ref, mask), *rest = state.grid
+        for grid in ([(x, y, ref, 16)] + rest, [(x, y, None, mask)] + rest):
+            with self.assertRaises(ValueError):
+                game.restore_state(state._replace(grid=tuple(grid)))
+        version, internal, gauss = game.rng.getstate()
+        rng_state = (version, internal[:-1] + (625,), gauss)
+        with self.assertRaises(ValueError):
+            game.restore_state(state._replace(rng_state=rng_state))
+        self.assertEqual(game.rng.getstate(), (version, internal, gauss))
+        self.assertIs(game.player, player)
+        self.assertIs(game.id_order, id_order)
+
+    def test_header_only(self):
+        header = save_format.decode_header(save_format.encode(self.game))
+
+        self.assertEqual(header.version, save_format.VERSION)
+        self.assertEqual(header.time, self.game.time)
+        self.assertEqual(header.has_totem, self.player.has_totem)
+
+    def test_rejects_corrupt_saves(self):
+        data = bytearray(save_format.encode(self.game))
+        for corrupt in (b"", b"{\n<<<<<<< HEAD", data[:-1],
+                        data[:-1] + bytes([data[-1] ^ 1])):
+            with self.assertRaises(ValueError):
+                save_format.decode(bytes(corrupt))
+
+    def test_smaller_than_json_export(self):
+        with tempfile.TemporaryDirectory() as directory:
+            binary = os.path.join(directory, "save.zimp")
+            exported = os.path.join(directory, "save.json")
+            self.game.save_game(binary)
+            self.game.save_game(exported)
+
+            with open(exported) as f:
+                self.assertEqual(json.load(f)["time"], self.game.time)
+            self.assertLess(os.path.getsize(binary), os.path.getsize(exported) / 2)
+
+
+class TestLoadGame(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "save.zimp")
+        self.game, self.engine = played_game(seed=11, decisions=25)
+
+    def _fresh_game(self):
+        return Game(self.game.localization, catalog=self.game.catalog)
+
+    def test_restores_state_bound_to_the_catalog(self):
+        self.game.save_game(self.path)
+        loaded = self._fresh_game()
+        loaded.load_game(self.path)
+
+        player, original = loaded.player, self.game.player
+        self.assertEqual(loaded.time, self.game.time)
+        self.assertEqual(list(loaded.id_order), list(self.game.id_order))
+        self.assertEqual(player.items, original.items)
+        self.assertEqual(
+            {pos: (tile.name, tile.walls) for pos, tile in player.grid.items()},
+            {pos: (tile.name, tile.walls) for pos, tile in original.grid.items()},
+        )
+        self.assertIs(player.current_tile, player.grid[player.position])
+        self.assertEqual(player.grid.frontier, original.grid.frontier)
+        self.assertEqual(
+            [tile.name for tile in player.indoor_tiles],
+            [tile.name for tile in original.indoor_tiles],
+        )
+
+    def test_resumed_game_plays_on_identically(self):
+        self.game.save_game(self.path, include_rng=True)
+        loaded = self._fresh_game()
+        engine = GameEngine(loaded)
+        loaded.load_game(self.path)
+        engine.resume()
+
+        policy = RandomPolicy(random.Random(2))
+        for _ in range(40):
+            if self.engine.done:
+                break
+            self.assertEqual(engine.prompt, self.engine.prompt)
+            decision = policy.choose(self.game, self.engine.prompt)
+            # The original also reports the save itself
+            expected = [event.text for event in self.engine.step(decision)
+                        if event.key != "game_saved"]
+            self.assertEqual([event.text for event in engine.step(decision)], expected)
+        self.assertEqual(engine.done, self.engine.done)
+
+    def test_rejects_the_conflicted_repo_save(self):
+        loaded = self._fresh_game()
+        with self.assertRaises(ValueError):
+            loaded.load_game("game_save.json")
+        with self.assertRaises(ValueError):
+            Game.read_save_header("game_save.json")
+        self.assertIsNone(loaded.player)
+
+    def test_loads_json_export(self):
+        path = os.path.join(self.directory.name, "save.json")
+        self.game.save_game(path)
+        loaded = self._fresh_game()
+        loaded.load_game(path)
+
+        self.assertEqual(loaded.player.position, self.game.player.position)
+        self.assertEqual(
+            sorted(tile.name for tile in loaded.player.grid.values()),
+            sorted(tile.name for tile in self.game.player.grid.values()),
+        )
+        self.assertEqual(Game.read_save_header(path).time, self.game.time)
+
+    def test_json_export_missing_a_header_field(self):
+        path = os.path.join(self.directory.name, "save.json")
+        self.game.save_game(path)
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+        del saved["player"]["health"]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(saved, f)
+
+        with self.assertRaises(ValueError):
+            Game.read_save_header(path)
+
+    def test_header_only(self):
+        self.game.save_game(self.path)
+        header = Game.read_save_header(self.path)
+
+        self.assertEqual(
+            (header.time, header.health, header.has_totem),
+            (self.game.time, self.game.player.health, self.game.player.has_totem),
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+import itertools
+import tempfile
+import unittest
+from models import save_store
+from models.game import Game
+from models.save_store import FileSaveStore, MongoSaveStore, bulk_upsert
+from tests.test_save_format import played_game
+
+
+class FakeCursor:
+    def __init__(self, documents, projection):
+        self.documents = documents
+        self.projection = projection
+
+    def sort(self, key, direction):
+        self.documents.sort(key=lambda d: d[key], reverse=direction < 0)
+        return self
+
+    def __iter__(self):
+        return ({key: value for key, value in document.items()
+                 if key == "_id" or self.projection.get(key)}
+                for document in self.documents)
+
+
+class FakeCollection:
+    """The part of a pymongo Collection that MongoSaveStore uses, in memory."""
+
+    def __init__(self):
+        self.documents = {}
+        self.indexes = []
+        self.bulk_writes = 0
+
+    @staticmethod
+    def _matches(document, query):
+        return all(document.get(key) == value for key, value in query.items())
+
+    def create_index(self, keys):
+        self.indexes.append(keys)
+
+    def bulk_upsert(self, upserts):
+        """Stands in for save_store.bulk_upsert()."""
+        self.bulk_writes += 1
+        for key, fields in upserts:
+            self.documents.setdefault(key, {"_id": key}).update(fields)
+
+    def find_one(self, query, projection):
+        for document in self.find(query, projection):
+            return document
+        return None
+
+    def find(self, query, projection):
+        return FakeCursor([d for d in self.documents.values() if self._matches(d, query)],
+                          projection)
+
+    def delete_one(self, query):
+        for key, document in list(self.documents.items()):
+            if self._matches(document, query):
+                del self.documents[key]
+                return
+
+
+class FakeFile:
+    """The part of a GridOut that MongoSaveStore uses."""
+
+    def __init__(self, file_id, filename, data):
+        self._id = self.upload_date = file_id
+        self.filename = filename
+        self.data = data
+
+    def read(self):
+        return self.data
+
+
+class FakeBucket:
+    """The part of a GridFSBucket that MongoSaveStore uses, in memory."""
+
+    def __init__(self):
+        self.files = []
+        self._ids = itertools.count()
+
+    def upload_from_stream(self, filename, data):
+        file_id = next(self._ids)
+        self.files.append(FakeFile(file_id, filename, bytes(data)))
+        return file_id
+
+    def find(self, query):
+        excluded = query.get("_id", {}).get("$ne")
+        return [f for f in self.files
+                if f.filename == query["filename"] and f._id != excluded]
+
+    def delete(self, file_id):
+        self.files = [f for f in self.files if f._id != file_id]
+
+
+class SaveStoreContract:
+    """Checks every SaveStore backend must pass; mixed into a TestCase."""
+
+    def setUp(self):
+        self.game, _ = played_game()
+        self.data = save_store.save_format.encode(self.game)
+
+    def test_put_get_and_replace(self):
+        self.store.put("ann", "slot1", self.data)
+        self.assertEqual(self.store.get("ann", "slot1"), self.data)
+
+        other, _ = played_game(seed=9)
+        replacement = save_store.save_format.encode(other)
+        self.store.put_many([("ann", "slot1", replacement), ("bob", "slot1", self.data)])
+        self.assertEqual(self.store.get("ann", "slot1"), replacement)
+        self.assertEqual(self.store.get("bob", "slot1"), self.data)
+        with self.assertRaises(KeyError):
+            self.store.get("ann", "slot2")
+
+    def test_list_reads_headers(self):
+        self.store.put("ann", "slot1", self.data)
+        self.store.put("ann", "slot2", self.data)
+        slots = self.store.list("ann")
+
+        self.assertEqual({slot for slot, _ in slots}, {"slot1", "slot2"})
+        self.assertEqual(slots[0][1].time, self.game.time)
+        self.assertEqual(self.store.list("nobody"), [])
+
+    def test_journal_and_delete(self):
+        self.store.put("ann", "slot1", self.data)
+        self.store.put_journal("ann", "slot1", b"old")
+        self.store.put_journal("ann", "slot1", b"journal" * 1000)
+        self.assertEqual(self.store.get_journal("ann", "slot1"), b"journal" * 1000)
+
+        self.store.delete("ann", "slot1")
+        with self.assertRaises(KeyError):
+            self.store.get("ann", "slot1")
+        with self.assertRaises(KeyError):
+            self.store.get_journal("ann", "slot1")
+
+    def test_game_saves_to_store(self):
+        self.game.save_game("quick", store=self.store, player_id="ann")
+        loaded = Game(self.game.localization, catalog=self.game.catalog)
+        loaded.load_game("quick", store=self.store, player_id="ann")
+
+        self.assertEqual(loaded.time, self.game.time)
+        self.assertEqual(loaded.player.position, self.game.player.position)
+
+    def test_rejects_path_like_names(self):
+        with self.assertRaises(ValueError):
+            self.store.put("../ann", "slot1", self.data)
+
+
+class TestFileSaveStore(SaveStoreContract, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        temporary = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary.cleanup)
+        self.store = FileSaveStore(temporary.name)
+
+
+class TestMongoSaveStore(SaveStoreContract, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.saves = FakeCollection()
+        self.store = MongoSaveStore({"saves": self.saves}, journals=FakeBucket(),
+                                    upsert=FakeCollection.bulk_upsert)
+
+    def test_indexes_and_bulk_upserts(self):
+        self.assertEqual(len(self.saves.indexes), 2)
+        self.assertEqual(self.saves.indexes[0][0][0], "player_id")
+
+        self.store.put_many([(player, "autosave", self.data) for player in range(50)])
+        self.assertEqual(self.saves.bulk_writes, 1)
+        self.assertEqual(len(self.saves.documents), 50)
+
+    def test_journal_being_replaced_reads_the_newest(self):
+        self.store.journals.upload_from_stream("ann/slot1", b"old")
+        self.store.journals.upload_from_stream("ann/slot1", b"new")
+        self.assertEqual(self.store.get_journal("ann", "slot1"), b"new")
+
+    @unittest.skipIf(save_store.pymongo is None, "pymongo is not installed")
+    def test_bulk_upsert_sends_one_unordered_write(self):
+        sent = []
+
+        class Collection:
+            def bulk_write(self, requests, ordered=True):
+                sent.append((requests, ordered))
+
+        bulk_upsert(Collection(), [("ann/slot1", {"slot": "slot1"})])
+        self.assertEqual(sent, [([save_store.pymongo.UpdateOne(
+            {"_id": "ann/slot1"}, {"$set": {"slot": "slot1"}}, upsert=True
+        )], False)])
+
+
+if __name__ == '__main__':
+    unittest.main()
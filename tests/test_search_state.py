@@ -0,0 +1,83 @@
+import unittest
+from models import save_format
+from models.search_state import (
+    SearchState, bits_of, field_key, pack_tile, unpack_tile, zobrist,
+)
+from tests.test_save_format import played_game
+
+
+def rebuilt(state):
+    """The same state with its key computed from scratch."""
+    return SearchState.build(*state[1:])
+
+
+class TestSearchState(unittest.TestCase):
+    def setUp(self):
+        self.game, _ = played_game()
+        self.state = SearchState.from_game(self.game)
+
+    def test_from_game_and_from_save_agree(self):
+        saved = save_format.decode(save_format.encode(self.game))
+
+        self.assertEqual(SearchState.from_save(saved), self.state)
+        self.assertEqual(len(self.state.tiles), len(self.game.player.grid))
+        self.assertEqual(self.state.deck, tuple(self.game.id_order))
+
+    def test_incremental_keys_match_full_rehash(self):
+        state = self.state.moved((5, -3)).drawn().placed(5, -3, 1 << 15 | 4, 0b0101)
+        state = state.placed(5, -3, 1 << 15 | 4, 0b1010)
+        state = state.updated(health=2, time=10, items=state.items ^ 0b110,
+                              has_totem=not state.has_totem)
+
+        self.assertEqual(state.key, rebuilt(state).key)
+        self.assertEqual(state.tile_at(5, -3), (1 << 15 | 4, 0b1010))
+        self.assertEqual(len(state.tiles), len(self.state.tiles) + 1)
+
+    def test_tiles_stay_sorted_with_one_per_position(self):
+        state = self.state
+        expected = {(x, y): (ref, mask) for x, y, ref, mask
+                    in map(unpack_tile, state.tiles)}
+        for n in range(40):
+            x, y, ref, mask = n % 7 - 3, n * 5 % 11 - 5, n, n % 16
+            state = state.placed(x, y, ref, mask)
+            expected[x, y] = (ref, mask)
+
+        self.assertEqual(list(state.tiles), sorted(state.tiles))
+        self.assertEqual(len(state.tiles), len(expected))
+        for (x, y), tile in expected.items():
+            self.assertEqual(state.tile_at(x, y), tile)
+        self.assertIsNone(state.tile_at(100, 100))
+        self.assertEqual(state, rebuilt(state))
+
+    def test_transpositions_share_a_key(self):
+        a = self.state.moved((1, 1)).updated(health=3)
+        b = self.state.updated(health=3).moved((1, 1))
+        c = self.state.updated(health=4).moved((1, 1))
+
+        self.assertEqual(hash(a), hash(b))
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+        self.assertEqual(len({a, b, c}), 2)
+        self.assertNotEqual(a, None)
+        self.assertNotIn("a", {a, b, c})
+        self.assertEqual(self.state.moved((1, 1)).moved(self.state.position), self.state)
+
+    def test_drawing_only_changes_the_top_card(self):
+        drawn = self.state.drawn()
+
+        self.assertEqual(drawn.deck, self.state.deck[1:])
+        self.assertEqual(drawn.key ^ self.state.key,
+                         zobrist("deck", len(self.state.deck) - 1, self.state.deck[0]))
+
+    def test_item_key_is_one_number_per_item(self):
+        self.assertEqual(list(bits_of(0b10110)), [1, 2, 4])
+        self.assertEqual(field_key("items", 0b10110),
+                         zobrist("item", 1) ^ zobrist("item", 2) ^ zobrist("item", 4))
+
+    def test_tile_packing_round_trip(self):
+        for tile in ((0, 0, 0, 0), (-5, 7, 1 << 15 | 16, 15), (127, -128, 0xFFFF, 9)):
+            self.assertEqual(unpack_tile(pack_tile(*tile)), tile)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import json
+import random
+import unittest
+from unittest.mock import patch
+from models.engine import GameEngine
+from models.game import Game
+from models.seeding import child_seed, spawn_seeds
+from models.tiles import IndoorTile, Tile
+
+
+class TestSeeding(unittest.TestCase):
+    def setUp(self):
+        with open("localization.json", encoding="utf-8") as f:
+            self.localization = json.load(f)["en"]
+
+    def start(self, seed):
+        game = Game(self.localization, seed=seed)
+        engine = GameEngine(game)
+        indoor_tiles, outdoor_tiles = Tile.load_tiles("game_data.json")
+        engine.start(indoor_tiles, outdoor_tiles)
+        return game
+
+    def test_same_seed_same_game(self):
+        first = self.start(7)
+        second = self.start(7)
+
+        self.assertEqual(first.id_order, second.id_order)
+        self.assertEqual(
+            [tile.name for tile in first.player.indoor_tiles],
+            [tile.name for tile in second.player.indoor_tiles],
+        )
+
+    def test_games_do_not_touch_the_global_generator(self):
+        with patch("random.shuffle", side_effect=AssertionError), \
+                patch("random.choice", side_effect=AssertionError):
+            self.start(3)
+
+    def test_shuffle_tiles_uses_given_generator(self):
+        tiles, _ = Tile.load_tiles("game_data.json")
+        again, _ = Tile.load_tiles("game_data.json")
+
+        IndoorTile.shuffle_tiles(tiles, random.Random(1))
+        IndoorTile.shuffle_tiles(again, random.Random(1))
+
+        self.assertEqual([t.name for t in tiles], [t.name for t in again])
+        self.assertNotIn("Foyer", [t.name for t in tiles])
+
+    def test_child_seeds(self):
+        self.assertEqual(child_seed(1, 5), child_seed(1, 5))
+        self.assertNotEqual(child_seed(1, 5), child_seed(2, 5))
+        self.assertEqual(spawn_seeds(1, 3, start=4)[1], child_seed(1, 5))
+        self.assertLess(child_seed(1, "policy"), 2 ** 64)
+
+
+if __name__ == '__main__':
+    unittest.main()
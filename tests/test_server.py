@@ -0,0 +1,191 @@
+import asyncio
+import json
+import os
+import random
+import tempfile
+import unittest
+from models.engine import Prompt
+from models.loadgen import percentile, run_load
+from models.policies import RandomPolicy
+from models.save_store import FileSaveStore
+from models.server import GameServer
+
+
+class TestGameServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        with open("localization.json", encoding="utf-8") as f:
+            localization = json.load(f)["en"]
+        self.server = GameServer(localization, seed=3)
+        self.host, self.port = await self.server.start("127.0.0.1", 0)
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def test_session_speaks_json_lines(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        messages = []
+        while not messages or messages[-1]["type"] != "prompt":
+            messages.append(json.loads(await reader.readline()))
+
+        self.assertEqual(messages[0]["type"], "player")
+        self.assertEqual(messages[-1]["key"], "move")
+        self.assertNotIn("//save", messages[-1]["options"])
+        self.assertEqual(len(self.server.sessions), 1)
+
+        writer.write(b"nowhere\n")
+        reply = json.loads(await reader.readline())
+        self.assertEqual(reply["key"], "p_invalid_dir")
+        writer.close()
+        await writer.wait_closed()
+
+    async def test_client_cannot_save_to_the_working_directory(self):
+        temporary = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary.cleanup)
+        cwd = os.getcwd()
+        os.chdir(temporary.name)
+        self.addCleanup(os.chdir, cwd)
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        prompt = None
+        while prompt is None or prompt["type"] != "prompt":
+            prompt = json.loads(await reader.readline())
+
+        writer.write(b"//SAVE\n")
+        error = json.loads(await reader.readline())
+        again = json.loads(await reader.readline())
+        writer.close()
+        await writer.wait_closed()
+
+        self.assertEqual(error["type"], "error")
+        self.assertEqual(again, prompt)
+        self.assertEqual(os.listdir(temporary.name), [])
+
+    async def test_sessions_run_concurrently_and_end(self):
+        report = await run_load(self.host, self.port, sessions=12, concurrency=6,
+                                max_decisions=50)
+
+        self.assertEqual(sum(report["outcomes"].values()), 12)
+        self.assertNotIn("disconnected", report["outcomes"])
+        self.assertGreater(report["turns"], 0)
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(self.server.sessions), 0)
+
+    async def test_idle_session_is_parked_and_brought_back(self):
+        temporary = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary.cleanup)
+        server = GameServer(self.server.localization, self.server.catalog, seed=3,
+                            session_dir=temporary.name, idle_timeout=0.01,
+                            sweep_interval=0.01)
+        host, port = await server.start("127.0.0.1", 0)
+        self.addAsyncCleanup(server.close)
+
+        report = await run_load(host, port, sessions=4, concurrency=4,
+                                max_decisions=6, think=0.05)
+
+        self.assertEqual(sum(report["outcomes"].values()), 4)
+        self.assertNotIn("disconnected", report["outcomes"])
+        metrics = server.sessions.metrics()
+        self.assertGreater(metrics["evictions"], 0)
+        self.assertGreater(metrics["misses"], 0)
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(server.sessions), 0)
+
+    async def test_turns_are_autosaved_in_batches(self):
+        temporary = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary.cleanup)
+        store = FileSaveStore(temporary.name)
+        server = GameServer(self.server.localization, self.server.catalog, seed=3,
+                            save_store=store)
+        host, port = await server.start("127.0.0.1", 0)
+
+        await run_load(host, port, sessions=3, concurrency=3, max_decisions=30)
+        await server.close()
+
+        players = os.listdir(temporary.name)
+        self.assertEqual(len(players), 3)
+        saved = [store.list(player_id) for player_id in players]
+        self.assertTrue(all(slots and slots[0][0] == "autosave" for slots in saved))
+
+    async def test_autosaves_survive_a_server_restart(self):
+        temporary = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary.cleanup)
+        store = FileSaveStore(temporary.name)
+        for _ in range(2):
+            # A fresh server numbers its sessions from zero again
+            server = GameServer(self.server.localization, self.server.catalog,
+                                seed=3, save_store=store)
+            host, port = await server.start("127.0.0.1", 0)
+            await run_load(host, port, sessions=1, concurrency=1, max_decisions=30)
+            await server.close()
+
+        players = os.listdir(temporary.name)
+        self.assertEqual(len(players), 2)
+        for player_id in players:
+            self.assertEqual(store.list(player_id)[0][0], "autosave")
+
+    async def _until_prompt(self, reader):
+        """The messages up to and including the next prompt or end."""
+        messages = [json.loads(await reader.readline())]
+        while messages[-1]["type"] not in ("prompt", "done"):
+            messages.append(json.loads(await reader.readline()))
+        return messages
+
+    async def test_autosaved_game_resumes_on_a_new_server(self):
+        temporary = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary.cleanup)
+        store = FileSaveStore(temporary.name)
+        server = GameServer(self.server.localization, self.server.catalog,
+                            seed=3, save_store=store)
+        host, port = await server.start("127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection(host, port)
+        messages = await self._until_prompt(reader)
+        player_id = messages[0]["id"]
+        policy = RandomPolicy(random.Random(0))
+        saved = None
+        while saved is None:
+            prompt = messages[-1]
+            self.assertEqual(prompt["type"], "prompt")
+            writer.write(policy.choose(None, Prompt(
+                prompt["key"], prompt["text"], tuple(prompt["options"]))
+            ).encode("utf-8") + b"\n")
+            messages = await self._until_prompt(reader)
+            if messages[-1].get("key") == "move":
+                saved = messages[-1]
+
+        # Not while the player is still connected
+        other_reader, other_writer = await asyncio.open_connection(host, port)
+        own = (await self._until_prompt(other_reader))[-1]
+        other_writer.write(f"//resume {player_id}\n".encode("utf-8"))
+        refused = await self._until_prompt(other_reader)
+        self.assertEqual([m["type"] for m in refused], ["error", "prompt"])
+        self.assertEqual(refused[-1], own)
+        for stream in (writer, other_writer):
+            stream.close()
+            await stream.wait_closed()
+        await server.close()
+
+        server = GameServer(self.server.localization, self.server.catalog,
+                            seed=4, save_store=store)
+        host, port = await server.start("127.0.0.1", 0)
+        self.addAsyncCleanup(server.close)
+        reader, writer = await asyncio.open_connection(host, port)
+        own = (await self._until_prompt(reader))[-1]
+        writer.write(b"//resume nobody\n")
+        self.assertEqual(await self._until_prompt(reader),
+                         [{"type": "error", "text": "There is no autosave for player 'nobody'."},
+                          own])
+
+        writer.write(f"//resume {player_id}\n".encode("utf-8"))
+        self.assertEqual(await self._until_prompt(reader),
+                         [{"type": "player", "id": player_id}, saved])
+        writer.write(saved["options"][0].encode("utf-8") + b"\n")
+        self.assertIn((await self._until_prompt(reader))[-1]["type"], ("prompt", "done"))
+        writer.close()
+        await writer.wait_closed()
+
+    def test_percentile(self):
+        self.assertEqual(percentile(list(range(100)), 0.99), 99)
+        self.assertIsNone(percentile([], 0.5))
+
+
+if __name__ == '__main__':
+    unittest.main()
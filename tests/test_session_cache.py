@@ -0,0 +1,142 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from models.catalog import load_catalog
+from models.game import Game
+from models.policies import RandomPolicy
+from models.session_cache import Session, SessionCache
+
+
+class TestSessionCache(unittest.TestCase):
+    def setUp(self):
+        with open("localization.json", encoding="utf-8") as f:
+            self.localization = json.load(f)["en"]
+        self.catalog = load_catalog()
+        temporary = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary.cleanup)
+        self.directory = temporary.name
+        self.now = 0.0
+        self.cache = SessionCache(
+            self.localization, self.catalog, self.directory, capacity=2,
+            idle_timeout=60, clock=lambda: self.now,
+        )
+
+    def _session(self, session_id, seed=8):
+        session = Session(session_id, Game(self.localization, seed=seed,
+                                           catalog=self.catalog))
+        session.start(self.catalog)
+        return session
+
+    def _play_until_mid_turn(self, session, policy):
+        """Plays on until the session waits on something other than a move."""
+        session.step(policy.choose(session.game, session.engine.prompt))
+        while not session.engine.done and session.engine.prompt.key == "move":
+            session.step(policy.choose(session.game, session.engine.prompt))
+
+    def test_parked_session_resumes_on_the_same_prompt(self):
+        session, twin = self._session(0), self._session(1)
+        policy, twin_policy = RandomPolicy(random.Random(2)), RandomPolicy(random.Random(2))
+        self._play_until_mid_turn(session, policy)
+        self._play_until_mid_turn(twin, twin_policy)
+        self.assertTrue(session.tail)
+        prompt = session.engine.prompt
+        self.cache.add(session)
+
+        self.now = 61
+        self.assertEqual(self.cache.evict_idle(), 1)
+        self.assertEqual(self.cache.live, 0)
+        self.assertIn(0, self.cache)
+        del session
+
+        restored = self.cache.get(0)
+        self.assertEqual(restored.engine.prompt, prompt)
+        self.assertEqual(os.listdir(self.directory), [])
+        # Carries on exactly like a session that was never parked
+        for _ in range(40):
+            if twin.engine.done:
+                break
+            decision = twin_policy.choose(twin.game, twin.engine.prompt)
+            self.assertEqual(policy.choose(restored.game, restored.engine.prompt),
+                             decision)
+            expected = [e.key for e in twin.step(decision)]
+            self.assertEqual([e.key for e in restored.step(decision)], expected)
+        self.assertEqual(restored.game.time, twin.game.time)
+        self.assertEqual(restored.game.player.health, twin.game.player.health)
+
+    def test_capacity_parks_least_recently_used(self):
+        for session_id in range(3):
+            self.cache.add(self._session(session_id, seed=session_id))
+            if session_id == 1:
+                self.cache.get(0)
+
+        self.assertEqual(self.cache.live, 2)
+        self.assertEqual(os.listdir(self.directory), ["1.session"])
+        self.cache.get(1)
+        self.cache.remove(2)
+        metrics = self.cache.metrics()
+        self.assertEqual(metrics["evictions"], 2)
+        self.assertEqual((metrics["hits"], metrics["misses"]), (1, 1))
+        self.assertEqual(metrics["hit_rate"], 0.5)
+        self.assertIsNotNone(metrics["rehydration_ms_max"])
+        self.assertEqual(len(self.cache), 2)
+
+    def test_unstarted_sessions_are_never_parked(self):
+        session = Session(0, Game(self.localization, seed=1, catalog=self.catalog))
+        self.cache.add(session)
+        self.now = 100
+        self.assertEqual(self.cache.evict_idle(), 0)
+        self.assertIs(self.cache.get(0), session)
+
+    def test_capacity_skips_unstarted_sessions(self):
+        unstarted = Session(0, Game(self.localization, seed=1, catalog=self.catalog))
+        self.cache.add(unstarted)
+        self.cache.add(self._session(1, seed=1))
+        self.cache.add(self._session(2, seed=2))
+
+        self.assertEqual(os.listdir(self.directory), ["1.session"])
+        self.assertIs(self.cache.get(0), unstarted)
+
+    def test_rehydration_latencies_are_bounded(self):
+        cache = SessionCache(self.localization, self.catalog, self.directory,
+                             capacity=1, latency_window=3)
+        cache.add(self._session(0, seed=0))
+        cache.add(self._session(1, seed=1))
+        for session_id in (0, 1) * 4:
+            cache.get(session_id)
+
+        self.assertEqual(cache.misses, 8)
+        self.assertEqual(len(cache.rehydration_seconds), 3)
+        self.assertIsNotNone(cache.metrics()["rehydration_ms_mean"])
+
+    def test_session_just_fetched_stays_live_without_capacity(self):
+        cache = SessionCache(self.localization, self.catalog, self.directory,
+                             capacity=0)
+        cache.add(self._session(0))
+        self.assertEqual(cache.live, 1)
+        cache.add(self._session(1, seed=1))
+        self.assertEqual(os.listdir(self.directory), ["0.session"])
+
+        session = cache.get(0)
+        self.assertEqual(cache.live, 1)
+        self.assertIs(cache.get(0), session)
+        self.assertEqual(session.engine.prompt.key, "move")
+
+    def test_replay_that_meets_another_prompt_is_refused(self):
+        session = self._session(0)
+        self._play_until_mid_turn(session, RandomPolicy(random.Random(2)))
+        self.assertTrue(session.tail)
+        key, decision = session.tail[0]
+        session.tail[0] = ("bury_totem", decision)
+
+        with self.assertRaises(ValueError):
+            Session.load(0, session.dump(), self.localization, self.catalog)
+
+    def test_corrupt_parked_session(self):
+        with self.assertRaises(ValueError):
+            Session.load(0, b"\x05\x00", self.localization, self.catalog)
+
+
+if __name__ == '__main__':
+    unittest.main()
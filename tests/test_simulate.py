@@ -0,0 +1,36 @@
+import unittest
+from models.simulate import simulate, play_game, game_seed
+
+
+class TestSimulate(unittest.TestCase):
+    def test_results_do_not_depend_on_workers_or_chunks(self):
+        inline = []
+        pooled = []
+        simulate(12, workers=1, seed=5, chunk_size=12, on_result=inline.append)
+        simulate(12, workers=2, seed=5, chunk_size=5, on_result=pooled.append)
+
+        self.assertEqual(inline, sorted(pooled))
+
+    def test_summary_counts_every_game(self):
+        summary = simulate(20, workers=1, seed=2, policy_name="cautious").as_dict()
+
+        self.assertEqual(summary["games"], 20)
+        self.assertEqual(sum(summary["outcomes"].values()), 20)
+        self.assertGreaterEqual(summary["win_rate"], 0.0)
+        self.assertLessEqual(summary["win_rate"], 1.0)
+
+    def test_play_game_records_seed(self):
+        result = play_game(3, seed=9)
+
+        self.assertEqual(result.seed, game_seed(9, 3))
+        self.assertIn(result.outcome, ("won", "killed", "out_of_time", "stalled"))
+        if result.outcome == "killed":
+            self.assertIsNotNone(result.cause)
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            simulate(1, policy_name="telepathic")
+
+
+if __name__ == '__main__':
+    unittest.main()
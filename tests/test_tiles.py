@@ -0,0 +1,54 @@
+import unittest
+from enums.directions import Direction
+from models.tiles import Tile
+
+
+class TestTileWalls(unittest.TestCase):
+    def _rotate_list(self, walls):
+        # The list rotation tiles used before walls became a bitmask
+        return walls[-1:] + walls[:-1]
+
+    def test_walls_round_trip(self):
+        tile = Tile(1, "Hall", [1, 0, 0, 1], None)
+        self.assertEqual(list(tile.walls), [1, 0, 0, 1])
+        self.assertEqual(tile.walls[Direction.UP.value], 0)
+
+    def test_rotate_matches_list_rotation(self):
+        for mask in range(16):
+            walls = [(mask >> side) & 1 for side in range(4)]
+            tile = Tile(1, "Hall", walls, None)
+            expected = walls
+            for turns in range(1, 5):
+                expected = self._rotate_list(expected)
+                rotated = Tile(1, "Hall", walls, None)
+                rotated.rotate(turns)
+                self.assertEqual(list(rotated.walls), expected)
+            tile.rotate()
+            self.assertEqual(list(tile.walls), self._rotate_list(walls))
+
+    def test_exit_directions(self):
+        tile = Tile(1, "Hall", [1, 0, 1, 0], None)
+        self.assertEqual(tile.get_exit_directions(), (Direction.UP, Direction.DOWN))
+
+    def test_turns_to_open(self):
+        tile = Tile(1, "Hall", [0, 1, 1, 1], None)
+        self.assertEqual(tile.turns_to_open(Direction.LEFT.value), 0)
+        self.assertEqual(tile.turns_to_open(Direction.UP.value), 1)
+        self.assertEqual(tile.turns_to_open(Direction.DOWN.value), 3)
+        tile.rotate(tile.turns_to_open(Direction.RIGHT.value))
+        self.assertEqual(tile.walls[Direction.RIGHT.value], 0)
+
+    def test_turns_to_open_closed_tile(self):
+        tile = Tile(1, "Vault", [1, 1, 1, 1], None)
+        self.assertIsNone(tile.turns_to_open(Direction.UP.value))
+
+    def test_open_and_close_wall(self):
+        tile = Tile(1, "Hall", [1, 1, 1, 1], None)
+        tile.open_wall(Direction.UP.value)
+        self.assertEqual(list(tile.walls), [1, 0, 1, 1])
+        tile.close_wall(Direction.UP.value)
+        self.assertEqual(list(tile.walls), [1, 1, 1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,6 +10,25 @@ if project_root not in sys.path:
 from tests.test_player_move import TestPlayerMove
 from tests.test_player_move import TestPlayerMovementNotImplemented
 from tests.test_game_resolve_dev_card import TestGameResolveDevCard
+from tests.test_engine import TestGameEngine
+from tests.test_simulate import TestSimulate
+from tests.test_seeding import TestSeeding
+from tests.test_catalog import TestCatalog
+from tests.test_deck import TestDeck
+from tests.test_tiles import TestTileWalls
+from tests.test_memory_benchmark import TestCompactRecords
+from tests.test_grid import TestGridFrontier, TestMapRenderer
+from tests.test_save_format import TestLoadGame, TestSaveFormat
+from tests.test_journal import TestJournaledEngine
+from tests.test_server import TestGameServer
+from tests.test_session_cache import TestSessionCache
+from tests.test_save_store import TestFileSaveStore, TestMongoSaveStore
+from tests.test_localization import TestLocalizationTable
+from tests.test_search_state import TestSearchState
+from tests.test_expectimax import TestExpectimaxSolver
+from tests.test_mcts import TestMCTS
+from tests.test_batch_engine import TestBatchEngine
+from tests.test_environment import TestEnvironment
 
 
 def suite():
@@ -17,6 +36,28 @@ def suite():
     suite.addTest(unittest.makeSuite(TestPlayerMove))
     suite.addTest(unittest.makeSuite(TestPlayerMovementNotImplemented))
     suite.addTest(unittest.makeSuite(TestGameResolveDevCard))
+    suite.addTest(unittest.makeSuite(TestGameEngine))
+    suite.addTest(unittest.makeSuite(TestSimulate))
+    suite.addTest(unittest.makeSuite(TestSeeding))
+    suite.addTest(unittest.makeSuite(TestCatalog))
+    suite.addTest(unittest.makeSuite(TestDeck))
+    suite.addTest(unittest.makeSuite(TestTileWalls))
+    suite.addTest(unittest.makeSuite(TestCompactRecords))
+    suite.addTest(unittest.makeSuite(TestGridFrontier))
+    suite.addTest(unittest.makeSuite(TestMapRenderer))
+    suite.addTest(unittest.makeSuite(TestSaveFormat))
+    suite.addTest(unittest.makeSuite(TestLoadGame))
+    suite.addTest(unittest.makeSuite(TestJournaledEngine))
+    suite.addTest(unittest.makeSuite(TestGameServer))
+    suite.addTest(unittest.makeSuite(TestSessionCache))
+    suite.addTest(unittest.makeSuite(TestFileSaveStore))
+    suite.addTest(unittest.makeSuite(TestMongoSaveStore))
+    suite.addTest(unittest.makeSuite(TestLocalizationTable))
+    suite.addTest(unittest.makeSuite(TestSearchState))
+    suite.addTest(unittest.makeSuite(TestExpectimaxSolver))
+    suite.addTest(unittest.makeSuite(TestMCTS))
+    suite.addTest(unittest.makeSuite(TestBatchEngine))
+    suite.addTest(unittest.makeSuite(TestEnvironment))
     return suite
 
 if __name__ == '__main__':